@@ -1,111 +1,182 @@
-from fastapi import APIRouter, HTTPException
+import json
+import logging
+import os
+from typing import Dict, List, Literal, Optional
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.models.schemas import (
     FranchiseReportResponse,
     FranchiseReportRequest,
+    BatchRiskRequest,
+    BulkReportRequest,
+    BulkReportResponse,
+    ClusterAssignRequest,
+    ClusterAssignResponse,
     ErrorResponse,
-    StoreInfo,
-    Statistics,
-    ModelResults,
-    ClusterIndicator,
-    TrendData,
-    RuleViolation,
-    SalesPrediction,
     LLMSuggestion
 )
-from app.services.analyzer import analyzer
+from app.services.batch_scorer import batch_scorer
+from app.services.data_loader import data_loader
 from app.services.llm_service import llm_service
+from app.services.report_cache import report_cache
 
 router = APIRouter(prefix="/api/franchise", tags=["franchise"])
 
+logger = logging.getLogger(__name__)
+
+# 일괄 리포트 요청 1건당 최대 점포 수
+BULK_REPORT_MAX_STORES = int(os.getenv("BULK_REPORT_MAX_STORES", "100"))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 현재 ETag 가 포함되어 있는지 (약한 비교)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+
 
 @router.get("/report/{store_id}", response_model=FranchiseReportResponse)
-async def get_franchise_report(store_id: str):
+async def get_franchise_report(store_id: str, request: Request, llm: Literal['inline', 'defer'] = 'inline'):
     """
     가맹점 리포트 생성
     
     - **store_id**: 점포 ID (예: 000F03E44A)
+    - **llm**: inline(기본) - LLM 전략까지 생성 후 응답 /
+      defer - 데이터 리포트만 즉시 응답하고 llmSuggestion 은 status=pending 으로 비워 둠
+      (전략은 `GET /api/llm/stream/{store_id}` SSE 로 수신)
+    
+    defer 응답은 ETag 를 포함하며, If-None-Match 가 일치하면 304 를 반환합니다.
     """
+    # 데이터 리포트는 데이터 버전이 같으면 항상 동일 → 조건부 요청은 바로 304
+    if llm == 'defer':
+        etag = report_cache.etag_for(store_id)
+        if _etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers={'ETag': etag})
+    
     try:
-        # 1. 리포트 데이터 생성
-        report_data = analyzer.generate_franchise_report(store_id)
-        
-        # 2. LLM 전략 제안
-        print(f"🔍 디버깅: LLM 전략 생성 시작")
-        llm_result = llm_service.generate_strategy(report_data)
-        print(f"🔍 디버깅: llm_result = {llm_result}")
-        
-        # 3. 응답 구성
-        store_data = report_data['store_data']
-        location_info = report_data['location_info'] or {}
-        cluster_metadata = report_data['cluster_metadata'] or {}
-        diagnosis_results = report_data['diagnosis_results'] or {}
+        # 1. 리포트 데이터 (구체화 캐시, 미스 시 스레드풀에서 생성 - 이벤트 루프 비차단)
+        cached = await run_in_threadpool(report_cache.get, store_id)
         
-        # 위험도 레벨 결정
-        risk_score = diagnosis_results.get('total_risk_score', 50)
-        if risk_score >= 80:
-            risk_level = '치명적'
-        elif risk_score >= 60:
-            risk_level = '높음'
-        elif risk_score >= 40:
-            risk_level = '중간'
-        else:
-            risk_level = '낮음'
-        
-        response = FranchiseReportResponse(
-            storeInfo=StoreInfo(
-                id=store_data['store_id'],
-                name=store_data.get('store_name', ''),
-                tradingArea=location_info.get('business_district', ''),
-                industry=store_data.get('industry', ''),
-                cluster=str(store_data.get('static_cluster', '0')),
-                clusterName=cluster_metadata.get('cluster_name', f'클러스터 {store_data.get("static_cluster", "0")}'),
-                latitude=float(store_data.get('x', 0)),
-                longitude=float(store_data.get('y', 0)),
-                riskLevel=risk_level,
-                riskScore=float(risk_score)
-            ),
-            modelResults=ModelResults(
-                salesPrediction=float(report_data['model_results']['sales_prediction']),
-                eventPrediction=report_data['model_results']['event_prediction'],
-                survivalProbability=float(report_data['model_results']['survival_probability']),
-                riskScore=float(report_data['model_results']['risk_score'])
-            ),
-            ruleViolations=[
-                RuleViolation(**violation) for violation in report_data['rule_violations']
-            ],
-            clusterIndicators=[
-                ClusterIndicator(**item) for item in report_data['cluster_indicators']
-            ],
-            trendData=[
-                TrendData(**item) for item in report_data['trend_data']
-            ],
-            salesPredictions=[
-                SalesPrediction(
-                    targetMonth=pred['target_month'],
-                    horizon=int(pred['horizon']),
-                    yhatGrade=int(pred['yhat_grade']),
-                    yhatProb=float(pred['yhat_prob']),
-                    pLow56=float(pred['p_low56']),
-                    riskWorsenGe2=float(pred['risk_worsen_ge2']),
-                    yT=int(pred['y_t'])
-                ) for pred in report_data['sales_predictions']
-            ],
-            statistics=Statistics(
-                clusterClosureRate=float(cluster_metadata.get('closure_rate', 0)),
-                industryAvgClosureRate=15.0,  # 기본값
-                nearbyStores=int(store_data.get('nearby_stores', 0)),
-                avgMonthlyFootTraffic=int(store_data.get('foot_traffic', 0)),
-                rentIncreaseRate=float(store_data.get('rent_increase_rate', 0))
-            ),
-            llmSuggestion=LLMSuggestion(
-                summary=llm_result['summary'],
-                strategies=llm_result['strategies']
+        if llm == 'defer':
+            return Response(
+                content=cached.body,
+                media_type="application/json",
+                headers=({'ETag': cached.etag, 'Cache-Control': 'no-cache'} if cached.etag
+                         else {'Cache-Control': 'no-store'})
             )
-        )
         
+        # 2. LLM 전략 제안 (비동기 호출)
+        llm_result = await llm_service.generate_strategy(cached.report_data)
+        logger.debug("llm_result = %s", llm_result)
+        
+        # 3. 응답 구성 (orjson 경로는 직렬화된 바이트 그대로 - response_model 재검증 생략)
+        response = cached.with_suggestion(LLMSuggestion(
+            summary=llm_result['summary'],
+            strategies=llm_result['strategies']
+        ))
+        if isinstance(response, bytes):
+            return Response(content=response, media_type="application/json")
         return response
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"리포트 생성 중 오류 발생: {str(e)}")
+
+
+def _bulk_report_body(store_ids: List[str]) -> bytes:
+    """리포트 캐시 항목의 직렬화된 바이트를 이어 붙여 일괄 응답 본문 생성 (점포별 재직렬화 없음)"""
+    store_ids = list(dict.fromkeys(store_ids))
+    entries, errors = report_cache.get_many(store_ids)
+    failed = [
+        {
+            'storeId': store_id,
+            'status': 404 if isinstance(errors[store_id], ValueError) else 500,
+            'detail': (str(errors[store_id]) if isinstance(errors[store_id], ValueError)
+                       else f"리포트 생성 중 오류 발생: {errors[store_id]}"),
+        }
+        for store_id in store_ids if store_id in errors
+    ]
+    reports = b','.join(entries[store_id].body for store_id in store_ids if store_id in entries)
+    return b'{"reports":[' + reports + b'],"errors":' + json.dumps(failed, ensure_ascii=False).encode('utf-8') + b'}'
+
+
+@router.post("/reports", response_model=BulkReportResponse)
+async def get_franchise_reports(request: BulkReportRequest):
+    """
+    여러 점포 리포트 일괄 조회 (LLM 전략 제외 - `llm=defer` 와 같은 리포트)
+    
+    - **storeIds**: 점포 ID 목록 (최대 BULK_REPORT_MAX_STORES 곳)
+    
+    캐시에 없는 점포는 static_cluster 별로 묶어 클러스터 메타데이터/룰/지표 계산을 그룹당 1번만 합니다.
+    없는 점포나 생성에 실패한 점포는 `errors` 에 담고 나머지 리포트는 그대로 반환합니다.
+    """
+    if len(set(request.storeIds)) > BULK_REPORT_MAX_STORES:
+        raise HTTPException(status_code=400, detail=f"점포는 한 번에 최대 {BULK_REPORT_MAX_STORES}곳까지 조회할 수 있습니다.")
+    try:
+        body = await run_in_threadpool(_bulk_report_body, request.storeIds)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"리포트 생성 중 오류 발생: {str(e)}")
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/batch")
+async def stream_batch_risk(request: BatchRiskRequest):
+    """
+    전체(또는 필터링된) 가맹점 일괄 위험 진단 - NDJSON 스트림
+    
+    - **storeIds**: 대상 점포 ID 목록 (선택)
+    - **clusters**: 대상 static_cluster 목록 (선택)
+    
+    LLM 전략 없이 룰 위반, 모델 결과, 클러스터 지표, 트렌드를 클러스터 단위로 계산하여
+    점포당 한 줄씩 스트리밍합니다.
+    """
+    return StreamingResponse(
+        batch_scorer.iter_ndjson(request.storeIds, request.clusters),
+        media_type="application/x-ndjson"
+    )
+
+
+def _assign_clusters(stores: List[Dict]) -> Dict:
+    """점포 특성 행 → 클러스터 배정 (한 번의 nearest-centroid 계산)"""
+    assigner = data_loader.cluster_assigner
+    ids, distances = assigner.assign(pd.DataFrame(stores))
+    names = {}
+    for cluster_id in set(ids.tolist()):
+        metadata = data_loader.get_cluster_metadata(cluster_id)
+        names[cluster_id] = metadata.get('cluster_name') if metadata else None
+    return {
+        'k': assigner.stats()['k'],
+        'assignments': [
+            {
+                'storeId': str(store['store_id']) if store.get('store_id') is not None else None,
+                'cluster': cluster_id,
+                'clusterName': names[cluster_id],
+                'distance': round(distance, 4),
+            }
+            for store, cluster_id, distance in zip(stores, ids.tolist(), distances.tolist())
+        ],
+    }
+
+
+@router.post("/clusters/assign", response_model=ClusterAssignResponse)
+async def assign_clusters(request: ClusterAssignRequest):
+    """
+    신규/변경 점포 static_cluster 배정 (재학습 없이 저장된 스케일러 + 중심점 사용)
+    
+    - **stores**: 점포 특성 행 목록 (없는 특성은 학습 시 중앙값으로 대체)
+    
+    결과를 반영하려면 `POST /api/ingest/store_features` 로 적재하세요 (static_cluster 를 비워 두면 같은 방식으로 배정).
+    """
+    if not data_loader.cluster_assigner.available:
+        raise HTTPException(status_code=503, detail="클러스터 모델이 없습니다. python -m app.ml.clustering 으로 내보내세요.")
+    return await run_in_threadpool(_assign_clusters, request.stores)
+
+
+@router.get("/report-cache/stats")
+async def get_report_cache_stats():
+    """리포트 구체화 캐시 히트/미스 통계"""
+    return report_cache.stats()
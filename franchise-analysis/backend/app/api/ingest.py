@@ -0,0 +1,60 @@
+import io
+import os
+from typing import Optional
+
+import pandas as pd
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.ingestion import INGEST_TABLES, DeltaConflict, delta_ingestor
+
+router = APIRouter(prefix="/api/ingest", tags=["ingest"])
+
+# X-Ingest-Token 헤더가 일치해야 적재 가능 (미설정 시 INGEST_ALLOW_ANONYMOUS=1 일 때만 토큰 없이 허용)
+INGEST_TOKEN = os.getenv("INGEST_TOKEN")
+INGEST_ALLOW_ANONYMOUS = os.getenv("INGEST_ALLOW_ANONYMOUS", "0") == "1"
+
+
+def _check_token(token: Optional[str]) -> None:
+    if not INGEST_TOKEN:
+        if INGEST_ALLOW_ANONYMOUS:
+            return
+        raise HTTPException(status_code=503, detail="적재 토큰(INGEST_TOKEN)이 설정되지 않아 적재가 비활성화되어 있습니다.")
+    if token != INGEST_TOKEN:
+        raise HTTPException(status_code=403, detail="적재 토큰이 올바르지 않습니다.")
+
+
+@router.post("/{table}")
+async def ingest_month(table: str, request: Request, x_ingest_token: Optional[str] = Header(None)):
+    """
+    월별 증분 데이터 적재 (재시작/전체 재로드 없음)
+
+    - **table**: store_monthly_timeseries, sales_predict 또는 store_features
+      (store_features 는 static_cluster 를 비워 두면 저장된 클러스터 모델로 배정)
+    - 본문: `text/csv` (원본 CSV 와 같은 컬럼) 또는 JSON `{"rows": [{...}, ...]}`
+
+    같은 키(시계열: 점포+날짜, 예측/점포 특성: 점포)의 기존 행은 새 행으로 대체됩니다.
+    처리 중인 요청은 교체 전 데이터를 끝까지 사용하고, 다른 워커는 INGEST_POLL_SECONDS 안에 반영합니다.
+    """
+    _check_token(x_ingest_token)
+    if table not in INGEST_TABLES:
+        raise HTTPException(status_code=404, detail=f"증분 적재 대상이 아닙니다: {table}")
+
+    body = await request.body()
+    try:
+        if request.headers.get('content-type', '').startswith('text/csv'):
+            df = pd.read_csv(io.BytesIO(body), dtype={'store_id': str})
+        else:
+            rows = (await request.json()).get('rows', [])
+            df = pd.DataFrame(rows)
+        return await run_in_threadpool(delta_ingestor.ingest, table, df)
+    except DeltaConflict as e:
+        raise HTTPException(status_code=409, detail=f"적재 실패: {e}")
+    except (ValueError, pd.errors.ParserError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"적재 실패: {e}")
+
+
+@router.get("/status")
+async def get_ingest_status():
+    """기록된/적용된 델타 수, 대기 중인 델타, 데이터 버전"""
+    return delta_ingestor.status()
@@ -0,0 +1,71 @@
+import json
+from typing import AsyncIterator, Dict
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.models.schemas import FranchiseReportRequest, LLMSuggestion
+from app.services.llm_service import llm_service
+from app.services.report_cache import report_cache
+
+router = APIRouter(prefix="/api/llm", tags=["llm"])
+
+
+async def _load_report_data(store_id: str) -> Dict:
+    """LLM 입력용 분석 데이터 (점포가 없으면 404)"""
+    try:
+        return (await run_in_threadpool(report_cache.get, store_id)).report_data
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"리포트 생성 중 오류 발생: {str(e)}")
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _iter_strategy_events(report_data: Dict) -> AsyncIterator[str]:
+    async for item in llm_service.stream_strategy(report_data):
+        if item['event'] == 'token':
+            yield _sse('token', {'text': item['text']})
+        else:
+            yield _sse('done', LLMSuggestion(**item['result']).model_dump())
+
+
+@router.post("/analyze", response_model=LLMSuggestion)
+async def analyze_store(request: FranchiseReportRequest):
+    """
+    LLM 전략 제안만 생성 (리포트를 llm=defer 로 받은 뒤 별도 호출)
+
+    - **franchiseId**: 점포 ID
+    """
+    report_data = await _load_report_data(request.franchiseId)
+    llm_result = await llm_service.generate_strategy(report_data)
+    return LLMSuggestion(summary=llm_result['summary'], strategies=llm_result['strategies'])
+
+
+@router.get("/stream/{store_id}")
+async def stream_strategy(store_id: str):
+    """
+    LLM 전략 제안 스트리밍 (Server-Sent Events)
+
+    - `event: token` - provider 가 생성한 텍스트 조각 `{"text": ...}`
+    - `event: done` - 파싱된 최종 전략 `{"summary", "strategies", "status": "ready"}`
+
+    캐시 히트나 기본 전략으로 대체된 경우에는 done 이벤트만 전송됩니다.
+    """
+    report_data = await _load_report_data(store_id)
+    return StreamingResponse(
+        _iter_strategy_events(report_data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+async def get_strategy_cache_stats():
+    """LLM 전략 캐시 히트/미스 통계"""
+    return {
+        'enabled': llm_service.cache_enabled,
+        **(await run_in_threadpool(llm_service.cache.stats))
+    }
@@ -0,0 +1,123 @@
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.schemas import NearbyStoresResponse, PortfolioPage, TradingAreaStats
+from app.services.area_stats import area_stats
+from app.services.portfolio import portfolio
+
+router = APIRouter(prefix="/api/stats", tags=["stats"])
+
+
+def _center(store_id: Optional[str], lat: Optional[float], lon: Optional[float]) -> Tuple[float, float]:
+    """기준 위치: store_id 의 좌표 또는 lat/lon"""
+    if store_id is not None:
+        location = area_stats.store_location(store_id)
+        if location is None:
+            raise HTTPException(status_code=404, detail=f"점포 ID {store_id}의 좌표를 찾을 수 없습니다.")
+        return location
+    if lat is None or lon is None:
+        raise HTTPException(status_code=400, detail="store_id 또는 lat/lon 을 지정하세요.")
+    return lat, lon
+
+
+@router.get("/nearby", response_model=NearbyStoresResponse)
+async def get_nearby_stores(
+    store_id: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: float = Query(500, gt=0, le=10000),
+    min_risk_score: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """
+    반경 안의 점포 (가까운 순)
+
+    - **store_id** 또는 **lat/lon**: 기준 위치 (store_id 면 자기 자신은 제외)
+    - **radius_m**: 반경 (m, 기본 500)
+    - **min_risk_score**: 위험도 점수 하한 (예: 60 → '높음' 이상 점포만)
+    - **limit**: 반환할 최대 점포 수 (count 는 조건에 맞는 전체 수)
+    """
+    # 첫 조회 시 공간 인덱스를 만들므로 스레드풀에서 (이벤트 루프 비차단)
+    center = await run_in_threadpool(_center, store_id, lat, lon)
+    result = await run_in_threadpool(
+        area_stats.within, *center, radius_m, min_risk_score=min_risk_score, exclude=store_id, limit=limit
+    )
+    return {'center': {'latitude': center[0], 'longitude': center[1]}, 'radiusM': radius_m, **result}
+
+
+@router.get("/nearest", response_model=NearbyStoresResponse)
+async def get_nearest_stores(
+    store_id: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    k: int = Query(10, ge=1, le=200),
+    min_risk_score: Optional[float] = None,
+):
+    """
+    가장 가까운 k개 점포 (k-최근접)
+
+    - **store_id** 또는 **lat/lon**: 기준 위치 (store_id 면 자기 자신은 제외)
+    - **min_risk_score**: 위험도 점수 하한
+    """
+    center = await run_in_threadpool(_center, store_id, lat, lon)
+    result = await run_in_threadpool(area_stats.nearest, *center, k, min_risk_score=min_risk_score, exclude=store_id)
+    return {'center': {'latitude': center[0], 'longitude': center[1]}, 'k': k, **result}
+
+
+@router.get("/trading-areas")
+async def get_trading_areas() -> List[dict]:
+    """상권 목록 (점포 수, 평균 위험도, 고위험 점포 수)"""
+    return await run_in_threadpool(area_stats.trading_areas)
+
+
+@router.get("/trading-area/{trading_area}", response_model=TradingAreaStats)
+async def get_trading_area_stats(trading_area: str):
+    """
+    상권 통계
+
+    - **trading_area**: 상권명 (점포의 business_district, 예: 성수)
+    """
+    stats = await run_in_threadpool(area_stats.trading_area, trading_area)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"상권 {trading_area}을(를) 찾을 수 없습니다.")
+    return stats
+
+
+@router.get("/portfolio", response_model=PortfolioPage)
+async def get_portfolio(
+    sort: str = Query("total_risk_score", pattern="^(total_risk_score|n_critical_violations)$"),
+    order: str = Query("desc", pattern="^(desc|asc)$"),
+    cluster: Optional[List[int]] = Query(None),
+    industry: Optional[List[str]] = Query(None),
+    business_district: Optional[List[str]] = Query(None),
+    min_risk_score: Optional[float] = None,
+    max_risk_score: Optional[float] = None,
+    min_critical_violations: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+):
+    """
+    포트폴리오 조회 (위험도 순위표 / 조건 필터 / 커서 페이지네이션)
+
+    - **sort**: total_risk_score 또는 n_critical_violations (같으면 위험도 → store_id 순), **order**: desc/asc
+    - **cluster / industry / business_district**: 값 필터 (여러 번 지정하면 OR)
+    - **min_risk_score / max_risk_score / min_critical_violations**: 수치 조건
+    - **cursor**: 이전 응답의 nextCursor (데이터를 다시 로드하면 만료 → 400)
+
+    예: `?cluster=7&limit=100` (클러스터 7 위험도 상위 100),
+    `?business_district=성수&min_critical_violations=2&sort=n_critical_violations`
+    """
+    # 첫 조회/데이터 변경 후에는 정렬 인덱스를 다시 만들므로 스레드풀에서 (이벤트 루프 비차단)
+    try:
+        return await run_in_threadpool(
+            portfolio.query,
+            sort=sort, order=order, limit=limit, cursor=cursor,
+            clusters=cluster, industries=industry, districts=business_district,
+            min_risk_score=min_risk_score, max_risk_score=max_risk_score,
+            min_critical_violations=min_critical_violations, with_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
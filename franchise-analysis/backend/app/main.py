@@ -1,12 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import franchise
+from fastapi.responses import PlainTextResponse
+from app.api import franchise, ingest, llm, stats
+from app.services.metrics import render_metrics
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
 
 # 환경 변수 로드
 load_dotenv()
 
+# 로그 레벨 (LOG_LEVEL=DEBUG 일 때만 요청별 상세 덤프 출력)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="가맹점 폐업 위험 분석 API",
@@ -31,6 +41,9 @@ app.add_middleware(
 
 # 라우터 등록
 app.include_router(franchise.router)
+app.include_router(llm.router)
+app.include_router(ingest.router)
+app.include_router(stats.router)
 
 
 @app.get("/")
@@ -45,13 +58,23 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """헬스 체크"""
+    """헬스 체크 (테이블별 로드 상태 포함 - 로드에 실패한 테이블이 있으면 degraded)"""
+    from app.services.data_loader import data_loader
+    tables = data_loader.table_status()
     return {
-        "status": "healthy",
-        "service": "franchise-analysis-api"
+        "status": "degraded" if any(t['state'] == 'error' for t in tables.values()) else "healthy",
+        "service": "franchise-analysis-api",
+        "loadMode": data_loader.load_mode,
+        "tables": tables
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 메트릭 (리포트 단계별/LLM 소요 시간 히스토그램)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.on_event("startup")
 async def startup_event():
     """앱 시작 시 실행"""
@@ -59,19 +82,43 @@ async def startup_event():
     print("🚀 가맹점 분석 API 서버 시작")
     print("=" * 50)
     
-    # 데이터 로더 초기화
+    # 데이터 로더 초기화 (DATA_LOAD_MODE=lazy 면 테이블은 처음 조회할 때 로드)
     from app.services.data_loader import data_loader
+    lazy = data_loader.load_mode == "lazy"
+    if lazy:
+        data_loader.prepare_lazy()
+        print("⏩ 빠른 시작: 테이블은 처음 조회할 때 로드합니다 (/health 에서 테이블별 상태 확인)")
+    else:
+        try:
+            data_loader.load_all()
+        except Exception as e:
+            # 실패한 테이블은 /health 에 error 로 표시되고, 다음 조회 때 다시 로드를 시도
+            print(f"⚠️  데이터 로드 중 오류: {e}")
+    
+    # 증분 적재 델타 재적용 + 다른 워커가 기록한 델타 주기적 반영
+    from app.services.ingestion import delta_ingestor
     try:
-        data_loader.load_store_features()
-        data_loader.load_store_diagnosis_results()
-        data_loader.load_cluster_metadata()
-        data_loader.load_feature_dictionary()
-        data_loader.load_risk_checklist_rules()
-        data_loader.load_store_monthly_timeseries()
-        data_loader.load_sales_predict()
-        print("✅ 모든 데이터 로드 완료")
+        delta_ingestor.sync()
     except Exception as e:
-        print(f"⚠️  데이터 로드 중 오류: {e}")
+        print(f"⚠️  델타 반영 중 오류: {e}")
+    app.state.ingest_task = asyncio.create_task(delta_ingestor.run_polling())
+    
+    # 주변 점포/상권 통계용 공간 인덱스, 포트폴리오 조회용 정렬/값 인덱스 (빠른 시작이면 첫 조회 때 생성)
+    if not lazy:
+        from app.services.area_stats import area_stats
+        from app.services.portfolio import portfolio
+        try:
+            area_stats.build()
+            portfolio.build()
+        except Exception as e:
+            print(f"⚠️  통계 인덱스 생성 중 오류: {e}")
+    
+    # 폐업 예측 시퀀스 모델 (models/ 에 내보낸 산출물이 있을 때만)
+    from app.services.closure_model import closure_model
+    closure_model.load()
+    
+    # 신규 점포 클러스터 배정 모델 (models/ 에 내보낸 스케일러 + 중심점이 있을 때만)
+    data_loader.cluster_assigner.load()
     
     print("=" * 50)
 
@@ -79,6 +126,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """앱 종료 시 실행"""
+    from app.services.llm_service import llm_service
+    ingest_task = getattr(app.state, 'ingest_task', None)
+    if ingest_task is not None:
+        ingest_task.cancel()
+    await llm_service.aclose()
     print("🛑 서버 종료")
 
 
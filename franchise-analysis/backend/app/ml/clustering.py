@@ -0,0 +1,351 @@
+"""
+정적 특성 클러스터링 (static_cluster) - 클러스터 수 탐색 + 최종 학습 + 서빙 산출물 저장
+
+노트북은 K=3..29 를 순서대로 KMeans(n_init=10) 학습하고 매번 전체 O(n²) silhouette_score 를 계산한 뒤
+optimal_k = 12 를 직접 넣었습니다. 여기서는
+- K 후보를 프로세스 풀에서 병렬로 학습 (워커당 BLAS/OpenMP 스레드 1개)
+- 후보 학습은 표본(fit_sample_size)으로, inertia 는 전체 점포, silhouette 은 모든 K 에 같은 표본으로 계산
+- 최종 모델은 전체 점포로 학습한 뒤, 기존 static_cluster 와 겹침이 최대가 되도록 클러스터 번호를 맞춤
+  (cluster_metadata.csv / risk_checklist_rules_2.csv 의 cluster_id 를 그대로 사용하기 위함)
+하고, 결측 대체값/스케일러/중심점을 numpy 배열로 저장합니다 (서빙 시 scikit-learn 불필요).
+
+scikit-learn / scipy 는 학습 함수에서만 import 합니다.
+
+사용법 (backend 디렉토리에서):
+    python -m app.ml.clustering --k-min 3 --k-max 29 --workers 8 --export-dir models \\
+        --assignments static_clusters.csv
+"""
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# 서빙 산출물 파일 이름 (models/)
+CLUSTER_MODEL_FILE = "static_cluster_model.pkl"
+
+# 노트북 Step 1 정적 특성 (입지 4 + 초기 성과 6 + 초기 상대 위치 2 + 고객 인구통계 10 + 고객 유형 4
+# + 업종 임베딩 20 + 상권 인코딩 1)
+STATIC_FEATURES = [
+    'nearest_subway_dist_km_mean', 'subway_500m_count_mean', 'bus_200m_count_mean',
+    'nearest_subway_passengers_mean',
+    'sales_amount_range_first3_mean', 'sales_count_range_first3_mean', 'unique_customers_range_first3_mean',
+    'avg_spending_range_first3_mean', 'cancel_rate_range_first3_mean', 'delivery_sales_ratio_first3_mean',
+    'industry_sales_rank_ratio_first3_mean', 'district_sales_rank_ratio_first3_mean',
+    'male_20_under_ratio_first3_mean', 'male_30_ratio_first3_mean', 'male_40_ratio_first3_mean',
+    'male_50_ratio_first3_mean', 'male_60_over_ratio_first3_mean',
+    'female_20_under_ratio_first3_mean', 'female_30_ratio_first3_mean', 'female_40_ratio_first3_mean',
+    'female_50_ratio_first3_mean', 'female_60_over_ratio_first3_mean',
+    'returning_customer_ratio_mean', 'resident_customer_ratio_mean', 'worker_customer_ratio_mean',
+    'floating_customer_ratio_mean',
+    *[f'industry_emb_{i}' for i in range(1, 21)],
+    'district_rank_encoding',
+]
+DISTRICT_TARGET = 'district_sales_rank_ratio_first3_mean'
+
+
+def district_rank_encoding_map(df: pd.DataFrame) -> Dict[str, float]:
+    """상권별 평균 매출 랭킹 비율 (노트북 Step 0 target encoding)"""
+    if DISTRICT_TARGET not in df.columns or 'business_district' not in df.columns:
+        return {}
+    target = pd.to_numeric(df[DISTRICT_TARGET], errors='coerce')
+    return {str(k): float(v) for k, v in target.groupby(df['business_district']).mean().dropna().items()}
+
+
+def add_district_rank_encoding(df: pd.DataFrame, encoding: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """district_rank_encoding 컬럼 추가 (encoding 미지정 시 df 자체로 계산)"""
+    if 'district_rank_encoding' in df.columns:
+        return df
+    if encoding is None:
+        encoding = district_rank_encoding_map(df)
+    if not encoding or 'business_district' not in df.columns:
+        return df
+    df = df.copy()
+    df['district_rank_encoding'] = df['business_district'].astype(str).map(encoding)
+    return df
+
+
+class StaticFeatureMatrix:
+    """정적 특성 → 결측 중앙값 대체 + 표준화 행렬"""
+
+    def __init__(self, df: pd.DataFrame, features: Sequence[str]):
+        missing = [f for f in features if f not in df.columns]
+        if missing:
+            raise ValueError(f"클러스터링 특성이 없습니다: {missing}")
+        self.features = list(features)
+        values = df[self.features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        self.medians = np.nan_to_num(np.nanmedian(values, axis=0)) if len(values) else np.zeros(len(self.features))
+        values = np.where(np.isnan(values), self.medians, values)
+        self.mean = values.mean(axis=0) if len(values) else np.zeros(len(self.features))
+        scale = values.std(axis=0) if len(values) else np.ones(len(self.features))
+        # StandardScaler 와 같이 분산 0 인 특성은 scale 1
+        self.scale = np.where(scale > 0, scale, 1.0)
+        self.X = (values - self.mean) / self.scale
+
+
+# ---- 병렬 K 탐색 (워커 프로세스 전역: 행렬은 워커 시작 시 1번만 전달) ----
+_worker_state: Dict = {}
+
+
+def _init_worker(X: np.ndarray, fit_rows: np.ndarray, silhouette_rows: np.ndarray, n_init: int, seed: int,
+                 working_memory_mb: int) -> None:
+    _worker_state.update(X=X, fit_rows=fit_rows, silhouette_rows=silhouette_rows, n_init=n_init, seed=seed,
+                         working_memory_mb=working_memory_mb)
+
+
+def _evaluate_k(k: int) -> Dict:
+    """K 1개: 표본으로 KMeans 학습 → 전체 inertia, 표본 silhouette"""
+    from sklearn import config_context
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    from threadpoolctl import threadpool_limits
+
+    state = _worker_state
+    X = state['X']
+    start = time.perf_counter()
+    # silhouette 거리 행렬 조각 크기 제한 (기본 1GB × 워커 수 → 메모리 부족)
+    with threadpool_limits(limits=1), config_context(working_memory=state['working_memory_mb']):
+        model = KMeans(n_clusters=k, random_state=state['seed'], n_init=state['n_init'])
+        model.fit(X[state['fit_rows']])
+        labels = model.predict(X)
+        inertia = -model.score(X)
+        sample = state['silhouette_rows']
+        sample_labels = labels[sample]
+        silhouette = (float(silhouette_score(X[sample], sample_labels))
+                      if len(np.unique(sample_labels)) > 1 else float('nan'))
+    return {'k': k, 'inertia': float(inertia), 'silhouette': silhouette,
+            'seconds': round(time.perf_counter() - start, 2)}
+
+
+def _sample_rows(n: int, size: Optional[int], rng: np.random.Generator) -> np.ndarray:
+    if size is None or size >= n:
+        return np.arange(n)
+    return np.sort(rng.choice(n, size=size, replace=False))
+
+
+def search_k(X: np.ndarray, k_values: Sequence[int], n_init: int = 10, fit_sample_size: Optional[int] = 100_000,
+             silhouette_sample_size: Optional[int] = 10_000, workers: Optional[int] = None,
+             seed: int = 42, working_memory_mb: int = 128) -> List[Dict]:
+    """K 후보별 {k, inertia, silhouette, seconds} (K 오름차순)
+
+    silhouette 은 모든 K 에 같은 표본 행을 써서 K 끼리 비교 가능하게 합니다.
+    """
+    rng = np.random.default_rng(seed)
+    k_values = [k for k in k_values if 2 <= k < len(X)]
+    fit_rows = _sample_rows(len(X), fit_sample_size, rng)
+    silhouette_rows = _sample_rows(len(X), silhouette_sample_size, rng)
+    init_args = (X, fit_rows, silhouette_rows, n_init, seed, working_memory_mb)
+
+    workers = min(workers or os.cpu_count() or 1, len(k_values)) if k_values else 1
+    if workers <= 1:
+        _init_worker(*init_args)
+        results = [_evaluate_k(k) for k in k_values]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            results = list(pool.map(_evaluate_k, k_values))
+    for result in results:
+        print(f"K={result['k']:2d} | Inertia: {result['inertia']:,.0f} | "
+              f"Silhouette: {result['silhouette']:.3f} | {result['seconds']:.1f}s")
+    return results
+
+
+def best_k(results: List[Dict]) -> int:
+    """silhouette 이 가장 높은 K (같으면 작은 K)"""
+    scored = [r for r in results if np.isfinite(r['silhouette'])]
+    if not scored:
+        raise ValueError("silhouette 을 계산할 수 있는 K 가 없습니다.")
+    return max(scored, key=lambda r: (r['silhouette'], -r['k']))['k']
+
+
+def align_labels(labels: np.ndarray, k: int, reference: Optional[np.ndarray]) -> np.ndarray:
+    """새 클러스터 번호 → 기존 static_cluster 번호 (겹치는 점포 수 최대 매칭)
+
+    반환: mapping[새 번호] = 기존 번호. 기존 번호와 짝이 없는 클러스터는 기존 최대 번호 다음부터 부여합니다.
+    """
+    if reference is None:
+        return np.arange(k)
+    from scipy.optimize import linear_sum_assignment
+
+    known = np.isfinite(reference)
+    reference_ids = np.unique(reference[known]).astype(np.int64)
+    contingency = np.zeros((k, len(reference_ids)), dtype=np.int64)
+    np.add.at(contingency, (labels[known], np.searchsorted(reference_ids, reference[known].astype(np.int64))), 1)
+    rows, cols = linear_sum_assignment(-contingency)
+
+    mapping = np.full(k, -1, dtype=np.int64)
+    mapping[rows] = reference_ids[cols]
+    next_id = int(reference_ids.max()) + 1 if len(reference_ids) else 0
+    for label in np.flatnonzero(mapping < 0):
+        mapping[label] = next_id
+        next_id += 1
+    return mapping
+
+
+class StaticClusterModel:
+    """정적 클러스터 모델 (결측 대체값 + 스케일러 + 기존 번호로 정렬한 중심점)"""
+
+    def __init__(self, features: List[str], medians: np.ndarray, mean: np.ndarray, scale: np.ndarray,
+                 centroids: np.ndarray, cluster_ids: np.ndarray, search: Optional[List[Dict]] = None,
+                 district_encoding: Optional[Dict[str, float]] = None):
+        self.features = features
+        self.medians = medians
+        self.mean = mean
+        self.scale = scale
+        self.centroids = centroids        # 표준화 공간, cluster_ids 와 같은 순서
+        self.cluster_ids = cluster_ids
+        self.search = search or []
+        # 학습 시점 상권 인코딩 (신규 점포 몇 곳만으로 다시 계산하면 값이 달라지므로 저장)
+        self.district_encoding = district_encoding or {}
+        self._centroid_norms = (centroids ** 2).sum(axis=1)
+
+    @property
+    def k(self) -> int:
+        return len(self.cluster_ids)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """정적 특성 → 표준화 행렬 (없는 특성/결측은 학습 시 중앙값)"""
+        if 'district_rank_encoding' in self.features:
+            df = add_district_rank_encoding(df, self.district_encoding)
+        values = df.reindex(columns=self.features).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        values = np.where(np.isnan(values), self.medians, values)
+        return (values - self.mean) / self.scale
+
+    def nearest(self, df: pd.DataFrame, chunk_size: int = 65536):
+        """가장 가까운 중심점 → (cluster_id 배열, 표준화 공간 거리 배열)
+
+        ‖x‖² - 2x·c + ‖c‖² 를 chunk_size 행씩 행렬곱 한 번으로 계산합니다.
+        """
+        X = self.transform(df)
+        ids = np.empty(len(X), dtype=self.cluster_ids.dtype)
+        distances = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            chunk = X[start:start + chunk_size]
+            squared = (chunk ** 2).sum(axis=1)[:, None] - 2 * chunk @ self.centroids.T + self._centroid_norms
+            best = np.argmin(squared, axis=1)
+            ids[start:start + len(chunk)] = self.cluster_ids[best]
+            distances[start:start + len(chunk)] = np.sqrt(np.maximum(squared[np.arange(len(chunk)), best], 0))
+        return ids, distances
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """가장 가까운 중심점의 cluster_id"""
+        return self.nearest(df)[0]
+
+    def to_dict(self) -> Dict:
+        return {
+            'features': self.features, 'medians': self.medians, 'mean': self.mean, 'scale': self.scale,
+            'centroids': self.centroids, 'cluster_ids': self.cluster_ids, 'search': self.search,
+            'district_encoding': self.district_encoding,
+        }
+
+    def save(self, models_dir: Path) -> Path:
+        models_dir = Path(models_dir)
+        models_dir.mkdir(parents=True, exist_ok=True)
+        path = models_dir / CLUSTER_MODEL_FILE
+        with open(path, 'wb') as f:
+            pickle.dump(self.to_dict(), f)
+        return path
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StaticClusterModel":
+        return cls(**data)
+
+
+def fit_static_clusters(df: pd.DataFrame, features: Sequence[str] = STATIC_FEATURES, k: Optional[int] = None,
+                        k_values: Sequence[int] = range(3, 30), n_init: int = 10,
+                        fit_sample_size: Optional[int] = 100_000, silhouette_sample_size: Optional[int] = 10_000,
+                        workers: Optional[int] = None, seed: int = 42,
+                        reference_column: str = 'static_cluster') -> StaticClusterModel:
+    """K 탐색(k 미지정 시 silhouette 최대 K) → 전체 점포로 최종 학습 → 기존 번호로 정렬한 모델"""
+    from sklearn.cluster import KMeans
+
+    district_encoding = district_rank_encoding_map(df) if 'district_rank_encoding' in features else {}
+    matrix = StaticFeatureMatrix(add_district_rank_encoding(df, district_encoding), features)
+    print(f"✅ 정적 특성 행렬: {matrix.X.shape[0]:,} 점포 × {matrix.X.shape[1]} 특성")
+
+    search = []
+    if k is None or k_values:
+        start = time.perf_counter()
+        search = search_k(matrix.X, k_values, n_init, fit_sample_size, silhouette_sample_size, workers, seed)
+        print(f"✅ K 탐색 완료: {len(search)}개 후보 ({time.perf_counter() - start:.1f}s)")
+    if k is None:
+        k = best_k(search)
+        print(f"✅ silhouette 최대 K = {k}")
+
+    model = KMeans(n_clusters=k, random_state=seed, n_init=n_init).fit(matrix.X)
+    reference = (pd.to_numeric(df[reference_column], errors='coerce').to_numpy(dtype=np.float64)
+                 if reference_column in df.columns else None)
+    mapping = align_labels(model.labels_, k, reference)
+    if reference is not None:
+        agreement = float(np.mean(mapping[model.labels_] == reference))
+        print(f"✅ 기존 {reference_column} 과 일치율: {agreement:.1%}")
+
+    order = np.argsort(mapping)
+    return StaticClusterModel(matrix.features, matrix.medians, matrix.mean, matrix.scale,
+                              model.cluster_centers_[order], mapping[order], search, district_encoding)
+
+
+def check_cluster_ids(cluster_ids: np.ndarray) -> List[int]:
+    """cluster_metadata / 룰에 없는 cluster_id 목록 (DATA_DIR 의 현재 데이터 기준)"""
+    from app.services.data_loader import data_loader
+
+    known = set(pd.to_numeric(data_loader.load_cluster_metadata()['cluster_id']).astype(int))
+    ruled = {int(c) for c in data_loader.get_rule_engine().cluster_ids()}
+    return [int(c) for c in cluster_ids if int(c) not in known or int(c) not in ruled]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정적 특성 클러스터링 (K 탐색 + static_cluster 재학습)")
+    parser.add_argument("--input", help="점포 특성 CSV (기본: DATA_DIR 의 store_features)")
+    parser.add_argument("--features", help="쉼표로 구분한 특성 목록 (기본: 노트북 정적 특성 47개)")
+    parser.add_argument("--k", type=int, help="최종 K 고정 (기본: 탐색한 K 중 silhouette 최대)")
+    parser.add_argument("--k-min", type=int, default=3)
+    parser.add_argument("--k-max", type=int, default=29)
+    parser.add_argument("--no-search", action="store_true", help="--k 만 학습하고 K 탐색은 생략")
+    parser.add_argument("--n-init", type=int, default=10)
+    parser.add_argument("--fit-sample", type=int, default=100_000, help="K 탐색 학습 표본 수 (0: 전체)")
+    parser.add_argument("--silhouette-sample", type=int, default=10_000, help="silhouette 표본 수 (0: 전체)")
+    parser.add_argument("--workers", type=int, help="K 탐색 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--export-dir", help="서빙 산출물 디렉토리 (예: models)")
+    parser.add_argument("--assignments", help="점포별 static_cluster CSV 저장 경로")
+    args = parser.parse_args()
+    if args.no_search and args.k is None:
+        parser.error("--no-search 에는 --k 가 필요합니다.")
+
+    if args.input:
+        df = pd.read_csv(args.input, dtype={'store_id': str})
+    else:
+        from app.services.data_loader import data_loader
+        df = data_loader.load_store_features()
+    features = [f.strip() for f in args.features.split(',')] if args.features else STATIC_FEATURES
+
+    model = fit_static_clusters(
+        df, features, k=args.k, k_values=[] if args.no_search else range(args.k_min, args.k_max + 1),
+        n_init=args.n_init, fit_sample_size=args.fit_sample or None,
+        silhouette_sample_size=args.silhouette_sample or None, workers=args.workers, seed=args.seed,
+    )
+    # 학습 결과를 먼저 저장 (메타데이터/룰 확인이 실패해도 학습을 다시 돌리지 않도록)
+    if args.export_dir:
+        print(f"✅ 모델 저장: {model.save(Path(args.export_dir))}")
+    if args.assignments:
+        out = pd.DataFrame({'store_id': df['store_id'], 'static_cluster': model.predict(df)})
+        out.to_csv(args.assignments, index=False)
+        print(f"✅ 점포별 클러스터 저장: {args.assignments} ({len(out):,} 점포)")
+
+    try:
+        unknown = check_cluster_ids(model.cluster_ids)
+    except FileNotFoundError as e:
+        print(f"⚠️  cluster_metadata / 룰 파일이 없어 클러스터 번호를 확인하지 못했습니다: {e}")
+    else:
+        if unknown:
+            print(f"⚠️  cluster_metadata / 룰에 없는 클러스터: {unknown} - 메타데이터와 룰을 먼저 추가하세요")
+
+
+if __name__ == "__main__":
+    main()
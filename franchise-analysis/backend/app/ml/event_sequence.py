@@ -0,0 +1,297 @@
+"""
+가맹점 월별 이벤트 시퀀스 생성 (벡터화)
+
+`6_2_추천시스템_모델링.ipynb` 의 `df_merged.apply(generate_event, axis=1)` /
+`generate_event_upgraded` 와 `groupby(...).apply(list)` 를 행 단위 파이썬 호출 없이
+불리언 마스크 연산으로 계산하고, 점포별 시퀀스를 정수 코드 CSR 배열로 만듭니다.
+
+- v1 (generate_event): 한 달에 이벤트 1개 - 발생한 이벤트 이름을 정렬해 '-' 로 결합, 없으면 '일상'
+- v2 (generate_event_upgraded): 한 달에 이벤트 여러 개 - 판정 순서대로 펼침, 없으면 '일상'
+- 폐업 점포(is_closed 가 한 번이라도 True)는 시퀀스 끝에 '폐업' 추가
+
+사용법 (backend 디렉토리에서):
+    python -m app.ml.event_sequence --monthly df_0929_ver_1.csv \\
+        --features 1002_store_features.csv --out sequences.npz --version v2
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DAILY_EVENT = '일상'
+CLOSURE_EVENT = '폐업'
+PAD_CODE = 0
+
+# 이벤트 판정에 필요한 월별 컬럼
+REQUIRED_COLUMNS = [
+    'store_id', 'ref_year_month', 'cluster_id',
+    'industry_sales_rank_ratio', 'district_sales_rank_ratio',
+    'male_20_under_ratio', 'male_30_ratio', 'male_40_ratio', 'female_30_ratio',
+    'returning_customer_ratio', 'delivery_sales_ratio',
+    'industry_closure_ratio', 'district_closure_ratio',
+]
+
+
+def prepare_monthly_frame(monthly: pd.DataFrame, store_features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """노트북의 병합/전처리 단계 재현
+
+    1. store_features 의 static_cluster 를 cluster_id 로 병합 (monthly 에 cluster_id 가 없을 때)
+    2. month_order = 점포별 누적 순번 - 노트북과 같이 정렬 *전* 원본 행 순서 기준
+    3. (store_id, ref_year_month) 정렬 후 rank_change / district_rank_change 계산
+    """
+    df = monthly
+    if 'cluster_id' not in df.columns:
+        if store_features is None:
+            raise ValueError("cluster_id 컬럼이 없으면 store_features(static_cluster) 가 필요합니다.")
+        clusters = store_features[['store_id', 'static_cluster']].rename(columns={'static_cluster': 'cluster_id'})
+        df = df.merge(clusters, on='store_id', how='left')
+    else:
+        df = df.copy()
+
+    df['month_order'] = df.groupby('store_id').cumcount() + 1
+    df = df.sort_values(by=['store_id', 'ref_year_month'])
+    df['rank_change'] = df.groupby('store_id')['industry_sales_rank_ratio'].diff()
+    df['district_rank_change'] = df.groupby('store_id')['district_sales_rank_ratio'].diff()
+    return df
+
+
+def _columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """판정용 float64 배열 (NaN 비교는 항상 False → 노트북의 행 단위 비교와 동일)"""
+    names = REQUIRED_COLUMNS[2:] + ['month_order', 'rank_change', 'district_rank_change']
+    missing = [name for name in names if name not in df.columns]
+    if missing:
+        raise ValueError(f"이벤트 판정에 필요한 컬럼이 없습니다: {missing}")
+    return {
+        name: pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        for name in names
+    }
+
+
+def event_flags_v1(df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """generate_event 의 이벤트별 발생 마스크 → (이벤트 이름 목록, n_rows × n_events bool)"""
+    c = _columns(df)
+    cluster = c['cluster_id']
+    rank_change = c['rank_change']
+    district_rank_change = c['district_rank_change']
+    with np.errstate(invalid='ignore'):
+        flags = [
+            ('업종내순위_악화', rank_change > 5),
+            # elif: 악화가 아닐 때만 개선 판정 (두 조건은 동시에 참일 수 없음)
+            ('업종내순위_개선', rank_change < -5),
+            ('C0_핵심고객_이탈', (cluster == 0) & (c['male_40_ratio'] < 9.0)),
+            ('C2_초기우위_상실의심', (cluster == 2) & (district_rank_change > 15)),
+            ('C3_고객구성_왜곡', (cluster == 3) & (c['male_30_ratio'] > 20.0)),
+            ('C5_초기핵심고객_부재', (cluster == 5) & (c['month_order'] <= 3) & (c['female_30_ratio'] < 14.0)),
+            ('C5_단골확보_실패', (cluster == 5) & (c['month_order'] > 6) & (c['returning_customer_ratio'] < 25.0)),
+            ('C7_내부경쟁력_상실의심', (cluster == 7) & (c['industry_closure_ratio'] < 15.5)),
+            ('C8_상권적응_실패의심', (cluster == 8) & (c['district_closure_ratio'] < 5.0) & (rank_change > 5)),
+            ('C9_운영_변동성_과다', (cluster == 9) & (np.abs(district_rank_change) > 20)),
+            ('C10_타겟고객_설정오류', (cluster == 10) & (c['male_20_under_ratio'] > 20.0)),
+        ]
+    return [name for name, _ in flags], np.column_stack([mask for _, mask in flags])
+
+
+def event_flags_v2(df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """generate_event_upgraded 의 이벤트별 발생 마스크 (열 순서 = 노트북의 append 순서)"""
+    c = _columns(df)
+    cluster = c['cluster_id']
+    month_order = c['month_order']
+    rank_change = c['rank_change']
+    district_rank_change = c['district_rank_change']
+    with np.errstate(invalid='ignore'):
+        flags = [
+            ('업종내순위_대폭악화', rank_change > 15),
+            ('업종내순위_소폭악화', ~(rank_change > 15) & (rank_change > 5)),
+            ('상권내순위_대폭악화', district_rank_change > 15),
+            ('상권내순위_소폭악화', ~(district_rank_change > 15) & (district_rank_change > 5)),
+            ('C0_핵심고객_이탈', (cluster == 0) & (c['male_40_ratio'] < 9.0)),
+            ('C0_주변상권_위험', (cluster == 0) & (c['district_closure_ratio'] > 9.0)),
+            ('C2_초기우위_상실의심', (cluster == 2) & (month_order <= 6) & (district_rank_change > 15)),
+            ('C2_고객기반_부실', (cluster == 2) & (c['female_30_ratio'] < 10.0)),
+            ('C3_고객구성_왜곡', (cluster == 3) & (c['male_30_ratio'] > 15.0)),
+            ('C5_초기핵심고객_부재', (cluster == 5) & (month_order <= 3) & (c['female_30_ratio'] < 14.0)),
+            ('C5_단골확보_실패', (cluster == 5) & (month_order > 6) & (c['returning_customer_ratio'] < 25.0)),
+            ('C5_경쟁력_악화', (cluster == 5) & (rank_change > 0)),
+            ('C7_내부역량_부족의심', (cluster == 7) & (c['industry_closure_ratio'] < 16.0) & (rank_change > 0)),
+            ('C8_상권적응_실패의심', (cluster == 8) & (c['district_closure_ratio'] < 5.0) & (rank_change > 5)),
+            ('C9_운영_변동성_과다', (cluster == 9) & (np.abs(district_rank_change) > 20)),
+            ('C9_상권_불안정', (cluster == 9) & (c['district_closure_ratio'] > 10.0)),
+            ('C10_타겟고객_설정오류', (cluster == 10) & (c['male_20_under_ratio'] > 20.0)),
+            ('C10_배달경쟁력_부족', (cluster == 10) & (c['delivery_sales_ratio'] < 30.0)),
+        ]
+    return [name for name, _ in flags], np.column_stack([mask for _, mask in flags])
+
+
+class EventSequences:
+    """점포별 이벤트 시퀀스 (CSR: 점포 i 의 코드 = codes[offsets[i]:offsets[i+1]])
+
+    vocab[0] 은 패딩용 빈 문자열, event2idx 는 노트북과 같이 1부터 시작합니다.
+    """
+
+    def __init__(self, store_ids: np.ndarray, offsets: np.ndarray, codes: np.ndarray, vocab: List[str]):
+        self.store_ids = store_ids
+        self.offsets = offsets
+        self.codes = codes
+        self.vocab = vocab
+        self.event2idx = {event: i for i, event in enumerate(vocab) if i != PAD_CODE}
+
+    def __len__(self) -> int:
+        return len(self.store_ids)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def vocab_size(self) -> int:
+        """패딩 포함 사전 크기 (Embedding input_dim)"""
+        return len(self.vocab)
+
+    @property
+    def closure_idx(self) -> int:
+        return self.event2idx.get(CLOSURE_EVENT, -1)
+
+    def sequence(self, i: int) -> np.ndarray:
+        return self.codes[self.offsets[i]:self.offsets[i + 1]]
+
+    def decode(self, i: int) -> List[str]:
+        return [self.vocab[code] for code in self.sequence(i)]
+
+    def to_lists(self) -> List[List[str]]:
+        """노트북 sequences['event_sequence'] 와 같은 문자열 리스트 목록"""
+        return [self.decode(i) for i in range(len(self))]
+
+    def padded(self, max_len: Optional[int] = None) -> np.ndarray:
+        """pad_sequences(padding='pre', truncating='pre') 와 같은 앞쪽 패딩 행렬"""
+        lengths = self.lengths
+        if max_len is None:
+            max_len = int(lengths.max()) if len(lengths) else 0
+        out = np.full((len(self), max_len), PAD_CODE, dtype=self.codes.dtype)
+        kept = np.minimum(lengths, max_len)
+        rows = np.repeat(np.arange(len(self)), kept)
+        # 뒤에서부터 kept 개만 남김 (truncating='pre')
+        within = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+        src = np.repeat(self.offsets[1:] - kept, kept) + within
+        cols = np.repeat(max_len - kept, kept) + within
+        out[rows, cols] = self.codes[src]
+        return out
+
+    def save(self, path: Path) -> None:
+        np.savez_compressed(
+            path, store_ids=self.store_ids.astype(str), offsets=self.offsets,
+            codes=self.codes, vocab=np.array(self.vocab, dtype=str)
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "EventSequences":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['store_ids'].astype(object), data['offsets'], data['codes'], data['vocab'].tolist())
+
+
+def _build_vocab(events: List[str], vocab: Optional[List[str]]) -> List[str]:
+    """기존 사전이 있으면 유지하고 새 이벤트만 뒤에 추가, 없으면 정렬 순서로 생성"""
+    if vocab is None:
+        return [''] + sorted(set(events))
+    known = set(vocab)
+    return list(vocab) + sorted(set(event for event in events if event not in known))
+
+
+def build_event_sequences(df: pd.DataFrame, version: str = 'v1',
+                          closed_stores: Optional[set] = None,
+                          vocab: Optional[List[str]] = None) -> EventSequences:
+    """prepare_monthly_frame 결과 → 점포별 인코딩 시퀀스
+
+    Args:
+        df: (store_id, ref_year_month) 로 정렬된 월별 데이터
+        version: 'v1' (generate_event) / 'v2' (generate_event_upgraded)
+        closed_stores: 폐업 점포 ID 집합 (없으면 df['is_closed'] 가 True 인 점포)
+        vocab: 재학습 시 기존 모델의 사전 (코드 유지)
+    """
+    if version not in ('v1', 'v2'):
+        raise ValueError(f"알 수 없는 이벤트 버전: {version}")
+    if closed_stores is None:
+        closed_stores = set(df.loc[df['is_closed'] == True, 'store_id']) if 'is_closed' in df.columns else set()  # noqa: E712
+
+    names, flags = event_flags_v1(df) if version == 'v1' else event_flags_v2(df)
+    n_rows = len(df)
+
+    if version == 'v1':
+        # 이벤트 조합(비트마스크)별로 한 번만 라벨 생성 - '-'.join(sorted(events))
+        bits = (flags.astype(np.int64) << np.arange(len(names), dtype=np.int64)).sum(axis=1)
+        unique_bits, row_combo = np.unique(bits, return_inverse=True)
+        labels = [
+            '-'.join(sorted(names[k] for k in range(len(names)) if b >> k & 1)) or DAILY_EVENT
+            for b in unique_bits
+        ]
+        row_events = labels
+        row_event_idx = row_combo.reshape(-1)
+        row_counts = np.ones(n_rows, dtype=np.int64)
+    else:
+        # 이벤트가 없는 달은 '일상' 1개, 있으면 판정 순서대로 펼침
+        flags = np.column_stack([flags, ~flags.any(axis=1)])
+        row_events = names + [DAILY_EVENT]
+        rows, row_event_idx = np.nonzero(flags)  # 행 우선 → 같은 행 안에서는 append 순서
+        row_counts = np.bincount(rows, minlength=n_rows)
+
+    # 점포 경계 (정렬되어 있으므로 연속 구간)
+    store_codes, store_ids = pd.factorize(df['store_id'], sort=False)
+    store_ids = np.asarray(store_ids, dtype=object)
+    n_stores = len(store_ids)
+    events_per_store = np.bincount(store_codes, weights=row_counts, minlength=n_stores).astype(np.int64)
+
+    is_closed = np.isin(store_ids, list(closed_stores)) if closed_stores else np.zeros(n_stores, dtype=bool)
+    vocab = _build_vocab(row_events + ([CLOSURE_EVENT] if is_closed.any() else []), vocab)
+    event2idx = {event: i for i, event in enumerate(vocab)}
+    event_codes = np.array([event2idx[event] for event in row_events], dtype=np.int32)
+
+    lengths = events_per_store + is_closed
+    offsets = np.zeros(n_stores + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    codes = np.empty(offsets[-1], dtype=np.int32)
+    # 원래 이벤트는 점포 구간 앞쪽에, 폐업 점포는 마지막 칸에 '폐업'
+    shift = np.repeat(offsets[:-1] - np.concatenate([[0], np.cumsum(events_per_store)[:-1]]), events_per_store)
+    codes[np.arange(len(row_event_idx)) + shift] = event_codes[row_event_idx]
+    if is_closed.any():
+        codes[offsets[1:][is_closed] - 1] = event2idx[CLOSURE_EVENT]
+
+    # groupby('store_id') 와 같은 점포 ID 정렬 순서
+    order = np.argsort(store_ids.astype(str), kind='stable')
+    if not np.array_equal(order, np.arange(n_stores)):
+        new_lengths = lengths[order]
+        new_offsets = np.zeros(n_stores + 1, dtype=np.int64)
+        np.cumsum(new_lengths, out=new_offsets[1:])
+        src = np.repeat(offsets[:-1][order], new_lengths) + (
+            np.arange(new_offsets[-1]) - np.repeat(new_offsets[:-1], new_lengths)
+        )
+        codes, offsets, store_ids = codes[src], new_offsets, store_ids[order]
+
+    return EventSequences(store_ids, offsets, codes, vocab)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="월별 데이터 → 점포별 이벤트 시퀀스(npz)")
+    parser.add_argument("--monthly", required=True, help="월별 점포 데이터 CSV (df_0929_ver_1.csv)")
+    parser.add_argument("--features", help="점포 특성 CSV (static_cluster 병합용)")
+    parser.add_argument("--version", choices=['v1', 'v2'], default='v1')
+    parser.add_argument("--vocab-from", help="기존 시퀀스 npz - 사전(코드)을 그대로 유지")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    monthly = pd.read_csv(args.monthly)
+    features = pd.read_csv(args.features) if args.features else None
+    df = prepare_monthly_frame(monthly, features)
+    vocab = EventSequences.load(Path(args.vocab_from)).vocab if args.vocab_from else None
+    sequences = build_event_sequences(df, version=args.version, vocab=vocab)
+    sequences.save(Path(args.out))
+    print(f"✅ {len(sequences):,} 점포, {len(sequences.codes):,} 이벤트, 사전 {sequences.vocab_size}개 "
+          f"({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+업종 임베딩 (industry_emb_1..20) - 배치 호출 + 디스크 캐시 + 저장된 PCA 투영
+
+노트북은 고유 업종마다 Upstage 임베딩 API 를 한 번씩 순서대로 호출하고(재실행 시 전부 다시 호출)
+PCA(n_components=20) 로 줄여 industry_emb_* 컬럼을 만들었습니다. 여기서는
+- 캐시에 없는 업종만 batch_size 개씩 묶어 한 요청으로 임베딩
+- 벡터는 (모델 이름, 업종) 키로 SQLite 에 float32 로 저장 → 재실행/재학습 시 API 호출 없음
+- PCA 평균/주성분을 models/ 에 저장 → 새 업종은 임베딩 1번 + 저장된 투영으로 바로 컬럼 생성 (재학습 없음)
+합니다. provider 는 교체 가능하며, API 키 없이 쓰는 결정적 로컬 해시 임베딩(hashing)을 포함합니다.
+
+openai 패키지는 upstage provider 를 쓸 때만 import 합니다.
+
+사용법 (backend 디렉토리에서):
+    # Upstage 임베딩 → PCA 학습 → models/ 저장 + 점포별 industry_emb_* CSV
+    python -m app.ml.industry_embedding --provider upstage --export-dir models --output industry_embeddings.csv
+
+    # 저장된 투영으로 새 업종만 임베딩 (PCA 재학습 없음)
+    python -m app.ml.industry_embedding --provider upstage --projection models --output industry_embeddings.csv
+"""
+import abc
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# 서빙 산출물 파일 이름 (models/)
+EMBEDDING_PROJECTION_FILE = "industry_embedding_projection.pkl"
+EMBEDDING_PREFIX = 'industry_emb_'
+DEFAULT_COMPONENTS = 20   # 노트북 PCA(n_components=20)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / "cache" / "industry_embeddings.sqlite3"
+
+
+class EmbeddingProvider(abc.ABC):
+    """텍스트 목록 → (len(texts), dim) 벡터 (한 번의 호출 = 한 배치)"""
+
+    name = "base"
+    model = ""
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """texts 를 한 배치로 임베딩"""
+
+
+class UpstageProvider(EmbeddingProvider):
+    """Upstage 임베딩 API (OpenAI 호환 클라이언트, 노트북과 같은 embedding-query 모델)"""
+
+    name = "upstage"
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None,
+                 base_url: Optional[str] = None, timeout: float = 60):
+        self.model = model or os.getenv("EMBEDDING_MODEL", "embedding-query")
+        self.api_key = api_key or os.getenv("UPSTAGE_API_KEY")
+        self.base_url = base_url or os.getenv("EMBEDDING_BASE_URL", "https://api.upstage.ai/v1")
+        self.timeout = timeout
+        self._client = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self._client is None:
+            if not self.api_key:
+                raise RuntimeError("UPSTAGE_API_KEY 가 설정되지 않았습니다. (오프라인: --provider hashing)")
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout)
+        response = self._client.embeddings.create(input=texts, model=self.model)
+        # 응답 순서가 입력 순서와 다를 수 있어 index 로 정렬
+        data = sorted(response.data, key=lambda d: d.index)
+        return np.asarray([d.embedding for d in data], dtype=np.float32)
+
+
+class HashingProvider(EmbeddingProvider):
+    """결정적 로컬 임베딩 (API 키 없이 개발/테스트용)
+
+    글자 1~3-gram 을 sha1 로 dim 개 버킷에 부호와 함께 더한 뒤 L2 정규화합니다.
+    같은 텍스트는 항상 같은 벡터이고, 글자를 공유하는 업종(예: 한식-육류, 한식-면요리)은 가깝게 놓입니다.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 256, ngram_range=(1, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model = f"hashing-{dim}-{ngram_range[0]}{ngram_range[1]}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {text.strip()} "
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(padded) - n + 1):
+                digest = hashlib.sha1(padded[i:i + n].encode('utf-8')).digest()
+                bucket = int.from_bytes(digest[:4], 'little') % self.dim
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._vector(t) for t in texts])
+
+
+PROVIDERS = {'upstage': UpstageProvider, 'hashing': HashingProvider}
+
+
+def get_provider(name: str, model: Optional[str] = None) -> EmbeddingProvider:
+    if name not in PROVIDERS:
+        raise ValueError(f"알 수 없는 임베딩 provider: {name} (가능: {', '.join(PROVIDERS)})")
+    if name == 'upstage':
+        return UpstageProvider(model=model)
+    return HashingProvider()
+
+
+class EmbeddingCache:
+    """임베딩 디스크 캐시 (SQLite, 키 = (provider 모델 이름, 텍스트) 해시, 값 = float32 bytes)"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        payload = json.dumps([model, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, text TEXT NOT NULL, "
+                "dim INTEGER NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """캐시에 있는 텍스트만 {텍스트: 벡터}"""
+        keys = {self.make_key(model, t): t for t in texts}
+        found: Dict[str, np.ndarray] = {}
+        key_list = list(keys)
+        with self._lock:
+            db = self._db()
+            # SQLite 변수 개수 제한(999) 아래로 나눠 조회
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[keys[key]] = np.frombuffer(blob, dtype=np.float32)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: np.ndarray) -> None:
+        now = time.time()
+        rows = [(self.make_key(model, t), model, t, int(v.shape[0]), np.asarray(v, dtype=np.float32).tobytes(), now)
+                for t, v in zip(texts, vectors)]
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, text, dim, vector, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            db.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            try:
+                entries = self._db().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+
+def embed_texts(texts: Sequence[str], provider: EmbeddingProvider, cache: Optional[EmbeddingCache] = None,
+                batch_size: int = 64) -> np.ndarray:
+    """텍스트 목록 → float32 행렬 (입력 순서, 중복 텍스트는 한 번만 임베딩)
+
+    캐시에 없는 텍스트만 batch_size 개씩 provider 에 요청하고, 받은 배치는 바로 캐시에 저장합니다
+    (중간에 실패해도 이미 받은 배치는 다음 실행에서 재사용).
+    """
+    unique = list(dict.fromkeys(texts))
+    vectors = cache.get_many(provider.model, unique) if cache is not None else {}
+    missing = [t for t in unique if t not in vectors]
+
+    if missing:
+        start = time.perf_counter()
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            embedded = provider.embed(batch)
+            if len(embedded) != len(batch):
+                raise RuntimeError(f"임베딩 응답 개수 불일치: 요청 {len(batch)}개, 응답 {len(embedded)}개")
+            if cache is not None:
+                cache.put_many(provider.model, batch, embedded)
+            vectors.update(zip(batch, embedded))
+        print(f"✅ 업종 임베딩: {len(missing)}개 새로 계산 ({-(-len(missing) // batch_size)}회 요청, "
+              f"{time.perf_counter() - start:.1f}s), 캐시 재사용 {len(unique) - len(missing)}개")
+
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([vectors[t] for t in texts]).astype(np.float32, copy=False)
+
+
+class IndustryProjection:
+    """임베딩 → industry_emb_1..n (PCA 평균 + 주성분, provider 모델 이름과 함께 저장)"""
+
+    def __init__(self, model: str, mean: np.ndarray, components: np.ndarray,
+                 explained_variance_ratio: Optional[np.ndarray] = None, industries: Optional[List[str]] = None):
+        self.model = model
+        self.mean = mean
+        self.components = components          # (n_components, dim)
+        self.explained_variance_ratio = explained_variance_ratio
+        self.industries = industries or []    # 학습에 쓴 업종
+
+    @property
+    def n_components(self) -> int:
+        return len(self.components)
+
+    @property
+    def columns(self) -> List[str]:
+        return [f'{EMBEDDING_PREFIX}{i + 1}' for i in range(self.n_components)]
+
+    @classmethod
+    def fit(cls, model: str, matrix: np.ndarray, n_components: int = DEFAULT_COMPONENTS,
+            industries: Optional[List[str]] = None) -> "IndustryProjection":
+        """PCA (전체 SVD, 부호는 각 주성분의 절댓값 최대 성분이 양수가 되도록 고정해 재학습 간 결정적)"""
+        X = np.asarray(matrix, dtype=np.float64)
+        n_components = min(n_components, *X.shape)
+        mean = X.mean(axis=0)
+        _, singular, vt = np.linalg.svd(X - mean, full_matrices=False)
+        components = vt[:n_components]
+        signs = np.sign(components[np.arange(n_components), np.abs(components).argmax(axis=1)])
+        components = components * np.where(signs == 0, 1, signs)[:, None]
+        variance = singular ** 2
+        ratio = variance[:n_components] / variance.sum() if variance.sum() > 0 else np.zeros(n_components)
+        return cls(model, mean.astype(np.float32), components.astype(np.float32), ratio, industries)
+
+    def transform(self, matrix: np.ndarray) -> np.ndarray:
+        return ((np.asarray(matrix, dtype=np.float32) - self.mean) @ self.components.T).astype(np.float32)
+
+    def to_dict(self) -> Dict:
+        return {
+            'model': self.model, 'mean': self.mean, 'components': self.components,
+            'explained_variance_ratio': self.explained_variance_ratio, 'industries': self.industries,
+        }
+
+    def save(self, models_dir: Path) -> Path:
+        models_dir = Path(models_dir)
+        models_dir.mkdir(parents=True, exist_ok=True)
+        path = models_dir / EMBEDDING_PROJECTION_FILE
+        with open(path, 'wb') as f:
+            pickle.dump(self.to_dict(), f)
+        return path
+
+    @classmethod
+    def load(cls, models_dir: Path) -> "IndustryProjection":
+        with open(Path(models_dir) / EMBEDDING_PROJECTION_FILE, 'rb') as f:
+            return cls(**pickle.load(f))
+
+
+class IndustryEmbedder:
+    """업종명 → industry_emb_* (provider + 캐시 + 투영)"""
+
+    def __init__(self, provider: EmbeddingProvider, cache: Optional[EmbeddingCache] = None,
+                 projection: Optional[IndustryProjection] = None, batch_size: int = 64):
+        self.provider = provider
+        self.cache = cache
+        self.projection = projection
+        self.batch_size = batch_size
+        if projection is not None and projection.model != provider.model:
+            raise ValueError(f"투영은 '{projection.model}' 임베딩으로 학습되었습니다 (현재 provider: '{provider.model}')")
+
+    def vectors(self, industries: Sequence[str]) -> np.ndarray:
+        return embed_texts(industries, self.provider, self.cache, self.batch_size)
+
+    def fit(self, industries: Sequence[str], n_components: int = DEFAULT_COMPONENTS) -> IndustryProjection:
+        """고유 업종 임베딩으로 PCA 학습"""
+        unique = sorted({str(i) for i in industries if pd.notna(i)})
+        self.projection = IndustryProjection.fit(self.provider.model, self.vectors(unique), n_components, unique)
+        explained = float(np.sum(self.projection.explained_variance_ratio))
+        print(f"✅ PCA 학습: 업종 {len(unique)}개 × {self.projection.components.shape[1]}차원 → "
+              f"{self.projection.n_components}차원 (설명 분산 {explained:.1%})")
+        return self.projection
+
+    def transform(self, industries: Sequence[str]) -> pd.DataFrame:
+        """업종명 목록 → industry_emb_* DataFrame (업종 인덱스, 새 업종도 저장된 투영으로 변환)"""
+        if self.projection is None:
+            raise RuntimeError("PCA 투영이 없습니다. fit() 하거나 저장된 투영을 로드하세요.")
+        unique = sorted({str(i) for i in industries if pd.notna(i)})
+        reduced = self.projection.transform(self.vectors(unique)) if unique else \
+            np.zeros((0, self.projection.n_components), dtype=np.float32)
+        return pd.DataFrame(reduced, index=pd.Index(unique, name='industry'), columns=self.projection.columns)
+
+    def add_columns(self, df: pd.DataFrame, column: str = 'industry') -> pd.DataFrame:
+        """점포 DataFrame 에 industry_emb_* 컬럼 추가 (업종 결측은 NaN → 클러스터 모델에서 중앙값)"""
+        table = self.transform(df[column].dropna().unique())
+        codes = table.index.get_indexer(df[column].astype(str).where(df[column].notna()))
+        values = np.full((len(df), len(table.columns)), np.nan, dtype=np.float32)
+        found = codes >= 0
+        values[found] = table.to_numpy()[codes[found]]
+        df = df.drop(columns=[c for c in table.columns if c in df.columns])
+        return pd.concat([df, pd.DataFrame(values, index=df.index, columns=table.columns)], axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업종 임베딩 (배치 + 디스크 캐시 + PCA 투영)")
+    parser.add_argument("--input", help="점포 특성 CSV (기본: DATA_DIR 의 store_features)")
+    parser.add_argument("--column", default="industry", help="업종 컬럼 이름")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="upstage")
+    parser.add_argument("--model", help="임베딩 모델 (upstage 기본: EMBEDDING_MODEL 또는 embedding-query)")
+    parser.add_argument("--batch-size", type=int, default=64, help="요청 1회당 업종 수")
+    parser.add_argument("--cache", default=os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+                        help="임베딩 캐시 SQLite 경로")
+    parser.add_argument("--n-components", type=int, default=DEFAULT_COMPONENTS)
+    parser.add_argument("--projection", help="저장된 투영 디렉토리 (지정 시 PCA 재학습 없이 변환만)")
+    parser.add_argument("--export-dir", help="학습한 투영 저장 디렉토리 (예: models)")
+    parser.add_argument("--vectors", help="원본 임베딩 행렬 저장 경로 (.npz: industries, vectors)")
+    parser.add_argument("--output", help="점포별 store_id + industry_emb_* CSV 저장 경로")
+    args = parser.parse_args()
+
+    if args.input:
+        df = pd.read_csv(args.input, dtype={'store_id': str})
+    else:
+        from app.services.data_loader import data_loader
+        df = data_loader.load_store_features()
+    if args.column not in df.columns:
+        parser.error(f"업종 컬럼이 없습니다: {args.column}")
+
+    projection = IndustryProjection.load(Path(args.projection)) if args.projection else None
+    embedder = IndustryEmbedder(get_provider(args.provider, args.model), EmbeddingCache(Path(args.cache)),
+                                projection, args.batch_size)
+    if projection is None:
+        embedder.fit(df[args.column])
+        if args.export_dir:
+            print(f"✅ 투영 저장: {embedder.projection.save(Path(args.export_dir))}")
+    else:
+        new = sorted(set(df[args.column].dropna().astype(str)) - set(projection.industries))
+        print(f"✅ 저장된 투영 사용: {projection.n_components}차원, 학습 이후 새 업종 {len(new)}개")
+
+    if args.vectors:
+        industries = sorted(set(df[args.column].dropna().astype(str)))
+        np.savez(args.vectors, industries=np.array(industries), vectors=embedder.vectors(industries))
+        print(f"✅ 임베딩 행렬 저장: {args.vectors}")
+    if args.output:
+        out = embedder.add_columns(df[['store_id', args.column]], args.column).drop(columns=[args.column])
+        out.to_csv(args.output, index=False)
+        print(f"✅ 점포별 업종 임베딩 저장: {args.output} ({len(out):,} 점포)")
+    print(f"ℹ️  캐시: {embedder.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+다음 이벤트 예측 모델(GRU / Transformer) 학습용 윈도우 생성
+
+노트북은 `seq[:i]` prefix 를 파이썬 리스트 X/y 에 모두 쌓은 뒤 pad_sequences 를 호출해
+(점포 수 × 길이²) 개의 객체가 만들어집니다. 여기서는 점포별 시퀀스를 앞쪽 0 패딩과 함께
+하나의 1차원 버퍼에 놓고 sliding_window_view(복사 없는 strided view) 로 prefix 윈도우를 만든 뒤,
+배치마다 필요한 윈도우만 복사합니다. 학습 쌍은 노트북과 같습니다
+(패딩으로 시작하는 시퀀스는 빈 prefix → 첫 이벤트 쌍 포함).
+
+검증 세트는 노트북의 validation_split(마지막 20% 쌍)과 달리 점포 단위로 나눕니다.
+TensorFlow 는 모델/학습 함수에서만 import 합니다.
+
+사용법 (backend 디렉토리에서):
+    python -m app.ml.training_windows --sequences sequences.npz --model gru --out gru.keras \\
+        --export-dir models
+"""
+import argparse
+import itertools
+import pickle
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.ml.event_sequence import CLOSURE_EVENT, PAD_CODE, EventSequences
+
+
+# 서빙 산출물 파일 이름 (app.services.closure_model 이 models/ 에서 로드)
+META_FILE = "closure_meta.pkl"
+GRU_WEIGHTS_FILE = "closure_gru.npz"
+KERAS_MODEL_FILE = "closure_model.keras"
+SEQUENCES_FILE = "event_sequences.npz"
+
+
+class TrainingWindows:
+    """EventSequences → (X, y) prefix 윈도우 (X 는 max_len 길이 앞쪽 패딩)"""
+
+    def __init__(self, sequences: EventSequences, max_len: Optional[int] = None):
+        lengths = sequences.lengths
+        if max_len is None:
+            max_len = int(lengths.max()) if len(lengths) else 0
+        self.sequences = sequences
+        self.max_len = max_len
+
+        # pad_sequences(truncating='pre') 와 같이 점포별 마지막 max_len 개만 사용
+        kept = np.minimum(lengths, max_len)
+        code_start = sequences.offsets[1:] - kept
+
+        # 점포 블록 = [0 × max_len][코드 kept 개] → 블록 안 어느 위치에서 윈도우를 잘라도 앞쪽은 0
+        block_len = max_len + kept
+        block_start = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(block_len, out=block_start[1:])
+        buffer = np.full(block_start[-1], PAD_CODE, dtype=sequences.codes.dtype)
+        within = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+        buffer[np.repeat(block_start[:-1] + max_len, kept) + within] = \
+            sequences.codes[np.repeat(code_start, kept) + within]
+        self._buffer = buffer
+        self._windows = sliding_window_view(buffer, max_len) if max_len else buffer[:0].reshape(0, 0)
+
+        # 목표 이벤트 t (블록 내 코드 순번) 의 입력 = 블록[t : t + max_len]
+        # 노트북: 패딩된 시퀀스의 i >= 1 위치만 목표 → 패딩 없이 꽉 찬 시퀀스는 첫 이벤트 제외
+        first_target = (kept == max_len).astype(np.int64)
+        n_pairs = kept - first_target
+        self.pair_store = np.repeat(np.arange(len(lengths)), n_pairs)
+        local = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs) \
+            + np.repeat(first_target, n_pairs)
+        self.pair_start = np.repeat(block_start[:-1], n_pairs) + local
+
+    def __len__(self) -> int:
+        return len(self.pair_start)
+
+    @property
+    def nbytes(self) -> int:
+        """윈도우 인덱스 + 버퍼 메모리 (X 전체를 만들 때는 len × max_len × itemsize)"""
+        return self._buffer.nbytes + self.pair_start.nbytes + self.pair_store.nbytes
+
+    def targets(self, pairs: Optional[np.ndarray] = None) -> np.ndarray:
+        starts = self.pair_start if pairs is None else self.pair_start[pairs]
+        return self._buffer[starts + self.max_len]
+
+    def inputs(self, pairs: Optional[np.ndarray] = None) -> np.ndarray:
+        """윈도우 복사본 (배치 단위로 호출)"""
+        starts = self.pair_start if pairs is None else self.pair_start[pairs]
+        return self._windows[starts]
+
+    def split(self, val_fraction: float = 0.2, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """점포 단위 train/validation 분할 → (train 쌍 인덱스, val 쌍 인덱스)
+
+        같은 점포의 prefix 가 양쪽에 섞이지 않도록 점포를 먼저 나눕니다.
+        """
+        n_stores = len(self.sequences)
+        rng = np.random.default_rng(seed)
+        is_val = np.zeros(n_stores, dtype=bool)
+        is_val[rng.permutation(n_stores)[:int(round(n_stores * val_fraction))]] = True
+        pair_is_val = is_val[self.pair_store]
+        return np.flatnonzero(~pair_is_val), np.flatnonzero(pair_is_val)
+
+    def batches(self, pairs: np.ndarray, batch_size: int = 64, shuffle: bool = True,
+                seed: int = 0) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(X, y) 배치 스트림 - 한 번에 batch_size × max_len 만 메모리에 올림"""
+        order = np.random.default_rng(seed).permutation(pairs) if shuffle else pairs
+        for i in range(0, len(order), batch_size):
+            batch = order[i:i + batch_size]
+            yield self.inputs(batch), self.targets(batch)
+
+    def dataset(self, pairs: np.ndarray, batch_size: int = 64, shuffle: bool = True, seed: int = 0):
+        """tf.data.Dataset (에폭마다 다른 순서로 섞음) - model.fit 에 그대로 전달"""
+        import tensorflow as tf
+
+        epoch = itertools.count()
+
+        def generator():
+            yield from self.batches(pairs, batch_size, shuffle, seed + next(epoch))
+
+        signature = (
+            tf.TensorSpec(shape=(None, self.max_len), dtype=tf.as_dtype(self._buffer.dtype)),
+            tf.TensorSpec(shape=(None,), dtype=tf.as_dtype(self._buffer.dtype)),
+        )
+        return tf.data.Dataset.from_generator(generator, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+
+def build_gru_model(vocab_size: int, max_len: int, embed_dim: int = 64, units: int = 128):
+    """노트북 GRU 모델 (Embedding → GRU → softmax)"""
+    from tensorflow.keras.layers import GRU, Dense, Embedding, Input
+    from tensorflow.keras.models import Sequential
+
+    model = Sequential([
+        Input(shape=(max_len,)),
+        Embedding(input_dim=vocab_size, output_dim=embed_dim),
+        GRU(units=units),
+        Dense(units=vocab_size, activation='softmax'),
+    ])
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+_transformer_block = None
+
+
+def transformer_block_class():
+    """노트북 TransformerBlock 레이어 클래스 (TensorFlow 필요, 최초 호출 시 1회 정의 + 직렬화 등록)
+
+    .keras 로 저장/로드할 수 있도록 keras 직렬화에 등록하고 생성 인자를 get_config 로 남깁니다.
+    서빙(app.services.closure_model)은 load_model 의 custom_objects 로 이 클래스를 넘깁니다.
+    """
+    global _transformer_block
+    if _transformer_block is not None:
+        return _transformer_block
+
+    import tensorflow as tf
+    from tensorflow.keras.layers import Dense, Dropout, Layer, LayerNormalization, MultiHeadAttention
+
+    @tf.keras.utils.register_keras_serializable(package="franchise")
+    class TransformerBlock(Layer):
+        def __init__(self, embed_dim, num_heads, ff_dim, rate=0.1, **kwargs):
+            super().__init__(**kwargs)
+            self.embed_dim = embed_dim
+            self.num_heads = num_heads
+            self.ff_dim = ff_dim
+            self.rate = rate
+            self.att = MultiHeadAttention(num_heads=num_heads, key_dim=embed_dim)
+            self.ffn = tf.keras.Sequential([Dense(ff_dim, activation="relu"), Dense(embed_dim)])
+            self.layernorm1 = LayerNormalization(epsilon=1e-6)
+            self.layernorm2 = LayerNormalization(epsilon=1e-6)
+            self.dropout1 = Dropout(rate)
+            self.dropout2 = Dropout(rate)
+
+        def build(self, input_shape):
+            # .keras 로드 시 가중치를 복원할 수 있도록 하위 레이어를 미리 생성
+            self.att.build(input_shape, input_shape)
+            self.ffn.build(input_shape)
+            self.layernorm1.build(input_shape)
+            self.layernorm2.build(input_shape)
+            super().build(input_shape)
+
+        def call(self, inputs, training=None):
+            attn_output = self.dropout1(self.att(inputs, inputs), training=training)
+            out1 = self.layernorm1(inputs + attn_output)
+            ffn_output = self.dropout2(self.ffn(out1), training=training)
+            return self.layernorm2(out1 + ffn_output)
+
+        def get_config(self):
+            config = super().get_config()
+            config.update({
+                'embed_dim': self.embed_dim,
+                'num_heads': self.num_heads,
+                'ff_dim': self.ff_dim,
+                'rate': self.rate,
+            })
+            return config
+
+    _transformer_block = TransformerBlock
+    return _transformer_block
+
+
+def build_transformer_model(vocab_size: int, max_len: int, embed_dim: int = 64, num_heads: int = 4,
+                            ff_dim: int = 64, rate: float = 0.1):
+    """노트북 Transformer 모델 (Embedding → TransformerBlock → 평균 풀링 → softmax)"""
+    from tensorflow.keras.layers import Dense, Embedding, GlobalAveragePooling1D, Input
+    from tensorflow.keras.models import Model
+
+    TransformerBlock = transformer_block_class()
+    inputs = Input(shape=(max_len,))
+    x = Embedding(input_dim=vocab_size, output_dim=embed_dim)(inputs)
+    x = TransformerBlock(embed_dim, num_heads, ff_dim, rate)(x)
+    x = GlobalAveragePooling1D()(x)
+    x = Dense(128, activation="relu")(x)
+    outputs = Dense(vocab_size, activation="softmax")(x)
+
+    model = Model(inputs=inputs, outputs=outputs)
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+MODEL_BUILDERS = {
+    'gru': build_gru_model,
+    'transformer': build_transformer_model,
+}
+
+
+def train(windows: TrainingWindows, model_name: str = 'gru', epochs: int = 10, batch_size: int = 64,
+          val_fraction: float = 0.2, seed: int = 0):
+    """점포 단위 분할로 모델 학습 → (model, history, val 쌍 인덱스)"""
+    train_pairs, val_pairs = windows.split(val_fraction, seed)
+    model = MODEL_BUILDERS[model_name](windows.sequences.vocab_size, windows.max_len)
+    history = model.fit(
+        windows.dataset(train_pairs, batch_size, shuffle=True, seed=seed),
+        validation_data=windows.dataset(val_pairs, batch_size, shuffle=False) if len(val_pairs) else None,
+        epochs=epochs,
+    )
+    return model, history, val_pairs
+
+
+def export_serving_artifacts(model, model_name: str, windows: TrainingWindows, models_dir: Path) -> None:
+    """백엔드 서빙용 산출물 저장 (모델, 사전/메타, 점포별 시퀀스)
+
+    GRU 는 TensorFlow 없이 추론할 수 있도록 가중치를 npz 로 함께 저장합니다.
+    """
+    models_dir = Path(models_dir)
+    models_dir.mkdir(parents=True, exist_ok=True)
+    sequences = windows.sequences
+
+    model.save(models_dir / KERAS_MODEL_FILE)
+    gru_weights = models_dir / GRU_WEIGHTS_FILE
+    if model_name == 'gru':
+        embedding, kernel, recurrent_kernel, bias, dense_kernel, dense_bias = model.get_weights()
+        np.savez(gru_weights, embedding=embedding, kernel=kernel, recurrent_kernel=recurrent_kernel,
+                 bias=bias, dense_kernel=dense_kernel, dense_bias=dense_bias)
+    elif gru_weights.exists():
+        gru_weights.unlink()
+
+    sequences.save(models_dir / SEQUENCES_FILE)
+    meta = {
+        'model': model_name,
+        'vocab': sequences.vocab,
+        'event2idx': sequences.event2idx,
+        'max_len': windows.max_len,
+        'closure_idx': sequences.event2idx.get(CLOSURE_EVENT, -1),
+    }
+    with open(models_dir / META_FILE, 'wb') as f:
+        pickle.dump(meta, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트 시퀀스 → 다음 이벤트 예측 모델 학습")
+    parser.add_argument("--sequences", required=True, help="app.ml.event_sequence 출력 npz")
+    parser.add_argument("--model", choices=list(MODEL_BUILDERS), default='gru')
+    parser.add_argument("--max-len", type=int, help="입력 길이 (기본: 가장 긴 시퀀스)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="학습된 모델 저장 경로 (.keras)")
+    parser.add_argument("--export-dir", help="백엔드 서빙 산출물 디렉토리 (예: models)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    windows = TrainingWindows(EventSequences.load(Path(args.sequences)), args.max_len)
+    print(f"✅ 학습 쌍 {len(windows):,}개 (max_len {windows.max_len}, "
+          f"{windows.nbytes / 1024 ** 2:.1f}MB, {time.perf_counter() - start:.2f}s)")
+
+    model, _, _ = train(windows, args.model, args.epochs, args.batch_size, args.val_fraction, args.seed)
+    model.save(args.out)
+    print(f"✅ 모델 저장: {args.out}")
+    if args.export_dir:
+        export_serving_artifacts(model, args.model, windows, Path(args.export_dir))
+        print(f"✅ 서빙 산출물 저장: {args.export_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,24 @@ class FranchiseReportRequest(BaseModel):
     franchiseId: str = Field(..., description="가맹점 ID")
 
 
+class BatchRiskRequest(BaseModel):
+    """일괄 위험 진단 요청 (필터를 비우면 전체 점포)"""
+    storeIds: Optional[List[str]] = Field(None, description="대상 점포 ID 목록")
+    clusters: Optional[List[int]] = Field(None, description="대상 static_cluster 목록")
+
+
+class BulkReportRequest(BaseModel):
+    """여러 점포 리포트 일괄 조회 요청"""
+    storeIds: List[str] = Field(..., min_length=1, description="점포 ID 목록 (중복은 한 번만 조회)")
+
+
+class ClusterAssignRequest(BaseModel):
+    """신규 점포 클러스터 배정 요청"""
+    stores: List[Dict[str, Any]] = Field(
+        ..., min_length=1, description="점포 특성 행 (store_id + 정적 특성, 없는 특성은 학습 시 중앙값)"
+    )
+
+
 # ============================================
 # 응답 스키마
 # ============================================
@@ -23,8 +41,8 @@ class StoreInfo(BaseModel):
     industry: str
     cluster: str
     clusterName: str
-    latitude: float
-    longitude: float
+    latitude: float = Field(..., description="위도 (store_features 의 y)")
+    longitude: float = Field(..., description="경도 (store_features 의 x)")
     riskLevel: str  # '낮음', '중간', '높음', '치명적'
     riskScore: float
 
@@ -35,13 +53,19 @@ class ModelResults(BaseModel):
     eventPrediction: str = Field(..., description="이벤트 예측 (예: 매출 급감, 경쟁 심화 등)")
     survivalProbability: float = Field(..., description="생존 가능성 (0-100%)")
     riskScore: float = Field(..., description="위험도 점수")
+    closureProbability: Optional[float] = Field(
+        None, description="이벤트 시퀀스 모델의 다음 이벤트 폐업 확률 (0-1, 모델/시퀀스가 없으면 null)"
+    )
 
 
 class ClusterIndicator(BaseModel):
     """클러스터별 주요 지표"""
     name: str = Field(..., description="지표명")
     value: float = Field(..., description="현재값")
-    clusterAvg: float = Field(..., description="클러스터 평균")
+    clusterAvg: float = Field(..., description="클러스터 평균 (값이 있는 점포가 없으면 룰 임계값)")
+    clusterMedian: Optional[float] = Field(None, description="클러스터 중앙값")
+    threshold: Optional[float] = Field(None, description="룰 임계값")
+    percentile: Optional[float] = Field(None, description="클러스터 내 점포 값 백분위 (0-100, 높을수록 값이 큼)")
     unit: str = Field(..., description="단위")
     description: str = Field(..., description="지표 설명")
     isPositive: bool = Field(..., description="높을수록 좋은 지표인지")
@@ -69,6 +93,7 @@ class ComparisonData(BaseModel):
     myStore: float
     clusterAvg: float
     unit: str
+    percentile: Optional[float] = None
 
 
 class DistributionData(BaseModel):
@@ -122,6 +147,7 @@ class LLMSuggestion(BaseModel):
     """LLM 전략 제안"""
     summary: str
     strategies: List[str]
+    status: str = Field('ready', description="ready: 생성 완료 / pending: 별도 스트림으로 전달 예정")
 
 
 class FranchiseReportResponse(BaseModel):
@@ -136,6 +162,19 @@ class FranchiseReportResponse(BaseModel):
     llmSuggestion: LLMSuggestion
 
 
+class BulkReportError(BaseModel):
+    """일괄 조회에서 실패한 점포"""
+    storeId: str
+    status: int = Field(..., description="단건 조회 시의 HTTP 상태 코드 (404: 없는 점포, 500: 생성 오류)")
+    detail: str
+
+
+class BulkReportResponse(BaseModel):
+    """여러 점포 리포트 일괄 조회 응답 (일부 점포가 실패해도 200)"""
+    reports: List[FranchiseReportResponse] = Field(..., description="요청 순서의 리포트 (llmSuggestion 은 pending)")
+    errors: List[BulkReportError]
+
+
 # ============================================
 # 기타 스키마
 # ============================================
@@ -153,4 +192,82 @@ class ClusterInfo(BaseModel):
     total_stores: int
     closure_rate: float
     avg_foot_traffic: float
-    avg_rent: float
\ No newline at end of file
+    avg_rent: float
+
+
+class GeoPoint(BaseModel):
+    """좌표 (WGS84)"""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class NearbyStore(BaseModel):
+    """주변 점포"""
+    storeId: str
+    storeName: str
+    industry: str
+    tradingArea: str
+    cluster: Optional[str] = None
+    latitude: float
+    longitude: float
+    distanceM: float = Field(..., description="기준 위치로부터 거리 (m)")
+    riskScore: Optional[float] = None
+    riskLevel: Optional[str] = None
+
+
+class NearbyStoresResponse(BaseModel):
+    """반경/최근접 점포 조회 결과"""
+    center: GeoPoint
+    radiusM: Optional[float] = None
+    k: Optional[int] = None
+    count: int = Field(..., description="조건에 맞는 전체 점포 수 (stores 는 limit 까지)")
+    stores: List[NearbyStore]
+
+
+class TradingAreaStats(BaseModel):
+    """상권 통계"""
+    tradingArea: str
+    storeCount: int
+    avgRiskScore: Optional[float] = None
+    highRiskStores: int = Field(..., description="위험도 '높음' 이상(60점 이상) 점포 수")
+    riskLevelCounts: Dict[str, int]
+    avgFootTraffic: Optional[float] = None
+    avgRentIncreaseRate: Optional[float] = None
+    avgNearbyStores: Optional[float] = None
+    industries: Dict[str, int]
+    clusters: Dict[str, int]
+    center: GeoPoint
+
+
+class ClusterAssignment(BaseModel):
+    """점포 클러스터 배정 결과"""
+    storeId: Optional[str] = None
+    cluster: int
+    clusterName: Optional[str] = None
+    distance: float = Field(..., description="표준화 특성 공간에서 중심점까지 거리")
+
+
+class ClusterAssignResponse(BaseModel):
+    """클러스터 배정 결과 목록"""
+    k: int
+    assignments: List[ClusterAssignment]
+
+
+class PortfolioStore(BaseModel):
+    """포트폴리오 조회 점포"""
+    storeId: str
+    storeName: str
+    cluster: Optional[str] = None
+    industry: str
+    tradingArea: str
+    riskScore: Optional[float] = None
+    riskLevel: Optional[str] = None
+    nViolations: Optional[int] = None
+    nCriticalViolations: Optional[int] = None
+
+
+class PortfolioPage(BaseModel):
+    """포트폴리오 조회 결과 (한 페이지)"""
+    stores: List[PortfolioStore]
+    nextCursor: Optional[str] = Field(None, description="다음 페이지 커서 (마지막 페이지면 null)")
+    total: Optional[int] = Field(None, description="조건에 맞는 전체 점포 수 (include_total=true 일 때만)")
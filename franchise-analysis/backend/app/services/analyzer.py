@@ -1,88 +1,195 @@
+import logging
 import numpy as np
 import pandas as pd
 from typing import List, Dict, Tuple
+from app.services.closure_model import TRANSIENT_OUTCOMES, closure_model
 from app.services.data_loader import data_loader
+from app.services.metrics import REPORT_SECONDS, REPORT_STAGE_SECONDS, StageTimer
+from app.services.monthly_grades import grade_rank_ratio
+
+logger = logging.getLogger(__name__)
+
+
+def risk_level_from_score(risk_score) -> str:
+    """위험도 점수 → 위험도 레벨"""
+    if risk_score >= 80:
+        return '치명적'
+    elif risk_score >= 60:
+        return '높음'
+    elif risk_score >= 40:
+        return '중간'
+    return '낮음'
+
+
+def actual_trend_points(months: np.ndarray, sales_grades: np.ndarray) -> List[Dict]:
+    """실제 월별 등급 트렌드 포인트 (월 라벨/등급 배열 → 오래된 순)"""
+    # 등급을 순위 비율로 변환 (1=상위, 6=하위) - 배열 연산
+    cluster_rank_ratios = grade_rank_ratio(sales_grades)
+    return [
+        {
+            'month': month,
+            'salesGrade': sales_grade,  # 실제 등급 (1-6)
+            'type': 'actual',
+            'clusterRank': cluster_rank_ratio  # 0-1 (1=상위)
+        }
+        for month, sales_grade, cluster_rank_ratio
+        in zip(months.tolist(), sales_grades.tolist(), cluster_rank_ratios.tolist())
+    ]
+
+
+def forecast_trend_point(pred: Dict) -> Dict:
+    """예측 등급 트렌드 포인트 (sales_predict_result 1행)"""
+    # yhatGrade를 순위 비율로 변환 (1=상위, 6=하위)
+    cluster_rank_ratio = (7 - pred['yhat_grade']) / 6.0
+    return {
+        'month': pred['target_month'],
+        'salesGrade': pred['yhat_grade'],  # 예측 등급 (1-6)
+        'type': 'forecast',
+        'clusterRank': cluster_rank_ratio,  # 0-1 사이 값 (1=상위)
+        'pLow56': pred['p_low56'],
+        'riskWorsen': pred['risk_worsen_ge2']
+    }
 
 
 class Analyzer:
     """가맹점 데이터 분석"""
     
     def generate_franchise_report(self, store_id: str) -> Dict:
-        """가맹점 리포트 생성"""
+        """가맹점 리포트 생성 (단계별 소요 시간은 /metrics 의 report_stage_seconds)"""
+        timer = StageTimer(REPORT_STAGE_SECONDS)
+        
         # 1. 점포 정보 가져오기
         store_data = data_loader.get_store_by_id(store_id) 
-        # print(f"🔍 디버깅: store_data = {store_data}")
+        timer.mark('store_info')
         if not store_data:
             print(f"❌ 오류: store_id {store_id}를 찾을 수 없습니다.")
             raise ValueError(f"점포 ID {store_id}를 찾을 수 없습니다.")
     
         
         # 2. 위치 정보 가져오기
-        print(f"🔍 디버깅: 위치 정보 조회 시작")
         location_info = data_loader.get_store_location_info(store_id)
-        print(f"🔍 디버깅: location_info = {location_info}")
+        timer.mark('location_info')
+        logger.debug("location_info = %s", location_info)
         
-        # 3. 진단 결과 가져오기
-        print(f"🔍 디버깅: 진단 결과 조회 시작")
-        diagnosis_results = data_loader.get_store_diagnosis_results(store_id)
-        print(f"🔍 디버깅: diagnosis_results = {diagnosis_results}")
-        
-        # 4. 클러스터 메타데이터 가져오기
+        # 3. 클러스터 메타데이터 가져오기
         cluster_id = str(store_data.get('static_cluster', '0'))
-        print(f"🔍 디버깅: cluster_id = {cluster_id}")
         cluster_metadata = data_loader.get_cluster_metadata(cluster_id)
-        print(f"🔍 디버깅: cluster_metadata = {cluster_metadata}")
-        
-        # 5. 월별 시계열 데이터 가져오기
-        print(f"🔍 디버깅: 시계열 데이터 조회 시작")
-        timeseries_data = data_loader.get_store_monthly_timeseries(store_id)
-        print(f"🔍 디버깅: timeseries_data = {timeseries_data}")
+        timer.mark('cluster_metadata')
+        logger.debug("cluster_id = %s, cluster_metadata = %s", cluster_id, cluster_metadata)
         
-        # 6. 룰 위반 계산
-        print(f"🔍 디버깅: 룰 위반 계산 시작")
+        # 4. 룰 위반 계산
         rule_violations = data_loader.calculate_rule_violations(store_id)
-        print(f"🔍 디버깅: rule_violations = {rule_violations}")
-        
-        # 7. 모델 결과 생성
-        print(f"🔍 디버깅: 모델 결과 생성 시작")
-        model_results = self._create_model_results(store_data, diagnosis_results)
-        print(f"🔍 디버깅: model_results = {model_results}")
+        timer.mark('rule_violations')
+        logger.debug("rule_violations = %s", rule_violations)
         
-        # 8. 클러스터별 주요 지표 생성
-        print(f"🔍 디버깅: 클러스터 지표 생성 시작")
-        print(f"🔍 디버깅: cluster_id = {cluster_id}")
-        print(f"🔍 디버깅: cluster_metadata = {cluster_metadata}")
+        # 5. 클러스터별 주요 지표 생성
         cluster_indicators = self._create_cluster_indicators(store_data, cluster_metadata)
-        print(f"🔍 디버깅: cluster_indicators = {cluster_indicators}")
-        print(f"🔍 디버깅: cluster_indicators 길이 = {len(cluster_indicators)}")
+        timer.mark('cluster_indicators')
+        logger.debug("cluster_indicators(%d) = %s", len(cluster_indicators), cluster_indicators)
+        
+        report = self._assemble_report(store_id, store_data, location_info, cluster_metadata,
+                                       rule_violations, cluster_indicators, timer)
+        REPORT_SECONDS.observe(timer.elapsed())
+        return report
+    
+    def generate_franchise_reports(self, store_ids: List[str]) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+        """여러 점포 리포트 → (점포 ID → 분석 결과, 실패한 점포 ID → 예외)
+        
+        static_cluster 별로 묶어 클러스터 메타데이터 조회, 룰 평가, 클러스터 지표 계산은 그룹당 1번만 합니다.
+        점포 1곳이 실패해도 나머지 점포 리포트는 그대로 생성됩니다 (없는 점포는 ValueError).
+        """
+        reports: Dict[str, Dict] = {}
+        errors: Dict[str, Exception] = {}
+        
+        # 1. 점포 정보 → 클러스터별 그룹 (요청 순서 유지)
+        groups: Dict[str, List[Tuple[str, Dict]]] = {}
+        for store_id in dict.fromkeys(store_ids):
+            store_data = data_loader.get_store_by_id(store_id)
+            if not store_data:
+                errors[store_id] = ValueError(f"점포 ID {store_id}를 찾을 수 없습니다.")
+                continue
+            groups.setdefault(str(store_data.get('static_cluster', '0')), []).append((store_id, store_data))
         
-        # 9. 매출 예측 데이터 가져오기
-        print(f"🔍 디버깅: 매출 예측 조회 시작")
+        for cluster_id, members in groups.items():
+            stores = [store_data for _, store_data in members]
+            # 2. 클러스터 단위 작업 (메타데이터, 룰 비교 행렬 1번, 지표 백분위 배열 연산)
+            try:
+                cluster_metadata = data_loader.get_cluster_metadata(cluster_id)
+                rule_violations = data_loader.get_rule_engine().evaluate_stores(int(cluster_id), stores)
+                cluster_indicators = data_loader.get_cluster_stats().indicators_many(int(cluster_id), stores)
+            except Exception as e:
+                logger.exception("cluster %s bulk report failed", cluster_id)
+                errors.update({store_id: e for store_id, _ in members})
+                continue
+            logger.debug("cluster_id = %s, stores = %d, cluster_metadata = %s", cluster_id, len(members), cluster_metadata)
+            
+            # 3. 점포 단위 작업
+            for (store_id, store_data), violations, indicators in zip(members, rule_violations, cluster_indicators):
+                try:
+                    location_info = {
+                        'business_district': store_data.get('business_district', ''),
+                        'region': store_data.get('region_3depth_name', ''),
+                        'store_name': store_data.get('store_name', '')
+                    }
+                    reports[store_id] = self._assemble_report(
+                        store_id, store_data, location_info,
+                        dict(cluster_metadata) if cluster_metadata is not None else None,
+                        violations, indicators, StageTimer(REPORT_STAGE_SECONDS)
+                    )
+                except Exception as e:
+                    logger.exception("store %s bulk report failed", store_id)
+                    errors[store_id] = e
+        
+        return reports, errors
+    
+    def _assemble_report(self, store_id: str, store_data: Dict, location_info: Dict, cluster_metadata: Dict,
+                         rule_violations: List[Dict], cluster_indicators: List[Dict], timer: StageTimer) -> Dict:
+        """점포 단위 조회/계산 (진단 결과, 시계열, 모델 결과, 예측, 트렌드, 통계) → 분석 결과 dict"""
+        # 1. 진단 결과 가져오기
+        diagnosis_results = data_loader.get_store_diagnosis_results(store_id)
+        timer.mark('diagnosis_results')
+        logger.debug("diagnosis_results = %s", diagnosis_results)
+        
+        # 2. 최근 월 등급 가져오기 (점포별 등급 배열 구간, 전체 월별 시계열은 DEBUG 덤프용으로만 조회)
+        recent_grades = data_loader.get_recent_monthly_grades(store_id, 6)
+        timer.mark('timeseries')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("timeseries_data = %s", data_loader.get_store_monthly_timeseries(store_id))
+        
+        # 3. 모델 결과 생성
+        model_results = self._create_model_results(store_data, diagnosis_results)
+        model_results['closure_probability'], closure_outcome = closure_model.score_with_outcome(store_id)
+        timer.mark('model_results')
+        logger.debug("model_results = %s", model_results)
+        
+        # 4. 매출 예측 데이터 가져오기
         sales_predictions = data_loader.get_sales_predictions(store_id)
-        print(f"🔍 디버깅: sales_predictions = {sales_predictions}")
+        timer.mark('sales_predictions')
+        logger.debug("sales_predictions = %s", sales_predictions)
         
-        # 10. 트렌드 데이터 생성 (실제 6개월 + 예측 3개월 + 클러스터 순위)
-        print(f"🔍 디버깅: 통합 트렌드 데이터 생성 시작")
-        trend_data = self._create_enhanced_trend_data(store_data, timeseries_data, sales_predictions)
-        print(f"🔍 디버깅: trend_data = {trend_data}")
+        # 5. 트렌드 데이터 생성 (실제 6개월 + 예측 3개월 + 클러스터 순위)
+        trend_data = self._create_enhanced_trend_data(store_data, recent_grades, sales_predictions)
+        timer.mark('trend_data')
+        logger.debug("trend_data = %s", trend_data)
         
-        # 11. 통계 정보 생성
-        print(f"🔍 디버깅: 통계 정보 생성 시작")
+        # 6. 통계 정보 생성
         statistics = self._create_statistics(store_data, cluster_metadata)
-        print(f"🔍 디버깅: statistics = {statistics}")
+        timer.mark('statistics')
+        logger.debug("statistics = %s", statistics)
         
         return {
             'store_data': store_data,
             'location_info': location_info,
             'diagnosis_results': diagnosis_results,
             'cluster_metadata': cluster_metadata,
-            'timeseries_data': timeseries_data,
             'rule_violations': rule_violations,
             'model_results': model_results,
             'cluster_indicators': cluster_indicators,
             'trend_data': trend_data,
             'sales_predictions': sales_predictions,
-            'statistics': statistics
+            'statistics': statistics,
+            # 폐업 확률이 시간 초과/실패로 비어 있으면 리포트 캐시에 저장하지 않음
+            'cacheable': closure_outcome not in TRANSIENT_OUTCOMES
         }
     
     def _create_model_results(self, store_data: Dict, diagnosis_results: Dict) -> Dict:
@@ -136,42 +243,16 @@ class Analyzer:
         
         return trend_data
     
-    def _create_enhanced_trend_data(self, store_data: Dict, timeseries_data: Dict, sales_predictions: List[Dict]) -> List[Dict]:
+    def _create_enhanced_trend_data(self, store_data: Dict, recent_grades: Tuple[np.ndarray, np.ndarray],
+                                    sales_predictions: List[Dict]) -> List[Dict]:
         """통합 트렌드 데이터 생성 (실제 등급 + 예측 등급 + 클러스터 순위)"""
-        trend_data = []
-        
-        # 1. 실제 월별 등급 데이터 (최근 6개월)
-        if timeseries_data:
-            sorted_months = sorted(timeseries_data.keys(), reverse=True)[:6]  # 최근 6개월
-            sorted_months.reverse()  # 오래된 순으로 정렬
-            
-            for month in sorted_months:
-                data = timeseries_data[month]
-                sales_grade = data.get('sales', 0)
-                # 등급을 순위 비율로 변환 (1=상위, 6=하위)
-                cluster_rank_ratio = (7 - sales_grade) / 6.0 if sales_grade else 0.5
-                
-                trend_data.append({
-                    'month': month,
-                    'salesGrade': sales_grade,  # 실제 등급 (1-6)
-                    'type': 'actual',
-                    'clusterRank': cluster_rank_ratio  # 0-1 (1=상위)
-                })
+        # 1. 실제 월별 등급 데이터 (최근 6개월, 이미 월 오름차순)
+        trend_data = actual_trend_points(*recent_grades)
         
         # 2. 예측 3개월 데이터 (sales_predictions에서)
         if sales_predictions and len(sales_predictions) > 0:
             for pred in sales_predictions:
-                # yhatGrade를 순위 비율로 변환 (1=상위, 6=하위)
-                cluster_rank_ratio = (7 - pred['yhat_grade']) / 6.0
-                
-                trend_data.append({
-                    'month': pred['target_month'],
-                    'salesGrade': pred['yhat_grade'],  # 예측 등급 (1-6)
-                    'type': 'forecast',
-                    'clusterRank': cluster_rank_ratio,  # 0-1 사이 값 (1=상위)
-                    'pLow56': pred['p_low56'],
-                    'riskWorsen': pred['risk_worsen_ge2']
-                })
+                trend_data.append(forecast_trend_point(pred))
         
         # 월별로 정렬
         trend_data.sort(key=lambda x: x['month'])
@@ -189,48 +270,12 @@ class Analyzer:
         }
     
     def _create_cluster_indicators(self, store_data: Dict, cluster_metadata: Dict) -> List[Dict]:
-        """클러스터별 주요 지표 생성"""
-        indicators = []
+        """클러스터별 주요 지표 생성 (클러스터 실제 평균/중앙값 + 점포 백분위)"""
         cluster_id = str(store_data.get('static_cluster', '0'))
         
-        # cluster_metadata가 None이거나 dict가 아닌 경우 기본값 사용
-        if not cluster_metadata or not isinstance(cluster_metadata, dict):
-            cluster_metadata = {}
-        
-        # risk_checklist_rules에서 해당 클러스터의 규칙들을 가져와서 지표 생성
-        print(f"🔍 디버깅 BEFORE get_rules_for_cluster: cluster_id = {cluster_id}, type = {type(cluster_id)}")
-        rules = data_loader.get_rules_for_cluster(cluster_id)
-        print(f"🔍 디버깅 AFTER get_rules_for_cluster: rules 길이 = {len(rules) if rules else 0}")
-        print(f"🔍 디버깅 AFTER get_rules_for_cluster: rules = {rules[:2] if rules else []}")  # 처음 2개만 출력
-        
-        for rule in rules[:5]:  # 상위 5개 규칙만 사용
-            feature = rule['feature']
-            threshold = rule['threshold']
-            feature_korean = rule['feature_korean']
-            risk_level = rule['risk_level']
-            direction = rule['direction']
-            
-            # 점포의 해당 feature 값 가져오기
-            store_value = store_data.get(feature, 0) or 0
-            
-            # 클러스터 평균은 임계값을 사용 (실제 평균 데이터가 없으므로)
-            cluster_avg = threshold
-            
-            # 방향에 따라 isPositive 결정
-            is_positive = direction == '>='  # >= 이면 높을수록 좋음, <= 이면 낮을수록 좋음
-            
-            # 단위 결정
-            unit = '%' if 'ratio' in feature else '회' if 'count' in feature else '점'
-            
-            indicators.append({
-                'name': feature_korean,
-                'value': store_value,
-                'clusterAvg': cluster_avg,
-                'unit': unit,
-                'description': f'{feature_korean} ({risk_level})',
-                'isPositive': is_positive,
-                'riskLevel': risk_level
-            })
+        # 로드 시 계산한 클러스터 통계의 지표 템플릿(상위 5개 룰)에 점포 값만 채움
+        indicators = data_loader.get_cluster_stats().indicators(int(cluster_id), store_data)
+        logger.debug("cluster %s indicators(%d) = %s", cluster_id, len(indicators), indicators[:2])
         
         return indicators
 
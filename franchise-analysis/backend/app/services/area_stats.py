@@ -0,0 +1,199 @@
+"""
+점포 좌표 기반 주변 점포 / 상권 통계
+
+점포 특성(x=경도, y=위도)과 진단 결과(total_risk_score)로 격자 공간 인덱스와 상권(business_district)별
+집계를 한 번만 만들고, 반경·최근접 조회와 상권 통계는 인덱스/딕셔너리 조회로 응답합니다.
+점포 특성/진단 결과를 다시 로드하면 다음 조회 때 다시 만듭니다 (월별 증분 적재와는 무관).
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.analyzer import risk_level_from_score
+from app.services.data_loader import DataLoader, data_loader
+from app.services.spatial_index import SpatialIndex
+
+HIGH_RISK_SCORE = 60  # '높음' 이상
+RISK_LEVELS = ('치명적', '높음', '중간', '낮음')
+
+
+def _column(df: pd.DataFrame, column: str, default=None) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    return df[column].to_numpy(dtype=object)
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _mean(values: np.ndarray) -> Optional[float]:
+    values = values[np.isfinite(values)]
+    return round(float(values.mean()), 4) if len(values) else None
+
+
+class StoreGeo:
+    """한 시점의 공간 인덱스 + 점포 속성 배열 + 상권 집계 (읽기 전용, 재생성 시 통째로 교체)"""
+
+    def __init__(self, features: pd.DataFrame, risk_scores: np.ndarray, cell_m: float):
+        self.store_ids = _column(features, 'store_id')
+        self.names = _column(features, 'store_name', '')
+        self.industries = _column(features, 'industry', '')
+        self.districts = _column(features, 'business_district', '')
+        self.clusters = _numeric(features, 'static_cluster')
+        self.risk_scores = risk_scores
+        self.index = SpatialIndex(_numeric(features, 'y'), _numeric(features, 'x'), cell_m=cell_m)
+        self.row_of = {store_id: i for i, store_id in enumerate(self.store_ids.tolist())}
+        self.areas = self._build_areas(features)
+
+    def _build_areas(self, features: pd.DataFrame) -> Dict[str, Dict]:
+        """상권별 집계 (점포 수, 위험도 분포, 평균 지표, 업종/클러스터 구성, 중심 좌표)"""
+        if 'business_district' not in features.columns:
+            return {}
+        foot_traffic = _numeric(features, 'foot_traffic')
+        rent = _numeric(features, 'rent_increase_rate')
+        nearby = _numeric(features, 'nearby_stores')
+        lats, lons = _numeric(features, 'y'), _numeric(features, 'x')
+
+        areas = {}
+        for district, rows in features.groupby('business_district', sort=True, observed=True).indices.items():
+            scores = self.risk_scores[rows]
+            scored = scores[np.isfinite(scores)]
+            levels = pd.Series([risk_level_from_score(score) for score in scored]).value_counts()
+            industries = pd.Series(self.industries[rows]).value_counts()
+            clusters = pd.Series(self.clusters[rows]).dropna().astype(int).value_counts().sort_index()
+            areas[str(district)] = {
+                'tradingArea': str(district),
+                'storeCount': len(rows),
+                'avgRiskScore': _mean(scores),
+                'highRiskStores': int((scored >= HIGH_RISK_SCORE).sum()),
+                'riskLevelCounts': {level: int(levels.get(level, 0)) for level in RISK_LEVELS},
+                'avgFootTraffic': _mean(foot_traffic[rows]),
+                'avgRentIncreaseRate': _mean(rent[rows]),
+                'avgNearbyStores': _mean(nearby[rows]),
+                'industries': {str(k): int(v) for k, v in industries.items()},
+                'clusters': {str(k): int(v) for k, v in clusters.items()},
+                'center': {'latitude': _mean(lats[rows]), 'longitude': _mean(lons[rows])},
+            }
+        return areas
+
+    def location(self, store_id: str) -> Optional[Tuple[float, float]]:
+        row = self.row_of.get(store_id)
+        if row is None or not (np.isfinite(self.index.lats[row]) and np.isfinite(self.index.lons[row])):
+            return None
+        return float(self.index.lats[row]), float(self.index.lons[row])
+
+    def keep(self, min_risk_score: Optional[float], exclude: Optional[str]):
+        """후보 필터 (위험도 하한, 제외할 점포) - 조건이 없으면 None"""
+        if min_risk_score is None and exclude is None:
+            return None
+        exclude_row = self.row_of.get(exclude) if exclude is not None else None
+
+        def keep(rows: np.ndarray) -> np.ndarray:
+            mask = np.ones(len(rows), dtype=bool)
+            if min_risk_score is not None:
+                with np.errstate(invalid='ignore'):
+                    mask &= self.risk_scores[rows] >= min_risk_score
+            if exclude_row is not None:
+                mask &= rows != exclude_row
+            return mask
+        return keep
+
+    def records(self, rows: np.ndarray, distances: np.ndarray) -> List[Dict]:
+        index = self.index
+        records = []
+        for row, distance in zip(rows.tolist(), distances.tolist()):
+            score = self.risk_scores[row]
+            cluster = self.clusters[row]
+            records.append({
+                'storeId': self.store_ids[row],
+                'storeName': self.names[row] or '',
+                'industry': self.industries[row] or '',
+                'tradingArea': self.districts[row] or '',
+                'cluster': str(int(cluster)) if np.isfinite(cluster) else None,
+                'latitude': float(index.lats[row]),
+                'longitude': float(index.lons[row]),
+                'distanceM': round(distance, 1),
+                'riskScore': float(score) if np.isfinite(score) else None,
+                'riskLevel': risk_level_from_score(score) if np.isfinite(score) else None,
+            })
+        return records
+
+
+class AreaStats:
+    """주변 점포 조회 + 상권 통계"""
+
+    def __init__(self, loader: DataLoader = data_loader, cell_m: float = 250.0):
+        self.loader = loader
+        self.cell_m = cell_m
+        self._lock = threading.Lock()
+        self._geo: Optional[StoreGeo] = None
+        self._source: Optional[tuple] = None
+
+    def _source_version(self) -> tuple:
+        fingerprints = self.loader._fingerprints
+        return fingerprints.get('store_features'), fingerprints.get('store_diagnosis_results')
+
+    def build(self) -> StoreGeo:
+        """공간 인덱스 + 상권 집계 (점포 특성/진단 결과가 그대로면 재사용)"""
+        # 버전을 먼저 읽음 - 사이에 델타가 적용되면 새 데이터가 이전 버전으로 저장되어 다음 호출 때 다시 생성
+        source = self._source_version()
+        features = self.loader.load_store_features()
+        diagnosis = self.loader.load_store_diagnosis_results()
+        geo = self._geo
+        if geo is not None and self._source == source:
+            return geo
+        with self._lock:
+            if self._geo is not None and self._source == source:
+                return self._geo
+            start = time.perf_counter()
+            diagnosis_index = self.loader._get_index('store_diagnosis_results')
+            scores = _numeric(diagnosis, 'total_risk_score')
+            # 점포 특성 순서에 맞춘 위험도 점수 (진단 결과가 없으면 NaN)
+            positions = [diagnosis_index.first(store_id) for store_id in _column(features, 'store_id')]
+            risk_scores = np.array([scores[p] if p is not None else np.nan for p in positions], dtype=np.float64)
+
+            geo = StoreGeo(features, risk_scores, self.cell_m)
+            self._geo, self._source = geo, source
+            print(f"✅ 공간 인덱스 생성 완료: {len(geo.index)} 점포, 상권 {len(geo.areas)}개 "
+                  f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+            return geo
+
+    def store_location(self, store_id: str) -> Optional[Tuple[float, float]]:
+        """점포 (위도, 경도) - 점포가 없거나 좌표가 없으면 None"""
+        return self.build().location(store_id)
+
+    def within(self, lat: float, lon: float, radius_m: float, min_risk_score: Optional[float] = None,
+               exclude: Optional[str] = None, limit: int = 50) -> Dict:
+        """반경 안의 점포 (가까운 순, 최대 limit 개) + 전체 개수"""
+        geo = self.build()
+        rows, distances = geo.index.within(lat, lon, radius_m, keep=geo.keep(min_risk_score, exclude))
+        return {'count': len(rows), 'stores': geo.records(rows[:limit], distances[:limit])}
+
+    def nearest(self, lat: float, lon: float, k: int, min_risk_score: Optional[float] = None,
+                exclude: Optional[str] = None) -> Dict:
+        """가까운 k개 점포"""
+        geo = self.build()
+        rows, distances = geo.index.nearest(lat, lon, k, keep=geo.keep(min_risk_score, exclude))
+        return {'count': len(rows), 'stores': geo.records(rows, distances)}
+
+    def trading_area(self, name: str) -> Optional[Dict]:
+        """상권 통계 (없으면 None)"""
+        return self.build().areas.get(name)
+
+    def trading_areas(self) -> List[Dict]:
+        """상권 목록 (이름, 점포 수, 평균 위험도, 고위험 점포 수)"""
+        return [
+            {key: area[key] for key in ('tradingArea', 'storeCount', 'avgRiskScore', 'highRiskStores')}
+            for area in self.build().areas.values()
+        ]
+
+
+# 싱글톤 인스턴스
+area_stats = AreaStats(cell_m=float(os.getenv("SPATIAL_CELL_M", "250")))
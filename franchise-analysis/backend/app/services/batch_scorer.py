@@ -0,0 +1,289 @@
+"""
+전체 가맹점 일괄 위험 진단 (야간 리스크 시트)
+
+static_cluster 단위로 룰 위반·모델 결과·클러스터 지표·트렌드를 벡터 연산으로
+계산하고, 점포별 레코드를 하나씩 흘려보냅니다(메모리에 전체를 쌓지 않음).
+
+사용법 (backend 디렉토리에서):
+    python -m app.services.batch_scorer --out risk_sheet.ndjson
+    python -m app.services.batch_scorer --out risk_sheet.parquet --cluster 3 --cluster 7
+"""
+import argparse
+import contextlib
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+import numpy as np
+import pandas as pd
+
+from app.services.analyzer import (
+    actual_trend_points,
+    forecast_trend_point,
+    risk_level_from_score,
+)
+from app.services.closure_model import closure_model
+from app.services.data_loader import DataLoader, data_loader
+
+
+def _native(value):
+    """numpy 스칼라 → 파이썬 기본형, NaN/inf → None (JSON 호환)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _safe_numeric(values: pd.Series, default: float) -> np.ndarray:
+    """숫자가 아니거나 NaN/inf 인 값을 기본값으로 (Analyzer.safe_float 벡터화)"""
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isfinite(numeric), numeric, default)
+
+
+class BatchScorer:
+    """클러스터 단위 일괄 위험 진단"""
+
+    def __init__(self, loader: DataLoader = data_loader):
+        self.loader = loader
+
+    def select_stores(self, store_ids: Optional[Iterable[str]] = None,
+                      clusters: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """대상 점포 선택 (store_ids / clusters 로 필터링, 없으면 전체)"""
+        features = self.loader.load_store_features()
+        if store_ids is not None:
+            index = self.loader._get_index('store_features')
+            positions = [index.first(store_id) for store_id in dict.fromkeys(store_ids)]
+            features = features.iloc[[p for p in positions if p is not None]]
+        if clusters is not None:
+            features = features[features['static_cluster'].isin(list(clusters))]
+        return features
+
+    def iter_records(self, store_ids: Optional[Iterable[str]] = None,
+                     clusters: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """점포별 진단 레코드를 클러스터 순서대로 생성"""
+        for _, records in self.iter_cluster_batches(store_ids, clusters):
+            yield from records
+
+    def iter_cluster_batches(self, store_ids: Optional[Iterable[str]] = None,
+                             clusters: Optional[Iterable[int]] = None) -> Iterator:
+        """(cluster_id, 해당 클러스터 점포 레코드 목록) 단위로 생성"""
+        stores = self.select_stores(store_ids, clusters)
+        for cluster_id, group in stores.groupby('static_cluster', sort=True):
+            # 클러스터 하나는 같은 시점의 데이터로 계산 (도중 증분 적재 교체와 무관)
+            with self.loader.pinned():
+                records = self.score_cluster(int(cluster_id), group)
+            yield int(cluster_id), records
+
+    def score_cluster(self, cluster_id: int, group: pd.DataFrame) -> List[Dict]:
+        """한 클러스터 점포들을 벡터 연산으로 진단"""
+        store_ids = group['store_id'].tolist()
+
+        # 1. 룰 위반: 클러스터 룰 × 점포 특성 행렬 비교 한 번
+        engine = self.loader.get_rule_engine()
+        violation_mask, _ = engine.evaluate_frame(cluster_id, group)
+        rules = engine.rules_for(cluster_id)
+        critical_rules = np.array([rule['risk_level'] == '치명적' for rule in rules.records], dtype=bool)
+
+        # 2. 모델 결과: 진단 결과 컬럼을 점포 순서에 맞춰 가져와 벡터 계산
+        diagnosis = self._aligned_columns(
+            'store_diagnosis_results', store_ids, ['total_risk_score', 'sales_prediction', 'event_prediction']
+        )
+        found = diagnosis['__found__'].to_numpy()
+        raw_risk = pd.to_numeric(diagnosis['total_risk_score'], errors='coerce').where(found, 50)
+        raw_risk = raw_risk.to_numpy(dtype=np.float64, na_value=np.nan)
+        risk_score = np.where(found, _safe_numeric(diagnosis['total_risk_score'], 50), 50)
+        survival = np.where(risk_score == 50, 50.0, np.clip(100 - risk_score, 0, 100))
+        sales_prediction = np.where(found, _safe_numeric(diagnosis['sales_prediction'], 0), 0)
+        event_prediction = diagnosis['event_prediction'].astype(object)
+        event_prediction = event_prediction.where(event_prediction.notna() & (event_prediction != ''), '정상 운영')
+        closure_probability = closure_model.score_many(store_ids)
+
+        # 3. 클러스터 지표: 로드 시 만든 템플릿에 점포 값과 클러스터 내 백분위만 채움
+        indicator_specs = self.loader.get_cluster_stats().indicator_specs(cluster_id)
+        templates = [template for _, _, template in indicator_specs]
+        indicator_values = [
+            group[feature].tolist() if feature in group.columns else [0] * len(group)
+            for feature, _, _ in indicator_specs
+        ]
+        indicator_percentiles = [
+            stats.percentiles(pd.to_numeric(pd.Series([value or 0 for value in values], dtype=object), errors='coerce')
+                              .to_numpy(dtype=np.float64, na_value=np.nan))
+            for (_, stats, _), values in zip(indicator_specs, indicator_values)
+        ]
+
+        # 4. 트렌드: 최근 6개월 실제 등급 + 예측
+        actual_points = self._recent_actual_points(store_ids)
+        forecast_points = self._forecast_points(store_ids)
+
+        records = []
+        for i, store_id in enumerate(store_ids):
+            violations = engine.violations_from_row(cluster_id, violation_mask[i], group, i)
+            trend = actual_points.get(store_id, []) + forecast_points.get(store_id, [])
+            trend.sort(key=lambda x: x['month'])
+            records.append({
+                'storeId': store_id,
+                'storeName': _native(group['store_name'].iat[i]) if 'store_name' in group.columns else '',
+                'cluster': cluster_id,
+                'riskScore': _native(raw_risk[i]),
+                'riskLevel': risk_level_from_score(raw_risk[i]),
+                'modelResults': {
+                    'salesPrediction': float(sales_prediction[i]),
+                    'eventPrediction': event_prediction.iat[i],
+                    'survivalProbability': float(survival[i]),
+                    'riskScore': float(risk_score[i]),
+                    'closureProbability': closure_probability[store_id],
+                },
+                'nViolations': int(violation_mask[i].sum()),
+                'nCriticalViolations': int((violation_mask[i] & critical_rules).sum()),
+                'ruleViolations': [
+                    {key: _native(value) for key, value in violation.items()} for violation in violations
+                ],
+                'clusterIndicators': [
+                    {
+                        'value': _native(values[i] or 0),
+                        'percentile': _native(percentiles[i]),
+                        **{k: _native(v) for k, v in template.items()},
+                    }
+                    for template, values, percentiles in zip(templates, indicator_values, indicator_percentiles)
+                ],
+                'trendData': trend,
+            })
+        return records
+
+    def _aligned_columns(self, table: str, store_ids: List[str], columns: List[str]) -> pd.DataFrame:
+        """store_ids 순서에 맞춘 컬럼 값 (없는 점포/컬럼은 NaN, __found__ 로 존재 여부 표시)"""
+        df = self.loader._table(table)
+        index = self.loader._get_index(table)
+        positions = np.array([index.first(store_id) for store_id in store_ids], dtype=object)
+        found = np.array([p is not None for p in positions], dtype=bool)
+        take = np.where(found, positions, 0).astype(np.int64)
+
+        aligned = pd.DataFrame({'__found__': found})
+        for column in columns:
+            if column in df.columns and len(df):
+                values = df[column].iloc[take].astype(object).reset_index(drop=True)
+                aligned[column] = values.where(found, np.nan)
+            else:
+                aligned[column] = np.nan
+        return aligned
+
+    def _recent_actual_points(self, store_ids: List[str]) -> Dict[str, List[Dict]]:
+        """점포별 최근 6개월 실제 등급 포인트 (월 등급 배열 구간 슬라이스)"""
+        grades = self.loader.get_monthly_grades()
+        return {
+            store_id: actual_trend_points(*grades.window(store_id, 6))
+            for store_id in store_ids if store_id in grades
+        }
+
+    def _forecast_points(self, store_ids: List[str]) -> Dict[str, List[Dict]]:
+        """점포별 예측 등급 포인트 (horizon 순)"""
+        rows = self._rows_for('sales_predict', store_ids)
+        if rows is None:
+            return {}
+        rows = rows.sort_values(['store_id', 'horizon'], kind='stable')
+
+        points: Dict[str, List[Dict]] = {}
+        for pred in rows.to_dict('records'):
+            points.setdefault(pred['store_id'], []).append(
+                {key: _native(value) for key, value in forecast_trend_point(pred).items()}
+            )
+        return points
+
+    def _rows_for(self, table: str, store_ids: List[str]) -> Optional[pd.DataFrame]:
+        """여러 점포의 행을 인덱스로 한 번에 수집"""
+        df = self.loader._table(table)
+        index = self.loader._get_index(table)
+        chunks = [p for p in (index.positions(store_id) for store_id in store_ids) if p is not None]
+        if not chunks:
+            return None
+        return df.iloc[np.concatenate(chunks)]
+
+    def iter_ndjson(self, store_ids: Optional[Iterable[str]] = None,
+                    clusters: Optional[Iterable[int]] = None) -> Iterator[str]:
+        """NDJSON 라인 스트림 (API StreamingResponse 용)"""
+        for record in self.iter_records(store_ids, clusters):
+            yield json.dumps(record, ensure_ascii=False, default=_native) + "\n"
+
+    def write_ndjson(self, fp: TextIO, store_ids: Optional[Iterable[str]] = None,
+                     clusters: Optional[Iterable[int]] = None) -> int:
+        count = 0
+        for line in self.iter_ndjson(store_ids, clusters):
+            fp.write(line)
+            count += 1
+        return count
+
+    def write_parquet(self, path: Path, store_ids: Optional[Iterable[str]] = None,
+                      clusters: Optional[Iterable[int]] = None) -> int:
+        """클러스터 단위 row group 으로 Parquet 파일에 순차 기록
+
+        중첩 필드(위반/지표/트렌드)는 JSON 문자열 컬럼으로 저장합니다.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('storeId', pa.string()), ('storeName', pa.string()), ('cluster', pa.int64()),
+            ('riskScore', pa.float64()), ('riskLevel', pa.string()),
+            ('salesPrediction', pa.float64()), ('eventPrediction', pa.string()),
+            ('survivalProbability', pa.float64()), ('modelRiskScore', pa.float64()),
+            ('closureProbability', pa.float64()),
+            ('nViolations', pa.int64()), ('nCriticalViolations', pa.int64()),
+            ('ruleViolations', pa.string()), ('clusterIndicators', pa.string()), ('trendData', pa.string()),
+        ])
+        count = 0
+        with pq.ParquetWriter(str(path), schema) as writer:
+            for _, records in self.iter_cluster_batches(store_ids, clusters):
+                columns = {name: [] for name in schema.names}
+                for record in records:
+                    model = record['modelResults']
+                    row = {
+                        'storeId': record['storeId'], 'storeName': str(record['storeName']),
+                        'cluster': record['cluster'], 'riskScore': record['riskScore'],
+                        'riskLevel': record['riskLevel'],
+                        'salesPrediction': model['salesPrediction'], 'eventPrediction': str(model['eventPrediction']),
+                        'survivalProbability': model['survivalProbability'], 'modelRiskScore': model['riskScore'],
+                        'closureProbability': model['closureProbability'],
+                        'nViolations': record['nViolations'], 'nCriticalViolations': record['nCriticalViolations'],
+                        'ruleViolations': json.dumps(record['ruleViolations'], ensure_ascii=False, default=_native),
+                        'clusterIndicators': json.dumps(record['clusterIndicators'], ensure_ascii=False, default=_native),
+                        'trendData': json.dumps(record['trendData'], ensure_ascii=False, default=_native),
+                    }
+                    for name in schema.names:
+                        columns[name].append(row[name])
+                writer.write_table(pa.table(columns, schema=schema))
+                count += len(records)
+        return count
+
+
+# 싱글톤 인스턴스
+batch_scorer = BatchScorer()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 가맹점 일괄 위험 진단 (NDJSON / Parquet)")
+    parser.add_argument("--out", default="-", help="출력 파일 (.ndjson / .parquet, 기본: 표준출력 NDJSON)")
+    parser.add_argument("--store-id", action="append", dest="store_ids", help="대상 점포 ID (반복 가능)")
+    parser.add_argument("--cluster", action="append", type=int, dest="clusters", help="대상 클러스터 (반복 가능)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # 로드 로그가 NDJSON 표준출력에 섞이지 않도록 stderr 로 보냄
+    with contextlib.redirect_stdout(sys.stderr):
+        data_loader.load_all()
+
+    if args.out == "-":
+        count = batch_scorer.write_ndjson(sys.stdout, args.store_ids, args.clusters)
+    elif args.out.endswith(".parquet"):
+        count = batch_scorer.write_parquet(Path(args.out), args.store_ids, args.clusters)
+    else:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            count = batch_scorer.write_ndjson(f, args.store_ids, args.clusters)
+    print(f"✅ {count}개 점포 진단 완료 ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+이벤트 시퀀스 모델 기반 폐업 확률 서빙
+
+`app.ml.training_windows` 가 models/ 에 내보낸 모델과 사전을 한 번만 로드하고,
+점포의 이벤트 시퀀스 다음 이벤트가 '폐업' 일 확률(노트북 predict_closure_risk)을 계산합니다.
+
+- GRU: 내보낸 가중치(npz)로 numpy 순전파 - TensorFlow 없이 CPU 에서 실행
+- 그 외(Transformer): .keras 모델을 CPU 전용으로 로드 (TensorFlow 필요)
+
+리포트 요청은 스레드풀에서 동시에 들어오므로, 짧은 윈도우(CLOSURE_BATCH_WINDOW_MS) 동안 모인
+요청을 한 배치로 묶어 추론하고, 지연 예산(CLOSURE_TIMEOUT_MS)을 넘기면 None 을 반환합니다.
+이 None 은 일시적인 값이므로 리포트 캐시에 저장되지 않습니다.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.ml.event_sequence import CLOSURE_EVENT, EventSequences
+from app.ml.training_windows import (
+    GRU_WEIGHTS_FILE, KERAS_MODEL_FILE, META_FILE, SEQUENCES_FILE, transformer_block_class
+)
+from app.services.data_loader import data_loader
+from app.services.metrics import CLOSURE_BATCH_SIZE, CLOSURE_INFERENCE_SECONDS, CLOSURE_REQUESTS_TOTAL
+
+# 다시 요청하면 값이 나올 수 있는 결과 (지연 예산 초과 / 추론 실패)
+TRANSIENT_OUTCOMES = frozenset({'timeout', 'error'})
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class NumpyGRU:
+    """Keras Embedding → GRU(reset_after=True) → Dense(softmax) 순전파"""
+
+    def __init__(self, weights: Dict[str, np.ndarray], closure_idx: int):
+        embedding = weights['embedding'].astype(np.float32)
+        kernel = weights['kernel'].astype(np.float32)
+        bias = weights['bias'].astype(np.float32)
+        if bias.ndim != 2:
+            raise ValueError("reset_after=True 로 학습된 GRU 가중치만 지원합니다.")
+        self.units = weights['recurrent_kernel'].shape[0]
+        self.recurrent_kernel = weights['recurrent_kernel'].astype(np.float32)
+        self.recurrent_bias = bias[1]
+        # 입력은 항상 이벤트 코드 → 코드별 입력 투영(x·W + b) 을 미리 계산해 조회만 함
+        self.input_projection = embedding @ kernel + bias[0]
+        self.dense_kernel = weights['dense_kernel'].astype(np.float32)
+        self.dense_bias = weights['dense_bias'].astype(np.float32)
+        self.closure_idx = closure_idx
+
+    def _step(self, h: np.ndarray, x_proj: np.ndarray) -> np.ndarray:
+        u = self.units
+        h_proj = h @ self.recurrent_kernel + self.recurrent_bias
+        z = _sigmoid(x_proj[:, :u] + h_proj[:, :u])
+        r = _sigmoid(x_proj[:, u:2 * u] + h_proj[:, u:2 * u])
+        hh = np.tanh(x_proj[:, 2 * u:] + r * h_proj[:, 2 * u:])
+        return z * h + (1.0 - z) * hh
+
+    def closure_proba(self, X: np.ndarray) -> np.ndarray:
+        """(batch, max_len) 코드 → '폐업' 확률 (batch,)"""
+        h = np.zeros((len(X), self.units), dtype=np.float32)
+        # 배치 전체가 패딩인 앞부분은 모든 행이 같은 상태 → 한 행만 계산 후 복제
+        n_pad = int(np.argmax((X != 0).any(axis=0))) if (X != 0).any() else X.shape[1]
+        if n_pad:
+            h0 = h[:1]
+            pad_proj = self.input_projection[:1]
+            for _ in range(n_pad):
+                h0 = self._step(h0, pad_proj)
+            h = np.repeat(h0, len(X), axis=0)
+        for t in range(n_pad, X.shape[1]):
+            h = self._step(h, self.input_projection[X[:, t]])
+        logits = h @ self.dense_kernel + self.dense_bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs[:, self.closure_idx] / probs.sum(axis=1)
+
+
+class KerasClosureModel:
+    """.keras 모델 CPU 추론 (GPU 비활성화, 스레드 수 고정)"""
+
+    def __init__(self, path: Path, closure_idx: int, threads: int):
+        os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+        import tensorflow as tf
+
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except RuntimeError:
+            # 같은 프로세스에서 TensorFlow 가 이미 초기화됨 (학습 직후 로드 등) - 기존 스레드 설정 유지
+            print("⚠️  TensorFlow 가 이미 초기화되어 CLOSURE_THREADS 설정을 적용하지 못했습니다.")
+        block = transformer_block_class()
+        self.model = tf.keras.models.load_model(
+            path, compile=False, custom_objects={'TransformerBlock': block, 'franchise>TransformerBlock': block}
+        )
+        self.closure_idx = closure_idx
+
+    def closure_proba(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model(X, training=False))[:, self.closure_idx]
+
+
+class ClosureModel:
+    """폐업 확률 서빙 (지연 로드 + 마이크로 배칭)"""
+
+    def __init__(self, batch_window_ms: float = 5.0, max_batch: int = 64, timeout_ms: float = 200.0,
+                 threads: int = 1):
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.timeout = timeout_ms / 1000
+        self.threads = threads
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._model = None
+        self._sequences: Optional[EventSequences] = None
+        self._row_of: Dict[str, int] = {}
+        self.meta: Dict = {}
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return self.load()
+
+    def load(self) -> bool:
+        """models/ 의 내보낸 모델/사전/시퀀스 로드 (최초 1회) → 사용 가능 여부"""
+        if self._loaded:
+            return self._model is not None
+        with self._lock:
+            if self._loaded:
+                return self._model is not None
+            try:
+                self._load_artifacts(data_loader.models_dir)
+            except Exception as e:
+                print(f"⚠️  폐업 예측 모델 로드 실패: {e}")
+                self._model = None
+            self._loaded = True
+            return self._model is not None
+
+    def _load_artifacts(self, models_dir: Path) -> None:
+        meta = data_loader.load_model_artifact(META_FILE)
+        if meta is None:
+            print(f"ℹ️  폐업 예측 모델 없음 ({models_dir / META_FILE}) - closureProbability 생략")
+            return
+
+        start = time.perf_counter()
+        closure_idx = meta['closure_idx']
+        if (models_dir / GRU_WEIGHTS_FILE).exists():
+            with np.load(models_dir / GRU_WEIGHTS_FILE) as weights:
+                model = NumpyGRU(dict(weights), closure_idx)
+            backend = 'numpy'
+        else:
+            model = KerasClosureModel(models_dir / KERAS_MODEL_FILE, closure_idx, self.threads)
+            backend = 'keras'
+
+        sequences = EventSequences.load(models_dir / SEQUENCES_FILE)
+        if sequences.vocab != meta['vocab']:
+            raise ValueError("이벤트 시퀀스와 모델의 사전이 다릅니다. 같은 학습 결과로 다시 내보내세요.")
+
+        self.meta = meta
+        self._sequences = sequences
+        self._row_of = {str(store_id): i for i, store_id in enumerate(sequences.store_ids)}
+        self._model = model
+
+        # 첫 요청 지연이 튀지 않도록 최대 배치 크기로 한 번 실행
+        model.closure_proba(np.zeros((self.max_batch, meta['max_len']), dtype=sequences.codes.dtype))
+        print(f"✅ 폐업 예측 모델 로드 완료: {meta.get('model', '?')}/{backend}, "
+              f"{len(sequences):,} 점포 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    def _encode(self, rows: List[int]) -> np.ndarray:
+        """점포 행 → pad_sequences(padding='pre', truncating='pre') 입력"""
+        max_len = self.meta['max_len']
+        X = np.zeros((len(rows), max_len), dtype=self._sequences.codes.dtype)
+        for i, row in enumerate(rows):
+            codes = self._sequences.sequence(row)[-max_len:]
+            if len(codes):
+                X[i, max_len - len(codes):] = codes
+        return X
+
+    def score_many(self, store_ids: Iterable[str]) -> Dict[str, Optional[float]]:
+        """점포 목록 폐업 확률 (동기, 일괄 처리용)
+
+        시퀀스가 없거나 이미 '폐업' 으로 끝난 점포는 None (노트북과 같이 운영 중 점포만 예측).
+        """
+        store_ids = list(store_ids)
+        result: Dict[str, Optional[float]] = dict.fromkeys(store_ids)
+        if not self.load():
+            return result
+
+        closure_code = self._sequences.event2idx.get(CLOSURE_EVENT)
+        targets, rows = [], []
+        for store_id in result:
+            row = self._row_of.get(store_id)
+            if row is None:
+                continue
+            sequence = self._sequences.sequence(row)
+            if len(sequence) and sequence[-1] == closure_code:
+                continue
+            targets.append(store_id)
+            rows.append(row)
+
+        for i in range(0, len(rows), self.max_batch):
+            start = time.perf_counter()
+            probs = self._model.closure_proba(self._encode(rows[i:i + self.max_batch]))
+            CLOSURE_INFERENCE_SECONDS.observe(time.perf_counter() - start)
+            CLOSURE_BATCH_SIZE.observe(len(probs))
+            for store_id, prob in zip(targets[i:i + self.max_batch], probs):
+                result[store_id] = round(float(prob), 6)
+        return result
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run_batches, name="closure-batcher", daemon=True)
+                    self._worker.start()
+
+    def _run_batches(self) -> None:
+        """첫 요청 이후 batch_window 동안(또는 max_batch 까지) 모인 요청을 한 번에 추론"""
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                scores = self.score_many(store_id for store_id, _ in pending)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            for store_id, future in pending:
+                future.set_result(scores.get(store_id))
+
+    def score(self, store_id: str) -> Optional[float]:
+        """점포 1곳 폐업 확률 (마이크로 배칭, 지연 예산 초과/모델 없음이면 None)"""
+        return self.score_with_outcome(store_id)[0]
+
+    def score_with_outcome(self, store_id: str) -> Tuple[Optional[float], str]:
+        """점포 1곳 폐업 확률 + 결과 구분 (scored / unavailable / unknown_store / timeout / error)
+
+        timeout / error 의 None 은 일시적이므로 결과를 저장하는 쪽은 캐시하지 않아야 합니다 (TRANSIENT_OUTCOMES).
+        """
+        if not self.load():
+            CLOSURE_REQUESTS_TOTAL.inc('unavailable')
+            return None, 'unavailable'
+        if store_id not in self._row_of:
+            CLOSURE_REQUESTS_TOTAL.inc('unknown_store')
+            return None, 'unknown_store'
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((store_id, future))
+        try:
+            probability = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            CLOSURE_REQUESTS_TOTAL.inc('timeout')
+            print(f"⚠️  폐업 확률 계산 지연 ({self.timeout * 1000:.0f}ms 초과): {store_id}")
+            return None, 'timeout'
+        except Exception as e:
+            CLOSURE_REQUESTS_TOTAL.inc('error')
+            print(f"⚠️  폐업 확률 계산 실패: {e}")
+            return None, 'error'
+        CLOSURE_REQUESTS_TOTAL.inc('scored')
+        return probability, 'scored'
+
+    def stats(self) -> Dict:
+        return {
+            'available': self._model is not None,
+            'model': self.meta.get('model'),
+            'stores': len(self._row_of),
+            'maxLen': self.meta.get('max_len'),
+            'batchWindowMs': self.batch_window * 1000,
+            'maxBatch': self.max_batch,
+            'timeoutMs': self.timeout * 1000,
+        }
+
+
+# 싱글톤 인스턴스
+closure_model = ClosureModel(
+    batch_window_ms=float(os.getenv("CLOSURE_BATCH_WINDOW_MS", "5")),
+    max_batch=int(os.getenv("CLOSURE_MAX_BATCH", "64")),
+    timeout_ms=float(os.getenv("CLOSURE_TIMEOUT_MS", "200")),
+    threads=int(os.getenv("CLOSURE_THREADS", "1")),
+)
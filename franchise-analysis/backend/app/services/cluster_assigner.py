@@ -0,0 +1,96 @@
+"""
+신규/변경 점포 static_cluster 온라인 배정
+
+`app.ml.clustering` 이 models/ 에 저장한 결측 대체값·스케일러·중심점을 한 번만 로드해
+표준화 → 가장 가까운 중심점을 행렬곱 한 번으로 계산합니다 (scikit-learn 불필요).
+노트북 클러스터링을 다시 돌리지 않고도 점포 1곳부터 수천 곳까지 같은 경로로 배정하며,
+번호는 학습 때 기존 static_cluster 에 맞춰 두었으므로 cluster_metadata / 룰의 cluster_id 와 이어집니다.
+"""
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.ml.clustering import CLUSTER_MODEL_FILE, StaticClusterModel
+
+CLUSTER_COLUMN = 'static_cluster'
+
+
+class ClusterAssigner:
+    """저장된 정적 클러스터 모델로 nearest-centroid 배정"""
+
+    def __init__(self, models_dir: Path, chunk_size: int = 65536):
+        self.models_dir = Path(models_dir)
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._model: Optional[StaticClusterModel] = None
+        self.assigned = 0
+
+    @property
+    def available(self) -> bool:
+        return self.load()
+
+    def load(self) -> bool:
+        """models/ 의 클러스터 모델 로드 (최초 1회) → 사용 가능 여부"""
+        if self._loaded:
+            return self._model is not None
+        with self._lock:
+            if self._loaded:
+                return self._model is not None
+            path = self.models_dir / CLUSTER_MODEL_FILE
+            if not path.exists():
+                print(f"ℹ️  클러스터 모델 없음 ({path}) - static_cluster 가 없는 점포는 배정하지 않음")
+            else:
+                try:
+                    with open(path, 'rb') as f:
+                        self._model = StaticClusterModel.from_dict(pickle.load(f))
+                    print(f"✅ 클러스터 모델 로드 완료: K={self._model.k}, 특성 {len(self._model.features)}개")
+                except Exception as e:
+                    print(f"⚠️  클러스터 모델 로드 실패: {e}")
+                    self._model = None
+            self._loaded = True
+            return self._model is not None
+
+    def assign(self, stores: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """점포 특성 → (cluster_id 배열, 중심점까지 거리 배열) - 모델이 없으면 RuntimeError"""
+        if not self.load():
+            raise RuntimeError(f"클러스터 모델이 없습니다: {self.models_dir / CLUSTER_MODEL_FILE}")
+        ids, distances = self._model.nearest(stores, self.chunk_size)
+        self.assigned += len(ids)
+        return ids, distances
+
+    def assign_one(self, store: Dict) -> Tuple[int, float]:
+        """점포 1곳 → (cluster_id, 거리)"""
+        ids, distances = self.assign(pd.DataFrame([store]))
+        return int(ids[0]), float(distances[0])
+
+    def fill_missing(self, stores: pd.DataFrame, dtype=np.int64) -> Tuple[pd.DataFrame, int]:
+        """static_cluster 가 없는(컬럼 없음/결측) 점포만 배정 → (채운 DataFrame, 배정한 점포 수)
+
+        모델이 없어 채울 수 없으면 RuntimeError.
+        """
+        clusters = (pd.to_numeric(stores[CLUSTER_COLUMN], errors='coerce') if CLUSTER_COLUMN in stores.columns
+                    else pd.Series(np.nan, index=stores.index))
+        missing = clusters.isna().to_numpy()
+        if not missing.any():
+            return stores, 0
+        ids, _ = self.assign(stores[missing])
+        values = clusters.to_numpy(dtype=np.float64, copy=True)
+        values[missing] = ids
+        stores = stores.copy()
+        stores[CLUSTER_COLUMN] = values.astype(dtype)
+        return stores, int(missing.sum())
+
+    def stats(self) -> Dict:
+        model = self._model
+        return {
+            'available': model is not None,
+            'k': model.k if model is not None else None,
+            'clusterIds': [int(c) for c in model.cluster_ids] if model is not None else [],
+            'features': len(model.features) if model is not None else 0,
+            'assigned': self.assigned,
+        }
@@ -0,0 +1,137 @@
+"""
+클러스터(static_cluster)별 룰 특성 통계
+
+로드 후 1회, 클러스터마다 해당 클러스터 룰에 쓰이는 특성의 평균/중앙값/분위수와 정렬된 값 배열을 만들어 둡니다.
+리포트의 클러스터 지표는 미리 만든 템플릿에 점포 값만 채우고, 백분위 위치는 정렬 배열 이진 탐색으로 계산합니다.
+"""
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.rule_engine import RuleEngine
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+INDICATOR_COUNT = 5  # 리포트에 보여줄 상위 룰 수
+
+
+def indicator_template(rule: Dict, stats: Optional["FeatureStats"] = None) -> Dict:
+    """룰 1개에 대한 클러스터 지표 (점포 값 'value' / 'percentile' 제외)"""
+    feature = rule['feature']
+    feature_korean = rule['feature_korean']
+    risk_level = rule['risk_level']
+
+    # 단위 결정
+    unit = '%' if 'ratio' in feature else '회' if 'count' in feature else '점'
+
+    has_stats = stats is not None and stats.count > 0
+    return {
+        'name': feature_korean,
+        # 클러스터 실제 평균 (값이 있는 점포가 없으면 임계값)
+        'clusterAvg': stats.mean if has_stats else rule['threshold'],
+        'clusterMedian': stats.median if has_stats else None,
+        'threshold': rule['threshold'],
+        'unit': unit,
+        'description': f'{feature_korean} ({risk_level})',
+        # >= 이면 높을수록 좋음, <= 이면 낮을수록 좋음
+        'isPositive': rule['direction'] == '>=',
+        'riskLevel': risk_level
+    }
+
+
+class FeatureStats:
+    """클러스터 1곳의 특성 1개 분포 (유한한 값만)"""
+
+    __slots__ = ('values', 'count', 'mean', 'median', 'quantiles')
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.sort(values[np.isfinite(values)])
+        self.count = len(self.values)
+        if self.count:
+            quantiles = np.quantile(self.values, QUANTILES)
+            self.mean = float(self.values.mean())
+            self.quantiles = {f"p{round(q * 100)}": float(v) for q, v in zip(QUANTILES, quantiles)}
+        else:
+            self.mean = None
+            self.quantiles = {f"p{round(q * 100)}": None for q in QUANTILES}
+        self.median = self.quantiles['p50']
+
+    def percentiles(self, values: np.ndarray) -> np.ndarray:
+        """값 배열의 클러스터 내 백분위 (0-100, 같은 값은 중간 순위, 값이 없으면 NaN)"""
+        values = np.asarray(values, dtype=np.float64)
+        if not self.count:
+            return np.full(values.shape, np.nan)
+        below = np.searchsorted(self.values, values, side='left')
+        at_or_below = np.searchsorted(self.values, values, side='right')
+        result = np.round((below + at_or_below) / 2 / self.count * 100, 1)
+        return np.where(np.isfinite(values), result, np.nan)
+
+    def percentile(self, value) -> Optional[float]:
+        try:
+            result = float(self.percentiles(np.array([float(value)]))[0])
+        except (TypeError, ValueError):
+            return None
+        return None if np.isnan(result) else result
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'median': self.median, **self.quantiles}
+
+
+class ClusterStats:
+    """클러스터별 룰 특성 통계 + 지표 템플릿 (로드 후 1회 생성, 읽기 전용)"""
+
+    def __init__(self, features_df: pd.DataFrame, rule_engine: RuleEngine, cluster_column: str = 'static_cluster'):
+        self._stats: Dict[Hashable, Dict[str, FeatureStats]] = {}
+        self._indicators: Dict[Hashable, List[tuple]] = {}
+        groups = features_df.groupby(cluster_column, sort=False, observed=True).indices if len(features_df) else {}
+
+        for cluster_id in rule_engine.cluster_ids():
+            rules = rule_engine.rules_for(cluster_id)
+            positions = groups.get(cluster_id, np.empty(0, dtype=np.int64))
+            values = rules.values_from_frame(features_df.iloc[positions])
+
+            stats: Dict[str, FeatureStats] = {}
+            for j, feature in enumerate(rules.features):
+                if feature not in stats:
+                    stats[feature] = FeatureStats(values[:, j])
+            self._stats[cluster_id] = stats
+            # (특성, 분포, 템플릿) - 요청마다 룰을 다시 읽지 않도록 클러스터당 1번 생성
+            self._indicators[cluster_id] = [
+                (rule['feature'], stats[rule['feature']], indicator_template(rule, stats[rule['feature']]))
+                for rule in rules.records[:INDICATOR_COUNT]
+            ]
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def feature_stats(self, cluster_id: int, feature: str) -> Optional[FeatureStats]:
+        return self._stats.get(cluster_id, {}).get(feature)
+
+    def summary(self, cluster_id: int) -> Dict[str, Dict]:
+        """클러스터의 특성별 통계 {특성: {count, mean, median, p10...p90}}"""
+        return {feature: stats.to_dict() for feature, stats in self._stats.get(cluster_id, {}).items()}
+
+    def indicator_specs(self, cluster_id: int) -> List[tuple]:
+        """클러스터 지표 (특성, 분포, 템플릿) 목록 - 배치 작업용"""
+        return self._indicators.get(cluster_id, [])
+
+    def indicators(self, cluster_id: int, store_data: Dict) -> List[Dict]:
+        """점포 1곳의 클러스터 지표 (템플릿 + 점포 값/백분위)"""
+        indicators = []
+        for feature, stats, template in self._indicators.get(cluster_id, []):
+            value = store_data.get(feature, 0) or 0
+            indicators.append({'value': value, 'percentile': stats.percentile(value), **template})
+        return indicators
+
+    def indicators_many(self, cluster_id: int, stores: List[Dict]) -> List[List[Dict]]:
+        """같은 클러스터 점포 여러 곳의 클러스터 지표 (특성별 백분위는 배열 연산 1번, 결과는 indicators 와 동일)"""
+        result: List[List[Dict]] = [[] for _ in stores]
+        for feature, stats, template in self._indicators.get(cluster_id, []):
+            values = [store_data.get(feature, 0) or 0 for store_data in stores]
+            numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+            percentiles = stats.percentiles(numeric.to_numpy(dtype=np.float64, na_value=np.nan)).tolist()
+            for indicators, value, percentile in zip(result, values, percentiles):
+                indicators.append({
+                    'value': value, 'percentile': None if np.isnan(percentile) else percentile, **template
+                })
+        return result
@@ -1,16 +1,53 @@
+import hashlib
+import logging
+import numpy as np
 import pandas as pd
 import pickle
 import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.cluster_assigner import CLUSTER_COLUMN, ClusterAssigner
+from app.services.cluster_stats import ClusterStats
+from app.services.mmap_store import load_shared_table
+from app.services.monthly_grades import MonthlyGrades
+from app.services.rule_engine import RuleEngine
+from app.services.snapshot import parse_table, source_fingerprint
+from app.services.store_index import StoreIndex
+
+logger = logging.getLogger(__name__)
+
+
+class DataView:
+    """한 시점의 테이블/인덱스 묶음 - 처리 중 증분 적재로 교체되어도 요청 끝까지 유지"""
+
+    __slots__ = ('tables', 'indexes', 'version', 'monthly_grades')
+
+    def __init__(self, tables: Dict[str, pd.DataFrame], indexes: Dict, version: str,
+                 monthly_grades: Optional[MonthlyGrades] = None):
+        self.tables = tables
+        self.indexes = indexes
+        self.version = version
+        self.monthly_grades = monthly_grades
+
+
+# 현재 요청(스레드/태스크)에 고정된 데이터 뷰
+_pinned_view: ContextVar[Optional[DataView]] = ContextVar('pinned_data_view', default=None)
 
 
 class DataLoader:
     """CSV 파일 로드 및 전처리"""
     
     def __init__(self):
-        self.data_dir = Path(__file__).parent.parent.parent / "data"
-        self.models_dir = Path(__file__).parent.parent.parent / "models"
+        self.data_dir = Path(os.getenv("DATA_DIR", Path(__file__).parent.parent.parent / "data"))
+        self.models_dir = Path(os.getenv("MODELS_DIR", Path(__file__).parent.parent.parent / "models"))
+        
+        # 데이터 플레인: memory(워커별 DataFrame) 또는 mmap(워커 간 공유 매핑)
+        self.data_plane = os.getenv("DATA_PLANE", "memory").lower()
         
         # 데이터 캐시
         self._store_features = None
@@ -20,112 +57,432 @@ class DataLoader:
         self._risk_checklist_rules = None
         self._store_monthly_timeseries = None
         self._sales_predict = None
+        
+        # 테이블별 로드 상태/오류와 로드 잠금 (DATA_LOAD_MODE=lazy 면 처음 접근할 때 로드)
+        self.load_mode = os.getenv("DATA_LOAD_MODE", "eager").lower()
+        self._table_states: Dict[str, str] = {table: 'pending' for table in self._TABLE_LABELS}
+        self._table_errors: Dict[str, str] = {}
+        self._table_locks = {table: threading.Lock() for table in self._TABLE_LABELS}
+        
+        # 작은 조회 테이블의 딕셔너리 (특성 → 한국어 이름, cluster_id → 메타데이터)
+        self._feature_names: Optional[Dict[str, str]] = None
+        self._cluster_records: Optional[Dict] = None
+        
+        # 조회용 해시 인덱스 캐시 (테이블 이름 → StoreIndex)
+        self._indexes: Dict[str, StoreIndex] = {}
+        
+        # 점포별 월 등급 CSR 배열 (store_monthly_timeseries 파생)
+        self._monthly_grades: Optional[MonthlyGrades] = None
+        
+        # 클러스터별 컴파일된 룰 엔진
+        self._rule_engine: Optional[RuleEngine] = None
+        
+        # 클러스터별 룰 특성 통계 (평균/중앙값/분위수)
+        self._cluster_stats: Optional[ClusterStats] = None
+        
+        # static_cluster 가 없는 신규 점포 배정 (models/ 의 스케일러 + 중심점)
+        self.cluster_assigner = ClusterAssigner(self.models_dir)
+        
+        # 테이블별 로드 소스/소요 시간 (snapshot 또는 csv)
+        self.load_timings: Dict[str, Dict] = {}
+        
+        # 로드된 테이블별 원본 버전 → 데이터 버전 (리포트 캐시 무효화 기준)
+        self._fingerprints: Dict[str, str] = {}
+        self._data_version: Optional[str] = None
+        
+        # 증분 적재: 적용한 델타 이름, 테이블별 대체되어 조회되지 않는 행 수
+        self.applied_deltas: Set[str] = set()
+        self._dead_rows: Dict[str, int] = {}
+        self._swap_lock = threading.Lock()    # 테이블/인덱스 교체 ↔ 뷰 고정
+        self._ingest_lock = threading.Lock()  # 델타 적용 직렬화
+    
+    def _read_table(self, table: str) -> pd.DataFrame:
+        """스냅샷 우선 로드, 없거나 오래되었으면 CSV 파싱 (소요 시간 기록)
+        
+        DATA_PLANE=mmap 이면 워커 간 공유되는 읽기 전용 매핑 테이블에 연결합니다.
+        """
+        start = time.perf_counter()
+        if self.data_plane == "mmap":
+            df = load_shared_table(self.data_dir, table, lambda: parse_table(self.data_dir, table)[0])
+            source = "mmap"
+        else:
+            df, source = parse_table(self.data_dir, table)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.load_timings[table] = {'source': source, 'ms': round(elapsed_ms, 1)}
+        self._fingerprints[table] = source_fingerprint(self.data_dir, table)
+        self._data_version = None
+        print(f"   ⏱️  {table}: {source} {elapsed_ms:.1f}ms")
+        return df
+    
+    # 테이블 → 로드 완료 메시지 이름 (load_all 순서)
+    _TABLE_LABELS = {
+        'store_features': '점포 특성 데이터',
+        'store_diagnosis_results': '점포 진단 결과 데이터',
+        'cluster_metadata': '클러스터 메타데이터',
+        'feature_dictionary': '특성 사전 데이터',
+        'risk_checklist_rules': '위험 체크리스트 룰 데이터',
+        'store_monthly_timeseries': '점포 월별 시계열 데이터',
+        'sales_predict': '매출 예측 데이터',
+    }
+    
+    def _load_table(self, table: str) -> pd.DataFrame:
+        """테이블을 처음 접근할 때 1회 로드 (테이블별 잠금 - 동시에 접근한 요청은 로드가 끝날 때까지 대기)"""
+        df = getattr(self, f"_{table}")
+        if df is not None:
+            return df
+        with self._table_locks[table]:
+            df = getattr(self, f"_{table}")
+            if df is not None:
+                return df
+            self._table_states[table] = 'loading'
+            try:
+                df = self._read_table(table)
+                if table == 'store_features':
+                    df = self._assign_missing_clusters(df)
+            except Exception as e:
+                self._table_states[table] = 'error'
+                self._table_errors[table] = str(e)
+                raise
+            setattr(self, f"_{table}", df)
+            self._table_states[table] = 'ready'
+            self._table_errors.pop(table, None)
+            print(f"✅ {self._TABLE_LABELS[table]} 로드 완료: {len(df)}개")
+            return df
+    
+    def _assign_missing_clusters(self, df: pd.DataFrame) -> pd.DataFrame:
+        """static_cluster 가 없는 점포를 클러스터 모델로 배정 (모델이 없으면 그대로 반환)"""
+        if CLUSTER_COLUMN in df.columns and not pd.to_numeric(df[CLUSTER_COLUMN], errors='coerce').isna().any():
+            return df
+        try:
+            df, count = self.cluster_assigner.fill_missing(df)
+        except RuntimeError as e:
+            print(f"⚠️  static_cluster 배정 불가: {e}")
+            return df
+        print(f"🧭 static_cluster 배정: {count:,}개 점포")
+        return df
     
     def load_store_features(self) -> pd.DataFrame:
         """점포 특성 데이터 로드"""
-        if self._store_features is None:
-            csv_path = self.data_dir / "final_features_per_store.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"1002_store_features.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            # 🚨🚨🚨 이 부분이 유일한 해결책입니다 🚨🚨🚨
-            # index_col=False 를 추가해서,
-            # 파일의 첫 번째 열(그 '183'이 들어있는)을 인덱스로 안 쓰게 막고
-            # 0, 1, 2, 3... 순서대로 행 번호 인덱스를 강제로 만듭니다.
-            self._store_features = pd.read_csv(csv_path, index_col=False) 
-            
-            self._store_features.columns = self._store_features.columns.str.strip()
-            print(f"✅ 점포 특성 데이터 로드 완료: {len(self._store_features)}개")
-        
-        return self._store_features
+        return self._load_table('store_features')
     
     def load_store_diagnosis_results(self) -> pd.DataFrame:
         """점포 진단 결과 데이터 로드"""
-        if self._store_diagnosis_results is None:
-            csv_path = self.data_dir / "store_diagnosis_results_2.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"store_diagnosis_results.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            self._store_diagnosis_results = pd.read_csv(csv_path)
-            self._store_diagnosis_results.columns = self._store_diagnosis_results.columns.str.strip()
-            print(f"✅ 점포 진단 결과 데이터 로드 완료: {len(self._store_diagnosis_results)}개")
-        
-        return self._store_diagnosis_results
+        return self._load_table('store_diagnosis_results')
     
     def load_cluster_metadata(self) -> pd.DataFrame:
         """클러스터 메타데이터 로드"""
-        if self._cluster_metadata is None:
-            csv_path = self.data_dir / "cluster_metadata.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"cluster_metadata.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            self._cluster_metadata = pd.read_csv(csv_path)
-            self._cluster_metadata.columns = self._cluster_metadata.columns.str.strip()
-            print(f"✅ 클러스터 메타데이터 로드 완료: {len(self._cluster_metadata)}개")
-        
-        return self._cluster_metadata
+        return self._load_table('cluster_metadata')
     
     def load_feature_dictionary(self) -> pd.DataFrame:
         """특성 사전 데이터 로드"""
-        if self._feature_dictionary is None:
-            csv_path = self.data_dir / "feature_dictionary.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"feature_dictionary.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            self._feature_dictionary = pd.read_csv(csv_path)
-            self._feature_dictionary.columns = self._feature_dictionary.columns.str.strip()
-            print(f"✅ 특성 사전 데이터 로드 완료: {len(self._feature_dictionary)}개")
-        
-        return self._feature_dictionary
+        return self._load_table('feature_dictionary')
     
     def load_risk_checklist_rules(self) -> pd.DataFrame:
         """위험 체크리스트 룰 데이터 로드"""
-        if self._risk_checklist_rules is None:
-            csv_path = self.data_dir / "risk_checklist_rules_2.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"risk_checklist_rules.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            self._risk_checklist_rules = pd.read_csv(csv_path)
-            self._risk_checklist_rules.columns = self._risk_checklist_rules.columns.str.strip()
-            print(f"✅ 위험 체크리스트 룰 데이터 로드 완료: {len(self._risk_checklist_rules)}개")
-        
-        return self._risk_checklist_rules
+        return self._load_table('risk_checklist_rules')
     
     def load_store_monthly_timeseries(self) -> pd.DataFrame:
         """점포 월별 시계열 데이터 로드"""
-        if self._store_monthly_timeseries is None:
-            csv_path = self.data_dir / "store_monthly_timeseries.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"store_monthly_timeseries.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            self._store_monthly_timeseries = pd.read_csv(csv_path)
-            self._store_monthly_timeseries.columns = self._store_monthly_timeseries.columns.str.strip()
-            print(f"✅ 점포 월별 시계열 데이터 로드 완료: {len(self._store_monthly_timeseries)}개")
-        
-        return self._store_monthly_timeseries
+        return self._load_table('store_monthly_timeseries')
     
     def load_sales_predict(self) -> pd.DataFrame:
         """매출 예측 데이터 로드"""
-        if self._sales_predict is None:
-            csv_path = self.data_dir / "sales_predict_result.csv"
-            if not csv_path.exists():
-                raise FileNotFoundError(f"sales_predict_result.csv 파일을 찾을 수 없습니다: {csv_path}")
-            
-            self._sales_predict = pd.read_csv(csv_path)
-            self._sales_predict.columns = self._sales_predict.columns.str.strip()
-            print(f"✅ 매출 예측 데이터 로드 완료: {len(self._sales_predict)}개")
-        
-        return self._sales_predict
+        return self._load_table('sales_predict')
     
-    def get_store_by_id(self, store_id: str) -> Optional[Dict]:
-        """ID로 점포 조회"""
-        df = self.load_store_features()
-        result = df[df['store_id'] == store_id]
+    def load_all(self) -> None:
+        """전체 테이블 로드 및 조회 인덱스 생성 (실패한 테이블이 있어도 나머지는 로드한 뒤 RuntimeError)"""
+        failed = []
+        for table in self._TABLE_LABELS:
+            try:
+                self._load_table(table)
+            except Exception as e:
+                print(f"❌ {table} 로드 실패: {e}")
+                failed.append(table)
+        if failed:
+            raise RuntimeError(f"테이블 로드 실패: {', '.join(failed)}")
+        print("✅ 모든 데이터 로드 완료")
         
-        if result.empty:
+        # store_id / cluster_id 조회 인덱스 생성
+        self.build_indexes()
+    
+    def prepare_lazy(self) -> None:
+        """지연 로드 모드 시작: 테이블은 읽지 않고 원본 버전만 기록 (테이블을 나중에 읽어도 데이터 버전 유지)"""
+        for table in self._TABLE_LABELS:
+            try:
+                self._fingerprints.setdefault(table, source_fingerprint(self.data_dir, table))
+            except Exception as e:
+                print(f"⚠️  {table} 원본 확인 실패: {e}")
+        self._data_version = None
+    
+    def table_status(self) -> Dict[str, Dict]:
+        """테이블별 로드 상태 (pending / loading / ready / error) + 행 수, 로드 소스/소요 시간, 오류"""
+        status = {}
+        for table in self._TABLE_LABELS:
+            df = getattr(self, f"_{table}")
+            entry = {'state': self._table_states[table]}
+            if df is not None:
+                entry['rows'] = len(df)
+            entry.update(self.load_timings.get(table, {}))
+            if table in self._table_errors:
+                entry['error'] = self._table_errors[table]
+            status[table] = entry
+        return status
+    
+    def reload(self) -> None:
+        """전체 테이블을 다시 로드 (데이터 버전이 바뀌어 리포트 캐시도 무효화됨)"""
+        for table in self._TABLE_LABELS:
+            setattr(self, f"_{table}", None)
+            self._table_states[table] = 'pending'
+        self._table_errors = {}
+        self._feature_names = None
+        self._cluster_records = None
+        self._indexes = {}
+        self._monthly_grades = None
+        self._rule_engine = None
+        self._cluster_stats = None
+        self._fingerprints = {}
+        self._data_version = None
+        self.applied_deltas = set()
+        self._dead_rows = {}
+        if self.load_mode == "lazy":
+            self.prepare_lazy()
+        else:
+            self.load_all()
+    
+    @property
+    def data_version(self) -> str:
+        """로드된 데이터 버전 해시 (테이블을 다시 읽으면 변경)"""
+        if self._data_version is None:
+            digest = hashlib.sha256()
+            for table in sorted(self._fingerprints):
+                digest.update(f"{table}={self._fingerprints[table]};".encode())
+            self._data_version = digest.hexdigest()
+        return self._data_version
+    
+    def load_model_artifact(self, filename: str):
+        """models/ 의 pickle 산출물 로드 (없으면 None)"""
+        path = self.models_dir / filename
+        if not path.exists():
             return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    # 인덱스 대상 테이블: 이름 → (로더, 키 컬럼)
+    _INDEXED_TABLES = {
+        'store_features': ('load_store_features', 'store_id'),
+        'store_diagnosis_results': ('load_store_diagnosis_results', 'store_id'),
+        'store_monthly_timeseries': ('load_store_monthly_timeseries', 'store_id'),
+        'sales_predict': ('load_sales_predict', 'store_id'),
+        'cluster_metadata': ('load_cluster_metadata', 'cluster_id'),
+    }
+    
+    def build_indexes(self) -> None:
+        """로드된 테이블의 조회 인덱스 일괄 생성 (startup 시 1회)"""
+        for table in self._INDEXED_TABLES:
+            self._get_index(table)
+        self.get_rule_engine()
+        self.get_cluster_stats()
+        print(f"✅ 조회 인덱스 생성 완료: {', '.join(f'{t}({len(i)})' for t, i in self._indexes.items())}")
+        grades = self.get_monthly_grades()
+        print(f"✅ 월 등급 배열 생성 완료: {len(grades)} 점포, 점포-월 {len(grades.grades)}개 ({grades.nbytes / 1024:.0f}KB)")
+    
+    def _get_index(self, table: str) -> StoreIndex:
+        """테이블 인덱스 조회 (고정된 뷰가 있으면 뷰의 인덱스, 없으면 생성)"""
+        view = _pinned_view.get()
+        if view is not None and table in view.indexes:
+            return view.indexes[table]
+        index = self._indexes.get(table)
+        if index is not None:
+            return index
+        loader, key = self._INDEXED_TABLES[table]
+        while True:
+            df = getattr(self, loader)()
+            index = StoreIndex(df, key=key)
+            # 생성 중 델타 적용/재로드로 테이블이나 인덱스가 바뀌었으면 이전 테이블의 인덱스는 공개하지 않음
+            with self._swap_lock:
+                current = self._indexes.get(table)
+                if current is not None:
+                    return current
+                if getattr(self, f"_{table}") is df:
+                    self._indexes[table] = index
+                    return index
+    
+    def _table(self, table: str) -> pd.DataFrame:
+        """인덱스 대상 테이블 (고정된 뷰가 있으면 뷰의 테이블)"""
+        view = _pinned_view.get()
+        if view is not None and table in view.tables:
+            return view.tables[table]
+        loader, _ = self._INDEXED_TABLES[table]
+        return getattr(self, loader)()
+    
+    def get_monthly_grades(self) -> MonthlyGrades:
+        """점포별 월 등급 CSR 배열 (고정된 뷰가 있으면 뷰 시점, 최초 1회 생성)"""
+        view = _pinned_view.get()
+        if view is not None and view.monthly_grades is not None:
+            return view.monthly_grades
+        if self._monthly_grades is None:
+            # 델타 적용과 겹치지 않도록 잠그고 현재 테이블의 조회 대상 행으로 생성
+            with self._ingest_lock:
+                if self._monthly_grades is None:
+                    index = self._indexes.get('store_monthly_timeseries')
+                    self._monthly_grades = MonthlyGrades.from_table(
+                        self.load_store_monthly_timeseries(),
+                        index.live_positions() if index is not None else None,
+                    )
+        return self._monthly_grades
+    
+    def _lookup_first(self, table: str, key) -> Optional[Dict]:
+        """인덱스로 첫 번째 일치 행을 dict로 조회"""
+        position = self._get_index(table).first(key)
+        if position is None:
+            return None
+        return self._table(table).iloc[position].to_dict()
+    
+    def _lookup_all(self, table: str, key) -> Optional[pd.DataFrame]:
+        """인덱스로 일치하는 모든 행 조회"""
+        positions = self._get_index(table).positions(key)
+        if positions is None:
+            return None
+        return self._table(table).iloc[positions]
+    
+    @contextmanager
+    def pinned(self) -> Iterator[DataView]:
+        """블록 안의 조회가 모두 같은 시점의 테이블/인덱스를 보도록 고정
+
+        증분 적재가 도중에 테이블을 교체해도 블록 안에서는 이전 데이터를 계속 사용합니다.
+        """
+        view = _pinned_view.get()
+        if view is not None:
+            yield view
+            return
+        with self._swap_lock:
+            tables = {
+                table: getattr(self, f"_{table}") for table in self._INDEXED_TABLES
+                if getattr(self, f"_{table}") is not None and table in self._indexes
+            }
+            view = DataView(tables, {table: self._indexes[table] for table in tables}, self.data_version,
+                            self._monthly_grades)
+        token = _pinned_view.set(view)
+        try:
+            yield view
+        finally:
+            _pinned_view.reset(token)
+    
+    # 증분 적재 대상: 테이블 → 대체 키 (같은 키의 기존 행은 새 행으로 교체)
+    _INGEST_TABLES = {
+        'store_monthly_timeseries': ('store_id', 'date'),  # 점포-월 단위
+        'sales_predict': ('store_id',),                     # 점포의 예측 전체 (새 기준월로 교체)
+        'store_features': ('store_id',),                    # 신규/변경 점포 (static_cluster 없으면 배정)
+    }
+    
+    def prepare_delta(self, table: str, delta: pd.DataFrame) -> pd.DataFrame:
+        """델타를 현재 테이블 컬럼/타입에 맞춤 (필수 컬럼 누락 시 ValueError)"""
+        if table not in self._INGEST_TABLES:
+            raise ValueError(f"증분 적재를 지원하지 않는 테이블입니다: {table}")
+        current = getattr(self, self._INDEXED_TABLES[table][0])()
+        delta = delta.copy()
+        delta.columns = delta.columns.str.strip()
+        if table == 'store_features':
+            delta = self._assign_missing_clusters(delta)
+            if CLUSTER_COLUMN not in delta.columns or pd.to_numeric(delta[CLUSTER_COLUMN], errors='coerce').isna().any():
+                raise ValueError(f"static_cluster 가 없는 점포가 있는데 클러스터 모델이 없습니다 "
+                                 f"(python -m app.ml.clustering --export-dir {self.models_dir})")
+        missing = [column for column in current.columns if column not in delta.columns]
+        if missing:
+            raise ValueError(f"{table} 델타에 필요한 컬럼이 없습니다: {missing}")
+        delta = delta[list(current.columns)].reset_index(drop=True)
+        for column in current.columns:
+            kind = current[column].dtype.kind
+            if kind in 'biuf':
+                delta[column] = pd.to_numeric(delta[column], errors='raise')
+            elif column in self._INGEST_TABLES[table]:
+                delta[column] = delta[column].astype(str)
+        return delta
+    
+    def apply_delta(self, table: str, delta: pd.DataFrame, delta_id: str) -> Dict:
+        """월 델타를 테이블 끝에 붙이고 인덱스를 증분 갱신한 뒤 원자적으로 교체
         
-        return result.iloc[0].to_dict()
+        CSV 를 다시 읽지 않으며, 교체 전에 고정된 뷰(진행 중인 요청)는 이전 데이터를 계속 봅니다.
+        """
+        with self._ingest_lock:
+            if delta_id in self.applied_deltas:
+                return {'table': table, 'deltaId': delta_id, 'rows': 0, 'replacedRows': 0, 'skipped': True}
+            start = time.perf_counter()
+            delta = self.prepare_delta(table, delta)
+            current = getattr(self, self._INDEXED_TABLES[table][0])()
+            index = self._get_index(table)
+            replace_keys = list(self._INGEST_TABLES[table])
+            
+            # 델타와 같은 키를 가진 기존 행 → 조회 대상에서 제외 (행 자체는 남겨 위치 유지)
+            touched = [index.positions(key) for key in pd.unique(delta[index.key])]
+            touched = [positions for positions in touched if positions is not None]
+            dead = np.concatenate(touched) if touched else np.empty(0, dtype=np.int64)
+            if len(dead) and len(replace_keys) > 1:
+                old_keys = pd.MultiIndex.from_frame(current.iloc[dead][replace_keys].astype(str))
+                new_keys = pd.MultiIndex.from_frame(delta[replace_keys].astype(str))
+                dead = dead[old_keys.isin(new_keys)]
+            
+            combined = pd.concat([current, delta], ignore_index=True)
+            new_index = index.appended(delta, offset=len(current), dead_positions=dead)
+            dead_rows = self._dead_rows.get(table, 0) + len(dead)
+            
+            # 대체된 행이 절반을 넘으면 살아 있는 행만 남기고 인덱스 재생성
+            # (점포 특성은 전체를 훑는 소비자 - 클러스터 통계/공간 인덱스/배치 - 가 있어 항상 정리)
+            if dead_rows * 2 > len(combined) or (table == 'store_features' and dead_rows):
+                combined = combined.iloc[new_index.live_positions()].reset_index(drop=True)
+                new_index = StoreIndex(combined, key=index.key)
+                dead_rows = 0
+            
+            # 월 등급 배열은 델타에 나온 점포 구간만 다시 계산
+            monthly_grades = self._monthly_grades
+            if table == 'store_monthly_timeseries' and monthly_grades is not None:
+                monthly_grades = monthly_grades.updated(delta)
+            
+            # 점포 특성이 바뀌면 클러스터 통계도 새 점포를 포함해 미리 계산 (교체와 함께 공개)
+            cluster_stats = self._cluster_stats
+            if table == 'store_features':
+                cluster_stats = ClusterStats(combined, self.get_rule_engine())
+            
+            with self._swap_lock:
+                setattr(self, f"_{table}", combined)
+                self._indexes[table] = new_index
+                self._monthly_grades = monthly_grades
+                self._dead_rows[table] = dead_rows
+                self._fingerprints[table] = f"{self._fingerprints.get(table, '')}+{delta_id}"
+                self._data_version = None
+                self.applied_deltas.add(delta_id)
+                self._cluster_stats = cluster_stats
+            
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"📥 {table}: 델타 {delta_id} {len(delta)}행 적재 (대체 {len(dead)}행, {elapsed_ms:.1f}ms)")
+            return {
+                'table': table,
+                'deltaId': delta_id,
+                'rows': len(delta),
+                'replacedRows': int(len(dead)),
+                'totalRows': len(combined),
+                'elapsedMs': round(elapsed_ms, 1),
+                'skipped': False,
+            }
+    
+    def get_rule_engine(self) -> RuleEngine:
+        """클러스터별로 컴파일된 룰 엔진 (최초 1회 컴파일)"""
+        if self._rule_engine is None:
+            self._rule_engine = RuleEngine(self.load_risk_checklist_rules())
+            print(f"✅ 룰 컴파일 완료: {len(self._rule_engine.cluster_ids())}개 클러스터")
+        return self._rule_engine
+    
+    def get_cluster_stats(self) -> ClusterStats:
+        """클러스터별 룰 특성 통계 (최초 1회 계산)"""
+        if self._cluster_stats is None:
+            self._cluster_stats = ClusterStats(self.load_store_features(), self.get_rule_engine())
+            print(f"✅ 클러스터 통계 계산 완료: {len(self._cluster_stats)}개 클러스터")
+        return self._cluster_stats
+    
+    def get_store_by_id(self, store_id: str) -> Optional[Dict]:
+        """ID로 점포 조회"""
+        return self._lookup_first('store_features', store_id)
     
     def get_store_location_info(self, store_id: str) -> Optional[Dict]:
         """점포 위치 정보 조회 (1002_store_features.csv에서)"""
@@ -152,82 +509,62 @@ class DataLoader:
             print("➡️ 데이터를 다시 확인해주세요. 'store_id' 컬럼이 필요합니다.")
             return None # None을 반환하면 analyzer.py가 기본값을 사용합니다.
 
-        # 3. 'store_id'로 'diagnosis_results' 파일을 직접 조회합니다.
-        result = df[df['store_id'] == store_id]
+        # 3. 'store_id' 인덱스로 'diagnosis_results' 행을 직접 조회합니다.
+        result = self._lookup_first('store_diagnosis_results', store_id)
         
-        if result.empty:
+        if result is None:
             # 두 파일의 개수를 맞췄다면 이 경고는 뜨지 않아야 합니다.
             print(f"⚠️ 경고: diagnosis_results에서 store_id {store_id}를 찾을 수 없습니다. 기본값을 반환합니다.")
             return None 
         
         # 4. 찾은 행의 데이터를 반환합니다.
-        return result.iloc[0].to_dict()
+        return result
 
     
     def get_cluster_metadata(self, cluster_id: str) -> Optional[Dict]:
         """클러스터 메타데이터 조회"""
-        df = self.load_cluster_metadata()
-        # cluster_id를 정수로 변환해서 비교
-        cluster_id_int = int(cluster_id)
-        result = df[df['cluster_id'] == cluster_id_int]
-        
-        if result.empty:
-            return None
-        
-        return result.iloc[0].to_dict()
+        if self._cluster_records is None:
+            # cluster_id → 첫 번째 행 dict (최초 1회 생성)
+            df = self.load_cluster_metadata()
+            groups = df.groupby('cluster_id', sort=False).indices if 'cluster_id' in df.columns else {}
+            self._cluster_records = {key: df.iloc[positions[0]].to_dict() for key, positions in groups.items()}
+        # cluster_id를 정수로 변환해서 조회
+        record = self._cluster_records.get(int(cluster_id))
+        return dict(record) if record is not None else None
     
     def get_feature_korean_name(self, feature: str) -> str:
-        """특성의 한국어 이름 조회"""
-        df = self.load_feature_dictionary()
-        result = df[df['feature'] == feature]
-        
-        if result.empty:
-            return feature  # 한국어 이름이 없으면 원래 이름 반환
-        
-        return result.iloc[0]['feature_korean']
+        """특성의 한국어 이름 조회 (한국어 이름이 없으면 원래 이름 반환)"""
+        if self._feature_names is None:
+            # 특성 → 첫 번째 한국어 이름 (최초 1회 생성)
+            df = self.load_feature_dictionary()
+            names: Dict[str, str] = {}
+            for name, korean in zip(df['feature'].tolist(), df['feature_korean'].tolist()):
+                names.setdefault(name, korean)
+            self._feature_names = names
+        return self._feature_names.get(feature, feature)
     
     def get_rules_for_cluster(self, cluster_id: str) -> List[Dict]:
         """특정 클러스터의 룰 목록 조회"""
-        df = self.load_risk_checklist_rules()
-        # cluster_id를 정수로 변환해서 비교
+        # cluster_id를 정수로 변환해서 조회 (로드 시 컴파일된 룰 재사용)
         cluster_id_int = int(cluster_id)
-        print(f"🔍 디버깅 get_rules_for_cluster: cluster_id = {cluster_id}, cluster_id_int = {cluster_id_int}")
-        print(f"🔍 디버깅 get_rules_for_cluster: df['cluster_id'].unique() = {df['cluster_id'].unique()}")
-        print(f"🔍 디버깅 get_rules_for_cluster: df['cluster_id'].dtype = {df['cluster_id'].dtype}")
-        result = df[df['cluster_id'] == cluster_id_int]
-        print(f"🔍 디버깅 get_rules_for_cluster: result 길이 = {len(result)}")
+        result = self.get_rule_engine().rules_for(cluster_id_int).records
+        logger.debug("get_rules_for_cluster: cluster_id = %s, result 길이 = %d", cluster_id, len(result))
         
-        if result.empty:
-            return []
-        
-        return result.to_dict('records')
+        return list(result)
     
     def get_store_monthly_timeseries(self, store_id: str) -> Optional[Dict]:
-        """점포 월별 시계열 데이터 조회"""
-        df = self.load_store_monthly_timeseries()
-        # store_id로 직접 조회 (업데이트된 CSV 구조)
-        result = df[df['store_id'] == store_id]
-        
-        if result.empty:
-            return None
-        
-        # 시계열 데이터를 월별로 정리
-        timeseries_data = {}
-        for _, row in result.iterrows():
-            date_str = row['date']
-            month = date_str[:7]  # YYYY-MM 형식
-            timeseries_data[month] = {
-                'sales': row['sales']  # sales는 등급 (1-6)
-            }
-        
-        return timeseries_data
+        """점포 월별 시계열 데이터 조회 ({YYYY-MM: {'sales': 등급 1-6}}, 월 오름차순)"""
+        return self.get_monthly_grades().as_dict(store_id)
+    
+    def get_recent_monthly_grades(self, store_id: str, months: int = 6) -> Tuple[np.ndarray, np.ndarray]:
+        """점포의 최근 months 개월 (월 라벨 배열, 등급 배열) - 오래된 순"""
+        return self.get_monthly_grades().window(store_id, months)
     
     def get_sales_predictions(self, store_id: str) -> List[Dict]:
         """점포의 매출 예측 데이터 조회 (모든 horizon 포함)"""
-        df = self.load_sales_predict()
-        result = df[df['store_id'] == store_id]
+        result = self._lookup_all('sales_predict', store_id)
         
-        if result.empty:
+        if result is None or result.empty:
             return []
         
         # horizon별로 정렬 (1, 2, 3개월)
@@ -236,45 +573,13 @@ class DataLoader:
         return result.to_dict('records')
     
     def calculate_rule_violations(self, store_id: str) -> List[Dict]:
-        """점포의 룰 위반 계산"""
+        """점포의 룰 위반 계산 (클러스터별 컴파일된 룰로 벡터 비교)"""
         store_data = self.get_store_by_id(store_id)
         if not store_data:
             return []
         
         cluster_id = store_data.get('static_cluster', '0')
-        rules = self.get_rules_for_cluster(cluster_id)
-        violations = []
-        
-        for rule in rules:
-            feature = rule['feature']
-            threshold = rule['threshold']
-            direction = rule['direction']
-            risk_level = rule['risk_level']
-            rule_text = rule['rule_text']
-            feature_korean = rule['feature_korean']
-            
-            # 점포의 해당 특성 값 조회
-            if feature in store_data:
-                current_value = store_data[feature]
-                
-                # 룰 위반 여부 판정
-                is_violated = False
-                if direction == '<=' and current_value <= threshold:
-                    is_violated = True
-                elif direction == '>=' and current_value >= threshold:
-                    is_violated = True
-                
-                if is_violated:
-                    violations.append({
-                        'ruleText': rule_text,
-                        'riskLevel': risk_level,
-                        'featureKorean': feature_korean,
-                        'currentValue': current_value,
-                        'threshold': threshold,
-                        'direction': direction
-                    })
-        
-        return violations
+        return self.get_rule_engine().evaluate_store(int(cluster_id), store_data)
 
 
 # 싱글톤 인스턴스
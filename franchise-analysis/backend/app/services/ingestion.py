@@ -0,0 +1,243 @@
+"""
+월별 증분 데이터 적재 (store_monthly_timeseries / sales_predict / store_features)
+
+새 달 데이터를 data/.deltas/ 에 순번이 붙은 CSV 델타로 기록(영속)하고, 각 워커는 아직 적용하지 않은
+델타만 메모리 테이블 끝에 붙이고 인덱스를 증분 갱신한 뒤 원자적으로 교체합니다.
+전체 CSV 를 다시 파싱하거나 재시작할 필요가 없고, 교체 중인 요청은 이전 데이터를 끝까지 사용합니다.
+
+- API 로 적재한 워커는 즉시 반영, 다른 워커는 INGEST_POLL_SECONDS 주기로 델타를 확인해 반영
+- 재시작 시에는 원본 CSV 로드 후 남아 있는 델타를 순서대로 다시 적용 (같은 키는 대체되므로 멱등)
+- --compact 로 델타를 원본 CSV 에 합치고 델타 파일을 정리
+- store_features 델타의 신규 점포는 static_cluster 없이 적재하면 저장된 클러스터 모델로 배정
+
+사용법 (backend 디렉토리에서):
+    python -m app.services.ingestion --table store_monthly_timeseries --csv 2025-09_timeseries.csv
+    python -m app.services.ingestion --table sales_predict --csv 2025-09_predict.csv
+    python -m app.services.ingestion --table store_features --csv new_stores.csv
+    python -m app.services.ingestion --compact
+"""
+import argparse
+import asyncio
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.services.cluster_assigner import CLUSTER_COLUMN
+from app.services.data_loader import DataLoader, data_loader
+from app.services.snapshot import TABLE_SOURCES
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 원자적 rename 에만 의존
+    fcntl = None
+
+
+DELTA_DIRNAME = ".deltas"
+SEQUENCE_FILE = ".seq"   # 마지막으로 발급한 델타 순번 (compact 로 델타를 지워도 유지)
+INGEST_TABLES = tuple(DataLoader._INGEST_TABLES)
+_DELTA_NAME = re.compile(r"^(\d{8})-([a-z_]+)\.csv$")
+
+
+def delta_dir(data_dir: Path) -> Path:
+    return Path(data_dir) / DELTA_DIRNAME
+
+
+@contextmanager
+def _delta_lock(data_dir: Path):
+    """여러 프로세스가 같은 순번으로 델타를 쓰지 않도록 프로세스 간 잠금"""
+    root = delta_dir(data_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def list_deltas(data_dir: Path) -> List[Tuple[str, str]]:
+    """기록된 델타 (파일명, 테이블) - 순번 순"""
+    root = delta_dir(data_dir)
+    if not root.exists():
+        return []
+    deltas = []
+    for name in sorted(os.listdir(root)):
+        match = _DELTA_NAME.match(name)
+        if match and match.group(2) in INGEST_TABLES:
+            deltas.append((name, match.group(2)))
+    return deltas
+
+
+class DeltaConflict(RuntimeError):
+    """기록한 델타가 이 워커에 반영되지 않음 (이미 적용된 이름과 충돌 등)"""
+
+
+def _next_sequence(data_dir: Path) -> int:
+    """다음 델타 순번 (_delta_lock 보유 상태에서 호출) - 기록된 최대 순번과 남아 있는 델타 중 큰 값 + 1
+
+    compact 가 델타 파일을 지워도 순번은 되돌아가지 않으므로, 실행 중인 워커의
+    applied_deltas 에 있는 이름이 다시 발급되지 않습니다.
+    """
+    seq_path = delta_dir(data_dir) / SEQUENCE_FILE
+    try:
+        last = int(seq_path.read_text().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        last = 0
+    existing = list_deltas(data_dir)
+    if existing:
+        last = max(last, int(existing[-1][0][:8]))
+    seq = last + 1
+    tmp_path = seq_path.with_suffix('.tmp')
+    tmp_path.write_text(str(seq))
+    os.replace(tmp_path, seq_path)
+    return seq
+
+
+def read_delta(data_dir: Path, name: str) -> pd.DataFrame:
+    # store_id 는 숫자처럼 보여도 문자열로 유지 (원본과 같은 키)
+    return pd.read_csv(delta_dir(data_dir) / name, dtype={'store_id': str})
+
+
+def write_delta(data_dir: Path, table: str, df: pd.DataFrame) -> str:
+    """델타를 다음 순번 파일로 원자적으로 기록 → 파일명"""
+    if table not in INGEST_TABLES:
+        raise ValueError(f"증분 적재를 지원하지 않는 테이블입니다: {table}")
+    with _delta_lock(data_dir):
+        name = f"{_next_sequence(data_dir):08d}-{table}.csv"
+        path = delta_dir(data_dir) / name
+        tmp_path = path.with_suffix('.tmp')
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return name
+
+
+class DeltaIngestor:
+    """델타 기록 + 워커 메모리 반영"""
+
+    def __init__(self, loader: DataLoader = data_loader, poll_seconds: float = 5.0):
+        self.loader = loader
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self.last_sync: Optional[float] = None
+
+    def ingest(self, table: str, df: pd.DataFrame) -> Dict:
+        """델타 기록 후 이 워커에 즉시 반영 → 적재 결과
+
+        검증 실패 시 ValueError, 기록한 델타가 반영되지 않으면 DeltaConflict.
+        """
+        if table not in INGEST_TABLES:
+            raise ValueError(f"증분 적재를 지원하지 않는 테이블입니다: {table} (가능: {', '.join(INGEST_TABLES)})")
+        if df.empty:
+            raise ValueError("적재할 행이 없습니다.")
+        # 기록 전에 컬럼/타입 검증 (잘못된 델타가 로그에 남아 다른 워커에서 실패하지 않도록)
+        self.loader.prepare_delta(table, df)
+        name = write_delta(self.loader.data_dir, table, df)
+        results = self.sync()
+        result = next((r for r in results if r['deltaId'] == name), None)
+        if result is None:
+            raise DeltaConflict(f"델타 {name} 가 반영되지 않았습니다 (이미 적용된 델타 이름과 충돌)")
+        return {**result, 'dataVersion': self.loader.data_version[:12]}
+
+    def sync(self) -> List[Dict]:
+        """아직 적용하지 않은 델타를 순서대로 반영"""
+        with self._lock:
+            results = []
+            for name, table in list_deltas(self.loader.data_dir):
+                if name in self.loader.applied_deltas:
+                    continue
+                results.append(self.loader.apply_delta(table, read_delta(self.loader.data_dir, name), name))
+            self.last_sync = time.time()
+            return results
+
+    async def run_polling(self) -> None:
+        """다른 워커가 기록한 델타를 주기적으로 반영 (startup 에서 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                print(f"⚠️  델타 반영 실패: {e}")
+
+    def status(self) -> Dict:
+        deltas = list_deltas(self.loader.data_dir)
+        return {
+            'deltas': len(deltas),
+            'applied': sum(name in self.loader.applied_deltas for name, _ in deltas),
+            'pending': [name for name, _ in deltas if name not in self.loader.applied_deltas],
+            'deadRows': dict(self.loader._dead_rows),
+            'dataVersion': self.loader.data_version[:12],
+            'pollSeconds': self.poll_seconds,
+            'lastSync': self.last_sync,
+        }
+
+
+def compact(data_dir: Path) -> Dict[str, int]:
+    """델타를 원본 CSV 에 합치고 델타 파일 삭제 (서버 재시작 시 재적용할 델타가 없어짐)
+
+    삭제된 델타는 더 이상 반영되지 않으므로 모든 워커가 반영한 뒤(status 의 pending 이 빈 상태)
+    또는 재배포 직전에 실행하세요. 순번 파일(.seq)은 남겨 두어 이후 델타는 이어지는 순번을 받습니다.
+    """
+    with _delta_lock(data_dir):
+        deltas = list_deltas(data_dir)
+        if not deltas:
+            return {}
+        loader = DataLoader()
+        loader.data_dir = Path(data_dir)
+        for name, table in deltas:
+            loader.apply_delta(table, read_delta(data_dir, name), name)
+
+        rows = {}
+        for table in {table for _, table in deltas}:
+            df = loader._table(table)
+            df = df.iloc[loader._get_index(table).live_positions()]
+            csv_path = Path(data_dir) / TABLE_SOURCES[table][0]
+            tmp_path = csv_path.with_suffix('.csv.tmp')
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, csv_path)
+            rows[table] = len(df)
+        for name, _ in deltas:
+            (delta_dir(data_dir) / name).unlink()
+        return rows
+
+
+# 싱글톤 인스턴스
+delta_ingestor = DeltaIngestor(poll_seconds=float(os.getenv("INGEST_POLL_SECONDS", "5")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="월별 증분 데이터 적재")
+    parser.add_argument("--table", choices=INGEST_TABLES, help="적재 대상 테이블")
+    parser.add_argument("--csv", help="새 달 데이터 CSV (원본과 같은 컬럼)")
+    parser.add_argument("--compact", action="store_true", help="델타를 원본 CSV 에 합치고 정리")
+    parser.add_argument("--data-dir", help="데이터 디렉토리 (기본: DATA_DIR)")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir) if args.data_dir else data_loader.data_dir
+    if args.compact:
+        for table, count in compact(data_dir).items():
+            print(f"✅ {TABLE_SOURCES[table][0]}: {count:,}행으로 합침")
+        return
+    if not args.table or not args.csv:
+        parser.error("--table 과 --csv 를 함께 지정하세요 (또는 --compact)")
+
+    df = pd.read_csv(args.csv, dtype={'store_id': str})
+    base_columns = pd.read_csv(data_dir / TABLE_SOURCES[args.table][0], nrows=0).columns.str.strip()
+    # static_cluster 는 적재 시 클러스터 모델로 배정할 수 있으므로 생략 가능
+    optional = {CLUSTER_COLUMN} if args.table == 'store_features' else set()
+    missing = [column for column in base_columns if column not in df.columns.str.strip() and column not in optional]
+    if missing:
+        parser.error(f"{args.csv} 에 필요한 컬럼이 없습니다: {missing}")
+    name = write_delta(data_dir, args.table, df)
+    print(f"✅ 델타 기록: {name} ({len(df):,}행) - 실행 중인 워커는 {delta_ingestor.poll_seconds:.0f}초 안에 반영")
+
+
+if __name__ == "__main__":
+    main()
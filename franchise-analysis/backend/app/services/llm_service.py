@@ -1,44 +1,214 @@
+import asyncio
+import logging
 import os
-from typing import Dict, List
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
 from dotenv import load_dotenv
 
+from app.services.metrics import LLM_REQUESTS_TOTAL, LLM_STAGE_SECONDS
+from app.services.strategy_cache import StrategyCache
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+OPENAI_MODEL = "gpt-4o-mini"  # 더 빠른 모델 (3-5초 vs 20-30초)
+ANTHROPIC_MODEL = "claude-3-sonnet-20240229"
+
+SYSTEM_PROMPT = (
+    "당신은 프랜차이즈 본사의 데이터 기반 경영 컨설턴트입니다. "
+    "가맹점의 데이터를 바탕으로 폐업 위험을 진단하고, 점주가 즉시 실행할 수 있는 생존 전략을 제시합니다. "
+    "응답은 반드시 JSON 형식으로 출력해야 합니다. 설명 문장은 포함하지 마세요."
+)
+
 
 class LLMService:
-    """LLM 기반 전략 제안"""
+    """LLM 기반 전략 제안
+    
+    워커별 비동기 클라이언트 1개(SDK 의 HTTP 커넥션 풀 재사용)를 사용하므로 LLM 응답을 기다리는 동안
+    이벤트 루프가 막히지 않습니다. 동시 호출 수와 호출당 타임아웃은 환경 변수로 조정합니다.
+    """
     
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
         self.provider = "openai" if os.getenv("OPENAI_API_KEY") else "anthropic"
+        self.model = OPENAI_MODEL if self.provider == "openai" else ANTHROPIC_MODEL
+        self.temperature = 0.7
+        
+        # 호출당 타임아웃(초) / 동시 LLM 호출 상한
+        self.timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        
+        # 전략 캐시 (프롬프트 + provider + model + temperature 기준)
+        self.cache_enabled = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+        self.cache = StrategyCache(
+            Path(os.getenv("LLM_CACHE_PATH", Path(__file__).parent.parent.parent / "cache" / "strategy_cache.sqlite3")),
+            memory_size=int(os.getenv("LLM_CACHE_MEMORY_SIZE", "256")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            max_disk_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+        )
+        
+        # 첫 호출 시 이벤트 루프 안에서 생성 (워커 프로세스별 1개)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = None
         
         if not self.api_key:
             print("⚠️  LLM API 키가 설정되지 않았습니다. 기본 전략을 사용합니다.")
     
-    def generate_strategy(self, analysis_data: Dict) -> Dict:
+    def _get_client(self):
+        """비동기 LLM 클라이언트 (1회 생성 후 재사용)
+
+        HTTP 커넥션 풀은 각 SDK 의 기본 클라이언트가 소유하고 (SDK 마다 httpx/httpx2 등 구현이 다름),
+        동시 호출 수는 세마포어로 제한합니다.
+        """
+        if self._client is None:
+            if self.provider == "openai":
+                import openai
+                self._client = openai.AsyncOpenAI(api_key=self.api_key, timeout=self.timeout)
+            else:
+                import anthropic
+                self._client = anthropic.AsyncAnthropic(api_key=self.api_key, timeout=self.timeout)
+        return self._client
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    async def aclose(self) -> None:
+        """LLM 클라이언트의 HTTP 커넥션 정리 (서버 종료 시)"""
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+    
+    async def generate_strategy(self, analysis_data: Dict) -> Dict:
         """분석 데이터 기반 전략 생성"""
         
         if not self.api_key:
             # API 키가 없으면 데이터 기반 기본 전략 반환
-            print("⚠️  LLM API 키 없음 - 데이터 기반 기본 전략 사용")
+            logger.debug("LLM API 키 없음 - 데이터 기반 기본 전략 사용")
+            LLM_REQUESTS_TOTAL.inc('no_api_key')
             return self._get_default_strategy(analysis_data)
         
         # 프롬프트 생성
+        start = time.perf_counter()
         prompt = self._create_prompt(analysis_data)
+        LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'prompt')
         
+        # 같은 분석 결과로 이미 생성한 전략이 있으면 재사용
+        cache_key = self.cache.make_key(prompt, self.provider, self.model, self.temperature)
+        if self.cache_enabled:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                logger.debug("LLM 전략 캐시 히트")
+                LLM_REQUESTS_TOTAL.inc('cache_hit')
+                return cached
+        
+        start = time.perf_counter()
         try:
-            if self.provider == "openai":
-                result = self._call_openai(prompt, analysis_data)
-            else:
-                result = self._call_anthropic(prompt, analysis_data)
+            # 동시 호출 상한 + 요청당 타임아웃 (세마포어 대기 시간 포함)
+            result = await asyncio.wait_for(self._call_limited(prompt, analysis_data), timeout=self.timeout)
             
-            print(f"✅ LLM 전략 생성 성공")
+            LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'call')
+            LLM_REQUESTS_TOTAL.inc('success')
+            logger.debug("LLM 전략 생성 성공")
+            # 응답 파싱 실패로 기본 전략이 반환된 경우는 캐시하지 않음
+            if self.cache_enabled and result != self._get_default_strategy(analysis_data):
+                await self.cache.aset(cache_key, result)
             return result
+        except asyncio.TimeoutError:
+            LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'call')
+            LLM_REQUESTS_TOTAL.inc('timeout')
+            logger.warning("LLM 호출 시간 초과 (%.0fs) - 데이터 기반 기본 전략으로 전환", self.timeout)
+            return self._get_default_strategy(analysis_data)
         except Exception as e:
-            print(f"❌ LLM 호출 실패: {e}")
-            print(f"🔄 데이터 기반 기본 전략으로 전환")
+            LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'call')
+            LLM_REQUESTS_TOTAL.inc('error')
+            logger.warning("LLM 호출 실패: %s - 데이터 기반 기본 전략으로 전환", e)
             return self._get_default_strategy(analysis_data)
     
+    async def _call_limited(self, prompt: str, analysis_data: Dict) -> Dict:
+        """세마포어로 동시 호출 수를 제한한 LLM 호출"""
+        async with self._get_semaphore():
+            if self.provider == "openai":
+                return await self._call_openai(prompt, analysis_data)
+            return await self._call_anthropic(prompt, analysis_data)
+    
+    async def stream_strategy(self, analysis_data: Dict) -> AsyncIterator[Dict]:
+        """전략 생성 스트리밍
+        
+        provider 가 생성하는 대로 {'event': 'token', 'text': ...} 를 내보내고,
+        마지막에 파싱된 전략을 {'event': 'done', 'result': ...} 로 한 번 내보냅니다.
+        캐시 히트, API 키 없음, 실패/시간 초과 시에는 done 만 전달됩니다.
+        """
+        if not self.api_key:
+            LLM_REQUESTS_TOTAL.inc('no_api_key')
+            yield {'event': 'done', 'result': self._get_default_strategy(analysis_data)}
+            return
+        
+        start = time.perf_counter()
+        prompt = self._create_prompt(analysis_data)
+        LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'prompt')
+        cache_key = self.cache.make_key(prompt, self.provider, self.model, self.temperature)
+        if self.cache_enabled:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                logger.debug("LLM 전략 캐시 히트")
+                LLM_REQUESTS_TOTAL.inc('cache_hit')
+                yield {'event': 'done', 'result': cached}
+                return
+        
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        chunks: List[str] = []
+        # 타임아웃은 스트림 전체 기준 (세마포어 대기 시간 포함)
+        deadline = loop.time() + self.timeout
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout)
+            try:
+                if self.provider == "openai":
+                    stream = self._stream_openai(prompt)
+                else:
+                    stream = self._stream_anthropic(prompt)
+                try:
+                    while True:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            raise asyncio.TimeoutError
+                        try:
+                            text = await asyncio.wait_for(stream.__anext__(), timeout=remaining)
+                        except StopAsyncIteration:
+                            break
+                        if text:
+                            chunks.append(text)
+                            yield {'event': 'token', 'text': text}
+                finally:
+                    await stream.aclose()
+            finally:
+                semaphore.release()
+        except asyncio.TimeoutError:
+            LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'stream')
+            LLM_REQUESTS_TOTAL.inc('timeout')
+            logger.warning("LLM 스트림 시간 초과 (%.0fs) - 데이터 기반 기본 전략으로 전환", self.timeout)
+            yield {'event': 'done', 'result': self._get_default_strategy(analysis_data)}
+            return
+        except Exception as e:
+            LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'stream')
+            LLM_REQUESTS_TOTAL.inc('error')
+            logger.warning("LLM 스트림 실패: %s - 데이터 기반 기본 전략으로 전환", e)
+            yield {'event': 'done', 'result': self._get_default_strategy(analysis_data)}
+            return
+        
+        LLM_STAGE_SECONDS.observe(time.perf_counter() - start, 'stream')
+        LLM_REQUESTS_TOTAL.inc('success')
+        result = self._parse_llm_response(''.join(chunks), analysis_data)
+        logger.debug("LLM 전략 스트림 완료")
+        if self.cache_enabled and result != self._get_default_strategy(analysis_data):
+            await self.cache.aset(cache_key, result)
+        yield {'event': 'done', 'result': result}
+    
     def _create_prompt(self, data: Dict) -> str:
         """프롬프트 생성 (실제 데이터 구조 반영)"""
         store_data = data['store_data']
@@ -139,41 +309,32 @@ strategies:
         
         return prompt
     
-    def _call_openai(self, prompt: str, analysis_data: Dict = None) -> Dict:
+    async def _call_openai(self, prompt: str, analysis_data: Dict = None) -> Dict:
         """OpenAI API 호출"""
         try:
-            import openai
-            openai.api_key = self.api_key
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",  # 더 빠른 모델 (3-5초 vs 20-30초)
+            response = await self._get_client().chat.completions.create(
+                model=self.model,
                 messages=[
-                    {"role": "system", "content": "당신은 프랜차이즈 본사의 데이터 기반 경영 컨설턴트입니다. "
-            "가맹점의 데이터를 바탕으로 폐업 위험을 진단하고, 점주가 즉시 실행할 수 있는 생존 전략을 제시합니다. "
-            "응답은 반드시 JSON 형식으로 출력해야 합니다. 설명 문장은 포함하지 마세요."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.7,
+                temperature=self.temperature,
                 max_tokens=800  # 토큰 감소로 속도 향상
             )
             
             content = response.choices[0].message.content
-            print(f"📝 GPT-4 응답:\n{content}\n" + "="*50)
+            logger.debug("GPT 응답:\n%s", content)
             return self._parse_llm_response(content, analysis_data)
             
         except Exception as e:
-            print(f"OpenAI 호출 실패: {e}")
+            logger.debug("OpenAI 호출 실패: %s", e)
             raise
     
-    def _call_anthropic(self, prompt: str, analysis_data: Dict = None) -> Dict:
+    async def _call_anthropic(self, prompt: str, analysis_data: Dict = None) -> Dict:
         """Anthropic API 호출"""
         try:
-            import anthropic
-            
-            client = anthropic.Anthropic(api_key=self.api_key)
-            
-            message = client.messages.create(
-                model="claude-3-sonnet-20240229",
+            message = await self._get_client().messages.create(
+                model=self.model,
                 max_tokens=1000,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -184,9 +345,37 @@ strategies:
             return self._parse_llm_response(content, analysis_data)
             
         except Exception as e:
-            print(f"Anthropic 호출 실패: {e}")
+            logger.debug("Anthropic 호출 실패: %s", e)
             raise
     
+    async def _stream_openai(self, prompt: str) -> AsyncIterator[str]:
+        """OpenAI 스트리밍 호출 - 텍스트 조각 단위로 전달"""
+        stream = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=800,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _stream_anthropic(self, prompt: str) -> AsyncIterator[str]:
+        """Anthropic 스트리밍 호출 - 텍스트 조각 단위로 전달"""
+        async with self._get_client().messages.stream(
+            model=self.model,
+            max_tokens=1000,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+    
     def _parse_llm_response(self, content: str, analysis_data: Dict = None) -> Dict:
         """LLM 응답 파싱 (개선된 버전)"""
         import re
@@ -254,13 +443,12 @@ strategies:
                             # 문자열 형식
                             strategies.append(strat)
             except Exception as e:
-                print(f"   JSON 파싱 실패: {e}")
-                pass
+                logger.debug("JSON 파싱 실패: %s", e)
         
         # 파싱 실패 시 데이터 기반 전략 사용
         if not summary or not strategies:
-            print(f"⚠️  LLM 응답 파싱 실패 - 데이터 기반 전략으로 전환")
-            print(f"   파싱 결과: summary={bool(summary)}, strategies={len(strategies)}개")
+            logger.warning("LLM 응답 파싱 실패 - 데이터 기반 전략으로 전환 (summary=%s, strategies=%d개)",
+                           bool(summary), len(strategies))
             if analysis_data:
                 return self._get_default_strategy(analysis_data)
             else:
@@ -275,7 +463,7 @@ strategies:
                     ]
                 }
         
-        print(f"✅ 파싱 성공: summary 길이={len(summary)}, strategies={len(strategies)}개")
+        logger.debug("파싱 성공: summary 길이=%d, strategies=%d개", len(summary), len(strategies))
         return {
             'summary': summary,
             'strategies': strategies
@@ -0,0 +1,152 @@
+"""
+Prometheus 텍스트 형식 메트릭 (외부 의존성 없음)
+
+리포트 파이프라인 단계별 소요 시간을 히스토그램으로 누적하고
+`GET /metrics` 에서 Prometheus exposition 형식으로 내보냅니다.
+메트릭은 워커 프로세스별로 집계되므로 다중 워커 배포에서는 워커마다 수집하세요.
+"""
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+
+# 기본 버킷 (초) - 인덱스 조회(µs) 부터 LLM 호출(수십 초) 까지
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(label_names: Sequence[str], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """라벨별 누적 히스토그램"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}  # 라벨 값 → [버킷별 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for label_values, bucket_counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, label_values, le)} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class StageTimer:
+    """연속된 단계의 소요 시간 측정 - mark() 할 때마다 직전 mark 이후 시간을 기록"""
+
+    __slots__ = ('histogram', '_start', '_last')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.histogram.observe(now - self._last, stage)
+        self._last = now
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+
+# 리포트 파이프라인
+REPORT_STAGE_SECONDS = Histogram(
+    "report_stage_seconds", "Analyzer.generate_franchise_report 단계별 소요 시간", ["stage"]
+)
+REPORT_SECONDS = Histogram(
+    "report_seconds", "Analyzer.generate_franchise_report 전체 소요 시간"
+)
+
+# LLM 전략 생성 (stage: prompt / call / stream)
+LLM_STAGE_SECONDS = Histogram(
+    "llm_stage_seconds", "LLM 전략 생성 단계별 소요 시간", ["stage"]
+)
+LLM_REQUESTS_TOTAL = Counter(
+    "llm_requests_total", "LLM 전략 요청 결과별 건수", ["outcome"]
+)
+
+# 시퀀스 모델 폐업 확률 (outcome: scored / unknown_store / unavailable / timeout / error)
+CLOSURE_INFERENCE_SECONDS = Histogram(
+    "closure_inference_seconds", "폐업 예측 모델 배치 추론 소요 시간"
+)
+CLOSURE_BATCH_SIZE = Histogram(
+    "closure_batch_size", "폐업 예측 모델 배치 크기", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+CLOSURE_REQUESTS_TOTAL = Counter(
+    "closure_requests_total", "폐업 확률 요청 결과별 건수", ["outcome"]
+)
+
+REGISTRY = [
+    REPORT_STAGE_SECONDS, REPORT_SECONDS, LLM_STAGE_SECONDS, LLM_REQUESTS_TOTAL,
+    CLOSURE_INFERENCE_SECONDS, CLOSURE_BATCH_SIZE, CLOSURE_REQUESTS_TOTAL,
+]
+
+
+def render_metrics() -> str:
+    """등록된 전체 메트릭을 Prometheus 텍스트 형식으로 출력"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,225 @@
+"""
+메모리 매핑 공유 데이터 플레인
+
+테이블을 컬럼별 .npy 파일로 한 번만 기록해 두고, 각 워커 프로세스는
+np.load(mmap_mode='r') 로 읽기 전용 매핑만 붙입니다. 페이지는 OS 페이지 캐시를
+공유하므로 워커가 N개여도 테이블 메모리는 1벌만 사용됩니다.
+
+- 숫자/불리언 컬럼: .npy 그대로 매핑
+- 문자열 등 그 외 컬럼: 정수 코드(.npy, 매핑) + 카테고리 목록(워커별 소량 복사)
+
+사용법 (backend 디렉토리에서):
+    DATA_PLANE=mmap uvicorn app.main:app --workers 4
+    python -m app.services.mmap_store          # 매핑 파일 미리 생성
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.snapshot import TABLE_SOURCES, file_sha256, parse_table, source_matches
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 원자적 rename 에만 의존
+    fcntl = None
+
+
+MMAP_DIRNAME = ".mmap"
+META_NAME = "meta.json"
+MMAP_FORMAT_VERSION = 1
+
+
+def mmap_dir(data_dir: Path) -> Path:
+    return Path(data_dir) / MMAP_DIRNAME
+
+
+@contextmanager
+def _build_lock(data_dir: Path):
+    """여러 워커가 동시에 같은 테이블을 빌드하지 않도록 프로세스 간 잠금"""
+    root = mmap_dir(data_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _codes_dtype(n_categories: int) -> np.dtype:
+    """pandas Categorical 이 사용하는 코드 dtype 과 동일하게 맞춰 복사를 피함"""
+    if n_categories < np.iinfo(np.int8).max:
+        return np.dtype(np.int8)
+    if n_categories < np.iinfo(np.int16).max:
+        return np.dtype(np.int16)
+    if n_categories < np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def build_table(data_dir: Path, table: str, df: pd.DataFrame) -> None:
+    """DataFrame 을 컬럼별 .npy 파일로 기록 (임시 디렉토리 → rename 으로 교체)"""
+    root = mmap_dir(data_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    final_dir = root / table
+    tmp_dir = root / f".{table}.tmp-{os.getpid()}"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+
+    csv_name, _ = TABLE_SOURCES[table]
+    csv_path = Path(data_dir) / csv_name
+    meta = {
+        'version': MMAP_FORMAT_VERSION,
+        'source': csv_name,
+        'rows': len(df),
+        'columns': [],
+    }
+    if csv_path.exists():
+        stat = csv_path.stat()
+        meta.update({
+            'source_sha256': file_sha256(csv_path),
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+        })
+
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        file_name = f"c{i}.npy"
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+            np.save(tmp_dir / file_name, series.to_numpy())
+            meta['columns'].append({'name': column, 'kind': 'numeric', 'file': file_name})
+        else:
+            try:
+                codes, categories = pd.factorize(series, sort=True)
+            except TypeError:  # 정렬 불가능한 혼합 타입
+                codes, categories = pd.factorize(series)
+            np.save(tmp_dir / file_name, codes.astype(_codes_dtype(len(categories))))
+            categories_file = f"c{i}.categories.pkl"
+            with open(tmp_dir / categories_file, 'wb') as f:
+                pickle.dump(list(categories), f)
+            meta['columns'].append({
+                'name': column, 'kind': 'categorical',
+                'file': file_name, 'categories': categories_file,
+            })
+
+    with open(tmp_dir / META_NAME, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # 기존 디렉토리를 치운 뒤 교체 - 이미 매핑 중인 워커는 unlink 된 파일을 계속 사용
+    stale_dir = None
+    if final_dir.exists():
+        stale_dir = root / f".{table}.stale-{os.getpid()}"
+        os.rename(final_dir, stale_dir)
+    os.rename(tmp_dir, final_dir)
+    if stale_dir is not None:
+        shutil.rmtree(stale_dir, ignore_errors=True)
+
+
+def _refresh_meta(meta_path: Path, meta: Dict) -> None:
+    """해시로 확인한 새 수정시각을 meta.json 에 기록 (기록 실패는 무시 - 다음 부팅에 다시 해시)"""
+    tmp_path = meta_path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        # 그 사이 다른 프로세스가 다시 빌드했으면 건드리지 않음
+        with open(meta_path, encoding='utf-8') as f:
+            current = json.load(f)
+        if current.get('source_sha256') != meta.get('source_sha256'):
+            return
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  매핑 메타 갱신 실패: {e}")
+
+
+def attach_table(data_dir: Path, table: str) -> Optional[pd.DataFrame]:
+    """유효한 매핑 파일이 있으면 읽기 전용으로 연결, 없거나 오래되었으면 None"""
+    table_dir = mmap_dir(data_dir) / table
+    meta_path = table_dir / META_NAME
+    if not meta_path.exists():
+        return None
+
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != MMAP_FORMAT_VERSION:
+            return None
+
+        csv_path = Path(data_dir) / meta['source']
+        mtime_ns = meta.get('source_mtime_ns')
+        if csv_path.exists() and not source_matches(csv_path, meta):
+            return None
+        if meta.get('source_mtime_ns') != mtime_ns:
+            _refresh_meta(meta_path, meta)
+
+        columns = {}
+        for column in meta['columns']:
+            values = np.load(table_dir / column['file'], mmap_mode='r')
+            if column['kind'] == 'categorical':
+                with open(table_dir / column['categories'], 'rb') as f:
+                    categories = pd.Index(pickle.load(f))
+                values = pd.Categorical.from_codes(
+                    values, dtype=pd.CategoricalDtype(categories), validate=False
+                )
+            columns[column['name']] = values
+    except (OSError, ValueError, KeyError) as e:
+        # 다른 프로세스가 교체 중인 경우 등 - 잠금 후 다시 시도하도록 None
+        print(f"⚠️  매핑 파일 연결 실패({table}): {e}")
+        return None
+
+    # copy=False: 컬럼 배열을 복사/통합하지 않고 매핑 그대로 사용
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_shared_table(data_dir: Path, table: str, parse: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """매핑된 테이블 연결, 없으면 (한 프로세스만) 빌드 후 연결"""
+    df = attach_table(data_dir, table)
+    if df is not None:
+        return df
+
+    with _build_lock(data_dir):
+        # 잠금을 기다리는 동안 다른 워커가 이미 만들었을 수 있음
+        df = attach_table(data_dir, table)
+        if df is None:
+            build_table(data_dir, table, parse())
+            df = attach_table(data_dir, table)
+
+    if df is None:
+        raise RuntimeError(f"{table} 매핑 파일을 생성하지 못했습니다.")
+    return df
+
+
+def prepare_shared_tables(data_dir: Path) -> Dict[str, int]:
+    """모든 테이블의 매핑 파일을 미리 생성 (gunicorn master / 배포 단계)"""
+    rows = {}
+    for table, (csv_name, _) in TABLE_SOURCES.items():
+        if not (Path(data_dir) / csv_name).exists() and attach_table(data_dir, table) is None:
+            print(f"⚠️  {csv_name} 없음 - 매핑 건너뜀")
+            continue
+        start = time.perf_counter()
+        df = load_shared_table(data_dir, table, lambda t=table: parse_table(data_dir, t)[0])
+        rows[table] = len(df)
+        print(f"✅ {table}: {len(df)}행 매핑 준비 ({time.perf_counter() - start:.2f}s)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 메모리 매핑용 컬럼 파일 생성")
+    parser.add_argument("--data-dir", default=str(Path(__file__).parent.parent.parent / "data"))
+    args = parser.parse_args()
+    prepare_shared_tables(Path(args.data_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+점포별 월 매출 등급 CSR 배열
+
+store_monthly_timeseries 를 점포 단위 구간으로 묶어
+- offsets (점포 수 + 1, int64): 점포 i 의 항목 구간 = [offsets[i], offsets[i + 1])
+- month_codes (int16): 월 라벨('YYYY-MM') 사전 위치, 점포 구간 안에서 오름차순
+- grades (int8): 매출 등급 1-6 (값이 없으면 0)
+으로 보관합니다. 최근 N개월 트렌드·순위 비율은 구간 슬라이스로 계산하고, 행마다 파이썬 객체를 만들지 않습니다.
+같은 점포-월이 여러 행이면 마지막 행(나중에 적재된 행)이 우선합니다 (기존 월별 dict 와 동일).
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MISSING_GRADE = 0
+
+
+def grade_rank_ratio(grades: np.ndarray) -> np.ndarray:
+    """등급 → 클러스터 순위 비율 (1=상위, 6=하위 → 1.0~1/6, 등급 없으면 0.5)"""
+    grades = np.asarray(grades, dtype=np.float64)
+    return np.where(grades != MISSING_GRADE, (7 - grades) / 6.0, 0.5)
+
+
+def _to_grades(values: pd.Series) -> np.ndarray:
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isfinite(numeric), numeric, MISSING_GRADE).astype(np.int8)
+
+
+class MonthlyGrades:
+    """점포별 월 등급 (읽기 전용 - 갱신은 새 객체를 반환하므로 고정된 뷰는 이전 배열을 계속 사용)"""
+
+    def __init__(self, store_ids: np.ndarray, offsets: np.ndarray, month_labels: np.ndarray,
+                 month_codes: np.ndarray, grades: np.ndarray, row_of: Optional[Dict] = None):
+        self.store_ids = store_ids        # (점포,) object
+        self.offsets = offsets            # (점포 + 1,) int64
+        self.month_labels = month_labels  # (월,) object, 오름차순
+        self.month_codes = month_codes    # (항목,) int16
+        self.grades = grades              # (항목,) int8
+        self._row_of = row_of if row_of is not None else {s: i for i, s in enumerate(store_ids.tolist())}
+
+    @classmethod
+    def empty(cls) -> "MonthlyGrades":
+        return cls(np.empty(0, dtype=object), np.zeros(1, dtype=np.int64), np.empty(0, dtype=object),
+                   np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int8))
+
+    @classmethod
+    def from_table(cls, df: pd.DataFrame, positions: Optional[np.ndarray] = None) -> "MonthlyGrades":
+        """store_monthly_timeseries → CSR (positions: 조회 대상 행 위치, 대체된 행 제외)"""
+        if positions is not None:
+            df = df.iloc[positions]
+        return cls.empty().updated(df)
+
+    def __len__(self) -> int:
+        return len(self.store_ids)
+
+    def __contains__(self, store_id) -> bool:
+        return store_id in self._row_of
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.month_codes.nbytes + self.grades.nbytes
+
+    def updated(self, rows: pd.DataFrame) -> "MonthlyGrades":
+        """rows(store_id, date, sales) 를 반영한 새 객체
+
+        rows 에 나온 점포 구간만 다시 정렬하고, 나머지 점포 구간은 위치만 옮겨 복사합니다.
+        """
+        if rows.empty:
+            return self
+
+        # 점포 코드: 기존 점포는 기존 위치, 새 점포는 뒤에 추가
+        store_index, store_uniques = pd.factorize(rows['store_id'])
+        store_uniques = np.asarray(store_uniques, dtype=object)
+        codes = np.fromiter((self._row_of.get(s, -1) for s in store_uniques), dtype=np.int64, count=len(store_uniques))
+        is_new = codes < 0
+        codes[is_new] = len(self.store_ids) + np.arange(int(is_new.sum()))
+        store_ids = np.concatenate([self.store_ids, store_uniques[is_new]])
+        row_of = dict(self._row_of)
+        row_of.update(zip(store_uniques[is_new].tolist(), codes[is_new].tolist()))
+        entry_store = codes[store_index]
+
+        # 월 코드: 라벨 사전을 합쳐 다시 정렬하고 기존 코드도 새 사전 기준으로 변환
+        month_index, month_uniques = pd.factorize(rows['date'].astype(str).str[:7])
+        month_uniques = np.asarray(month_uniques, dtype=object)
+        month_labels = np.union1d(self.month_labels, month_uniques).astype(object)
+        old_months = np.searchsorted(month_labels, self.month_labels)[self.month_codes].astype(np.int16)
+        entry_month = np.searchsorted(month_labels, month_uniques)[month_index].astype(np.int16)
+        entry_grade = _to_grades(rows['sales'])
+
+        # 바뀐 점포: 기존 항목 + 새 항목을 (점포, 월, 순서) 로 정렬해 같은 월은 마지막 항목만 남김
+        old_lengths = np.diff(self.offsets)
+        old_store = np.repeat(np.arange(len(old_lengths)), old_lengths)
+        touched = np.zeros(len(store_ids), dtype=bool)
+        touched[entry_store] = True
+        old_touched = touched[old_store]
+
+        merged_store = np.concatenate([old_store[old_touched], entry_store])
+        merged_month = np.concatenate([old_months[old_touched], entry_month])
+        merged_grade = np.concatenate([self.grades[old_touched], entry_grade])
+        order = np.lexsort((np.arange(len(merged_store)), merged_month, merged_store))
+        merged_store, merged_month, merged_grade = merged_store[order], merged_month[order], merged_grade[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (merged_store[1:] != merged_store[:-1]) | (merged_month[1:] != merged_month[:-1])
+        merged_store, merged_month, merged_grade = merged_store[last], merged_month[last], merged_grade[last]
+
+        lengths = np.zeros(len(store_ids), dtype=np.int64)
+        lengths[:len(old_lengths)] = old_lengths
+        lengths[touched] = 0
+        lengths += np.bincount(merged_store, minlength=len(store_ids))
+        offsets = np.zeros(len(store_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        month_codes = np.empty(offsets[-1], dtype=np.int16)
+        grades = np.empty(offsets[-1], dtype=np.int8)
+        # 바뀌지 않은 점포 구간은 새 시작 위치로 그대로 복사
+        kept = np.flatnonzero(~old_touched)
+        kept_store = old_store[kept]
+        kept_pos = offsets[kept_store] + (kept - self.offsets[kept_store])
+        month_codes[kept_pos] = old_months[kept]
+        grades[kept_pos] = self.grades[kept]
+        # 바뀐 점포 구간 (merged_store 는 정렬되어 있으므로 점포 내 순번 = 위치 - 점포 첫 위치)
+        within = np.arange(len(merged_store)) - np.searchsorted(merged_store, merged_store)
+        merged_pos = offsets[merged_store] + within
+        month_codes[merged_pos] = merged_month
+        grades[merged_pos] = merged_grade
+
+        return MonthlyGrades(store_ids, offsets, month_labels, month_codes, grades, row_of=row_of)
+
+    def window(self, store_id, months: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """점포의 최근 months 개월 (월 라벨, 등급) - 오래된 순, 없는 점포는 빈 배열"""
+        row = self._row_of.get(store_id)
+        if row is None:
+            return self.month_labels[:0], self.grades[:0]
+        start, end = self.offsets[row], self.offsets[row + 1]
+        if months is not None:
+            start = max(start, end - months)
+        return self.month_labels[self.month_codes[start:end]], self.grades[start:end]
+
+    def as_dict(self, store_id) -> Optional[Dict]:
+        """{월: {'sales': 등급}} (기존 get_store_monthly_timeseries 형식, 없으면 None)"""
+        months, grades = self.window(store_id)
+        if not len(months):
+            return None
+        return {month: {'sales': grade} for month, grade in zip(months.tolist(), grades.tolist())}
@@ -0,0 +1,300 @@
+"""
+가맹점 포트폴리오 조회 (위험도 순위표 / 조건 필터 / 커서 페이지네이션)
+
+로드 후 1회, 점포 특성 + 진단 결과를 점포 순서 배열로 맞추고
+- 정렬 인덱스: 정렬 기준(위험도/치명적 위반 수 × 내림/오름차순)별 점포 순서와 순위 배열
+- 값 인덱스: static_cluster / industry / business_district 값별 점포 위치 배열
+을 만들어 둡니다. 필터가 없으면 정렬 순서를 커서 위치부터 훑고, 값 필터가 있으면 가장 작은 값 목록만 후보로 봅니다.
+"""
+import base64
+import binascii
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.analyzer import risk_level_from_score
+from app.services.data_loader import DataLoader, data_loader
+
+# 정렬 기준(진단 결과 컬럼) → 같은 값일 때 2차 기준
+SORT_KEYS = {
+    'total_risk_score': None,
+    'n_critical_violations': 'total_risk_score',
+}
+# 값 필터: 요청 파라미터 → 점포 특성 컬럼
+CATEGORY_FILTERS = {
+    'cluster': 'static_cluster',
+    'industry': 'industry',
+    'business_district': 'business_district',
+}
+
+
+class InvalidCursor(ValueError):
+    """만료되었거나 다른 정렬 조건의 커서"""
+
+
+def _numeric(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class SortIndex:
+    """한 정렬 기준의 점포 순서 (값이 없으면 항상 맨 뒤, 같은 값은 store_id 오름차순)"""
+
+    def __init__(self, values: np.ndarray, store_ids: np.ndarray, descending: bool, tie_break: Optional[np.ndarray] = None):
+        missing = ~np.isfinite(values)
+        primary = np.where(missing, 0.0, -values if descending else values)
+        keys = [store_ids, primary, missing]
+        if tie_break is not None:
+            # 2차 기준 (예: 치명적 위반 수가 같으면 위험도 높은 순)
+            tie_missing = ~np.isfinite(tie_break)
+            keys = [store_ids, np.where(tie_missing, 0.0, -tie_break), tie_missing, primary, missing]
+        self.order = np.lexsort(keys).astype(np.int64)
+        self.rank = np.empty(len(values), dtype=np.int64)
+        self.rank[self.order] = np.arange(len(values))
+
+
+class PortfolioIndex:
+    """한 시점의 포트폴리오 컬럼 + 정렬/값 인덱스 (읽기 전용, 재생성 시 통째로 교체)"""
+
+    def __init__(self, features: pd.DataFrame, diagnosis: Dict[str, np.ndarray], version: str):
+        self.version = version
+        self.size = len(features)
+        self.store_ids = features['store_id'].to_numpy(dtype=object)
+        self.names = (features['store_name'] if 'store_name' in features.columns
+                      else pd.Series([''] * len(features))).to_numpy(dtype=object)
+        self.risk_scores = diagnosis['total_risk_score']
+        self.n_violations = diagnosis['n_violations']
+        self.n_critical = diagnosis['n_critical_violations']
+
+        # 값 인덱스: 점포별 값 코드 + {값: 코드} + 코드별 점포 위치 배열
+        self.codes: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, np.ndarray] = {}
+        self.code_of: Dict[str, Dict[str, int]] = {}
+        self.positions: Dict[str, Dict[int, np.ndarray]] = {}
+        for name, column in CATEGORY_FILTERS.items():
+            raw = features[column] if column in features.columns else pd.Series([None] * len(features))
+            codes, uniques = pd.factorize(raw)
+            self.codes[name] = codes
+            self.values[name] = np.asarray(uniques, dtype=object)
+            self.code_of[name] = {self._key(value): code for code, value in enumerate(uniques)}
+            groups = pd.Series(np.arange(len(codes))).groupby(codes, sort=False).indices
+            self.positions[name] = {int(code): positions for code, positions in groups.items() if code >= 0}
+
+        store_keys = self.store_ids.astype(str)
+        self.sorts: Dict[str, SortIndex] = {}
+        for key, tie_key in SORT_KEYS.items():
+            tie_break = diagnosis[tie_key] if tie_key else None
+            for direction in ('desc', 'asc'):
+                self.sorts[f"{key}:{direction}"] = SortIndex(diagnosis[key], store_keys, direction == 'desc', tie_break)
+
+    @staticmethod
+    def _key(value) -> str:
+        """값 인덱스 키 (클러스터 7 / 7.0 / '7' 을 같은 키로)"""
+        if isinstance(value, (float, np.floating)) and float(value).is_integer():
+            value = int(value)
+        return str(value)
+
+    def _candidates(self, filters: Dict[str, List]) -> Optional[np.ndarray]:
+        """값 필터 후보 위치 (필터가 없으면 None = 전체)"""
+        chosen = {name: values for name, values in filters.items() if values}
+        if not chosen:
+            return None
+        codes = {
+            name: sorted({self.code_of[name][self._key(v)] for v in values if self._key(v) in self.code_of[name]})
+            for name, values in chosen.items()
+        }
+        if any(not allowed for allowed in codes.values()):
+            return np.empty(0, dtype=np.int64)
+        # 가장 작은 값 목록을 후보로 잡고 나머지 필터는 코드 비교
+        sizes = {name: sum(len(self.positions[name][code]) for code in allowed) for name, allowed in codes.items()}
+        base = min(sizes, key=sizes.get)
+        candidates = np.concatenate([self.positions[base][code] for code in codes[base]])
+        for name, allowed in codes.items():
+            if name != base and len(candidates):
+                candidates = candidates[np.isin(self.codes[name][candidates], allowed)]
+        return candidates
+
+    def _predicate(self, min_risk_score: Optional[float], max_risk_score: Optional[float],
+                   min_critical_violations: Optional[int]):
+        """수치 조건 → 위치 배열에 대한 bool 마스크 함수 (조건 없으면 None)"""
+        if min_risk_score is None and max_risk_score is None and min_critical_violations is None:
+            return None
+
+        def keep(positions: np.ndarray) -> np.ndarray:
+            mask = np.ones(len(positions), dtype=bool)
+            with np.errstate(invalid='ignore'):
+                if min_risk_score is not None:
+                    mask &= self.risk_scores[positions] >= min_risk_score
+                if max_risk_score is not None:
+                    mask &= self.risk_scores[positions] <= max_risk_score
+                if min_critical_violations is not None:
+                    mask &= self.n_critical[positions] >= min_critical_violations
+            return mask
+        return keep
+
+    def query(self, sort: str, after: int, limit: int, filters: Dict[str, List],
+              min_risk_score: Optional[float] = None, max_risk_score: Optional[float] = None,
+              min_critical_violations: Optional[int] = None, with_total: bool = False) -> Dict:
+        """정렬 순위 after 다음부터 조건에 맞는 점포 limit 개 → {positions, last_rank, has_more, total}"""
+        sort_index = self.sorts[sort]
+        candidates = self._candidates(filters)
+        keep = self._predicate(min_risk_score, max_risk_score, min_critical_violations)
+        total = None
+
+        if candidates is None:
+            # 정렬 순서를 커서 다음부터 덩어리로 훑으며 조건 검사 (limit + 1 개 찾으면 종료)
+            found: List[np.ndarray] = []
+            count, start, chunk = 0, after + 1, max(4 * limit, 1024)
+            while start < self.size and count <= limit:
+                positions = sort_index.order[start:start + chunk]
+                if keep is not None:
+                    positions = positions[keep(positions)]
+                found.append(positions)
+                count += len(positions)
+                start += chunk
+                chunk *= 2
+            matched = np.concatenate(found)[:limit + 1] if found else np.empty(0, dtype=np.int64)
+            if with_total:
+                everything = sort_index.order
+                total = int(keep(everything).sum()) if keep is not None else self.size
+        else:
+            if keep is not None and len(candidates):
+                candidates = candidates[keep(candidates)]
+            if with_total:
+                total = len(candidates)
+            ranks = sort_index.rank[candidates]
+            ranks = ranks[ranks > after]
+            if len(ranks) > limit + 1:
+                ranks = np.partition(ranks, limit)[:limit + 1]
+            matched = sort_index.order[np.sort(ranks)]
+
+        page = matched[:limit]
+        return {
+            'positions': page,
+            'last_rank': int(sort_index.rank[page[-1]]) if len(page) else after,
+            'has_more': len(matched) > limit,
+            'total': total,
+        }
+
+    def records(self, positions: Iterable[int]) -> List[Dict]:
+        records = []
+        for p in positions:
+            score = self.risk_scores[p]
+            cluster = self.values['cluster'][self.codes['cluster'][p]] if self.codes['cluster'][p] >= 0 else None
+            records.append({
+                'storeId': self.store_ids[p],
+                'storeName': self.names[p] if isinstance(self.names[p], str) else '',
+                'cluster': self._key(cluster) if cluster is not None else None,
+                'industry': self._category('industry', p),
+                'tradingArea': self._category('business_district', p),
+                'riskScore': float(score) if np.isfinite(score) else None,
+                'riskLevel': risk_level_from_score(score) if np.isfinite(score) else None,
+                'nViolations': int(self.n_violations[p]) if np.isfinite(self.n_violations[p]) else None,
+                'nCriticalViolations': int(self.n_critical[p]) if np.isfinite(self.n_critical[p]) else None,
+            })
+        return records
+
+    def _category(self, name: str, position: int) -> str:
+        code = self.codes[name][position]
+        return str(self.values[name][code]) if code >= 0 else ''
+
+
+def encode_cursor(sort: str, rank: int, version: str) -> str:
+    payload = json.dumps({'s': sort, 'r': rank, 'v': version}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str, version: str) -> int:
+    """커서 → 마지막으로 반환한 정렬 순위 (정렬 조건/데이터가 바뀌었으면 InvalidCursor)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        rank, cursor_sort, cursor_version = int(payload['r']), payload['s'], payload['v']
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"잘못된 커서입니다: {e}")
+    if cursor_sort != sort:
+        raise InvalidCursor("커서와 정렬 조건이 다릅니다. 첫 페이지부터 다시 조회하세요.")
+    if cursor_version != version:
+        raise InvalidCursor("데이터가 다시 로드되어 커서가 만료되었습니다. 첫 페이지부터 다시 조회하세요.")
+    return rank
+
+
+class Portfolio:
+    """포트폴리오 조회 (점포 특성/진단 결과가 바뀌면 인덱스 재생성)"""
+
+    def __init__(self, loader: DataLoader = data_loader, max_limit: int = 1000):
+        self.loader = loader
+        self.max_limit = max_limit
+        self._lock = threading.Lock()
+        self._index: Optional[PortfolioIndex] = None
+
+    def _source_version(self) -> str:
+        fingerprints = self.loader._fingerprints
+        source = f"{fingerprints.get('store_features')}:{fingerprints.get('store_diagnosis_results')}"
+        # 워커 프로세스끼리 같은 값이 나오도록 hash() 대신 crc32
+        return format(zlib.crc32(source.encode()), '08x')
+
+    def build(self) -> PortfolioIndex:
+        """정렬/값 인덱스 (최초 1회, 점포 특성/진단 결과를 다시 로드하면 재생성)"""
+        # 버전을 먼저 읽음 - 사이에 델타가 적용되면 새 데이터가 이전 버전으로 저장되어 다음 호출 때 다시 생성
+        version = self._source_version()
+        features = self.loader.load_store_features()
+        diagnosis = self.loader.load_store_diagnosis_results()
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+        with self._lock:
+            if self._index is not None and self._index.version == version:
+                return self._index
+            start = time.perf_counter()
+            # 진단 결과를 점포 특성 순서에 맞춤 (없는 점포는 NaN)
+            diagnosis_index = self.loader._get_index('store_diagnosis_results')
+            positions = np.array(
+                [diagnosis_index.first(store_id) for store_id in features['store_id'].tolist()], dtype=object
+            )
+            found = np.array([p is not None for p in positions], dtype=bool)
+            take = np.where(found, positions, 0).astype(np.int64)
+            columns = {}
+            for column in ('total_risk_score', 'n_violations', 'n_critical_violations'):
+                values = _numeric(diagnosis[column]) if column in diagnosis.columns else np.full(len(diagnosis), np.nan)
+                columns[column] = np.where(found, values[take] if len(values) else np.nan, np.nan)
+
+            index = PortfolioIndex(features, columns, version)
+            self._index = index
+            print(f"✅ 포트폴리오 인덱스 생성 완료: {index.size} 점포 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+            return index
+
+    def query(self, sort: str = 'total_risk_score', order: str = 'desc', limit: int = 100,
+              cursor: Optional[str] = None, clusters: Optional[List] = None, industries: Optional[List[str]] = None,
+              districts: Optional[List[str]] = None, min_risk_score: Optional[float] = None,
+              max_risk_score: Optional[float] = None, min_critical_violations: Optional[int] = None,
+              with_total: bool = False) -> Dict:
+        """조건에 맞는 점포 한 페이지 + 다음 페이지 커서 (잘못된 조건/커서는 ValueError)"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"정렬 기준은 {', '.join(SORT_KEYS)} 중 하나여야 합니다.")
+        if order not in ('desc', 'asc'):
+            raise ValueError("order 는 desc 또는 asc 여야 합니다.")
+        limit = max(1, min(limit, self.max_limit))
+        index = self.build()
+        sort_spec = f"{sort}:{order}"
+        after = decode_cursor(cursor, sort_spec, index.version) if cursor else -1
+
+        result = index.query(
+            sort_spec, after, limit,
+            {'cluster': clusters, 'industry': industries, 'business_district': districts},
+            min_risk_score=min_risk_score, max_risk_score=max_risk_score,
+            min_critical_violations=min_critical_violations, with_total=with_total,
+        )
+        return {
+            'stores': index.records(result['positions'].tolist()),
+            'nextCursor': encode_cursor(sort_spec, result['last_rank'], index.version) if result['has_more'] else None,
+            'total': result['total'],
+        }
+
+
+# 싱글톤 인스턴스
+portfolio = Portfolio(max_limit=int(os.getenv("PORTFOLIO_MAX_LIMIT", "1000")))
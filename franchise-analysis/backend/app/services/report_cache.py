@@ -0,0 +1,244 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.models.schemas import FranchiseReportResponse, LLMSuggestion
+from app.services import report_serializer
+from app.services.analyzer import analyzer, risk_level_from_score
+from app.services.data_loader import data_loader
+
+
+PENDING_SUGGESTION = LLMSuggestion(summary='', strategies=[], status='pending')
+
+
+def build_report_fields(report_data: Dict) -> Dict:
+    """분석 결과 dict → 리포트 응답 필드 (llmSuggestion 제외, 중첩 항목은 plain dict)"""
+    store_data = report_data['store_data']
+    location_info = report_data['location_info'] or {}
+    cluster_metadata = report_data['cluster_metadata'] or {}
+    diagnosis_results = report_data['diagnosis_results'] or {}
+
+    # 위험도 레벨 결정
+    risk_score = diagnosis_results.get('total_risk_score', 50)
+    risk_level = risk_level_from_score(risk_score)
+
+    return {
+        'storeInfo': {
+            'id': store_data['store_id'],
+            'name': store_data.get('store_name', ''),
+            'tradingArea': location_info.get('business_district', ''),
+            'industry': store_data.get('industry', ''),
+            'cluster': str(store_data.get('static_cluster', '0')),
+            'clusterName': cluster_metadata.get('cluster_name', f'클러스터 {store_data.get("static_cluster", "0")}'),
+            'latitude': float(store_data.get('y', 0)),   # y = 위도
+            'longitude': float(store_data.get('x', 0)),  # x = 경도
+            'riskLevel': risk_level,
+            'riskScore': float(risk_score)
+        },
+        'modelResults': {
+            'salesPrediction': float(report_data['model_results']['sales_prediction']),
+            'eventPrediction': report_data['model_results']['event_prediction'],
+            'survivalProbability': float(report_data['model_results']['survival_probability']),
+            'riskScore': float(report_data['model_results']['risk_score']),
+            'closureProbability': report_data['model_results'].get('closure_probability')
+        },
+        'ruleViolations': report_data['rule_violations'],
+        'clusterIndicators': report_data['cluster_indicators'],
+        'trendData': report_data['trend_data'],
+        'salesPredictions': [
+            {
+                'targetMonth': pred['target_month'],
+                'horizon': pred['horizon'],
+                'yhatGrade': pred['yhat_grade'],
+                'yhatProb': pred['yhat_prob'],
+                'pLow56': pred['p_low56'],
+                'riskWorsenGe2': pred['risk_worsen_ge2'],
+                'yT': pred['y_t']
+            } for pred in report_data['sales_predictions']
+        ],
+        'statistics': {
+            'clusterClosureRate': float(cluster_metadata.get('closure_rate', 0)),
+            'industryAvgClosureRate': 15.0,  # 기본값
+            'nearbyStores': int(store_data.get('nearby_stores', 0)),
+            'avgMonthlyFootTraffic': int(store_data.get('foot_traffic', 0)),
+            'rentIncreaseRate': float(store_data.get('rent_increase_rate', 0))
+        },
+    }
+
+
+def build_report_response(report_data: Dict, llm_suggestion: LLMSuggestion) -> FranchiseReportResponse:
+    """분석 결과 dict → 리포트 응답 모델 (pydantic 검증 경로)"""
+    return FranchiseReportResponse(**build_report_fields(report_data), llmSuggestion=llm_suggestion)
+
+
+_encode_report = report_serializer.compile_encoder(FranchiseReportResponse)
+
+
+def build_report_payload(report_data: Dict, llm_suggestion: LLMSuggestion) -> Dict:
+    """분석 결과 dict → 응답 스키마 순서/타입의 plain dict (검증 생략, orjson 직렬화용)"""
+    return _encode_report({**build_report_fields(report_data), 'llmSuggestion': llm_suggestion})
+
+
+class CachedReport:
+    """점포 1곳의 구체화된 리포트 (LLM 제외)"""
+
+    __slots__ = ('report_data', 'response', 'payload', 'body', 'etag')
+
+    def __init__(self, report_data: Dict, response: Optional[FranchiseReportResponse], payload: Optional[Dict],
+                 body: bytes, etag: Optional[str]):
+        self.report_data = report_data  # LLM 프롬프트 입력용 분석 결과
+        self.response = response        # llmSuggestion 이 pending 인 응답 모델 (pydantic 경로)
+        self.payload = payload          # 같은 내용의 plain dict (orjson 경로)
+        self.body = body                # 직렬화한 JSON 바이트
+        self.etag = etag                # 캐시하지 않는 일시적 결과이면 None
+
+    def with_suggestion(self, llm_suggestion: LLMSuggestion):
+        """LLM 전략을 채운 응답 - orjson 경로는 JSON 바이트, pydantic 경로는 응답 모델"""
+        if self.payload is not None:
+            return report_serializer.dumps({**self.payload, 'llmSuggestion': llm_suggestion.model_dump()})
+        return self.response.model_copy(update={'llmSuggestion': llm_suggestion})
+
+
+class ReportCache:
+    """점포별 리포트 구체화 캐시 (LRU)
+
+    LLM 을 제외한 리포트는 로드된 CSV 에만 의존하므로, 한 번 만든 응답을
+    직렬화된 바이트 그대로 재사용합니다. 데이터 버전이 바뀌면 전체를 비웁니다.
+    """
+
+    def __init__(self, max_entries: int = 2048, serializer: str = 'orjson'):
+        self.max_entries = max_entries
+        if serializer == 'orjson' and not report_serializer.available():
+            print("⚠️  orjson 미설치 - 리포트 직렬화는 pydantic 경로 사용")
+            serializer = 'pydantic'
+        self.serializer = serializer
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._data_version: Optional[str] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self) -> str:
+        """데이터 버전이 바뀌었으면 캐시 전체 무효화 (lock 보유 상태에서 호출)"""
+        version = data_loader.data_version
+        if version != self._data_version:
+            if self._entries:
+                self.invalidations += 1
+                print(f"♻️  데이터 버전 변경 - 리포트 캐시 {len(self._entries)}건 무효화")
+            self._entries.clear()
+            self._data_version = version
+        return version
+
+    def etag_for(self, store_id: str) -> str:
+        """리포트 ETag (데이터 버전 + 점포 ID, 리포트를 만들지 않고도 계산 가능)"""
+        digest = hashlib.sha256(f"{data_loader.data_version}:{store_id}".encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def get(self, store_id: str) -> CachedReport:
+        """점포 리포트 조회, 없으면 생성 후 저장 (점포가 없으면 ValueError)"""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(store_id)
+            if entry is not None:
+                self._entries.move_to_end(store_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # 생성은 잠금 밖에서 (같은 점포 동시 요청 시 중복 생성될 수 있으나 결과는 동일)
+        # 생성 도중 증분 적재가 테이블을 교체해도 한 시점의 데이터로 리포트를 만듦
+        with data_loader.pinned() as view:
+            version = view.version
+            report_data = analyzer.generate_franchise_report(store_id)
+        entry = self._build_entry(store_id, report_data)
+        self._store(version, {store_id: entry})
+        return entry
+
+    def get_many(self, store_ids: List[str]) -> Tuple[Dict[str, CachedReport], Dict[str, Exception]]:
+        """여러 점포 리포트 → (점포 ID → 리포트, 실패한 점포 ID → 예외)
+
+        캐시에 없는 점포만 한 시점의 데이터로 static_cluster 별로 묶어 생성합니다.
+        """
+        store_ids = list(dict.fromkeys(store_ids))
+        entries: Dict[str, CachedReport] = {}
+        with self._lock:
+            self._check_version()
+            for store_id in store_ids:
+                entry = self._entries.get(store_id)
+                if entry is not None:
+                    self._entries.move_to_end(store_id)
+                    entries[store_id] = entry
+            self.hits += len(entries)
+            self.misses += len(store_ids) - len(entries)
+
+        missing = [store_id for store_id in store_ids if store_id not in entries]
+        if not missing:
+            return entries, {}
+        with data_loader.pinned() as view:
+            version = view.version
+            reports, errors = analyzer.generate_franchise_reports(missing)
+        created = {}
+        for store_id, report_data in reports.items():
+            try:
+                created[store_id] = self._build_entry(store_id, report_data)
+            except Exception as e:
+                errors[store_id] = e
+        self._store(version, created)
+        entries.update(created)
+        return entries, errors
+
+    def _build_entry(self, store_id: str, report_data: Dict) -> CachedReport:
+        """분석 결과 → 직렬화까지 끝낸 캐시 항목"""
+        if self.serializer == 'orjson':
+            response = None
+            payload = build_report_payload(report_data, PENDING_SUGGESTION)
+            body = report_serializer.dumps(payload)
+        else:
+            response = build_report_response(report_data, PENDING_SUGGESTION)
+            payload = None
+            body = response.model_dump_json().encode('utf-8')
+        # 폐업 확률 시간 초과 등 일시적으로 비어 있는 리포트는 ETag 없이 응답하고 저장하지 않음
+        etag = self.etag_for(store_id) if report_data.get('cacheable', True) else None
+        return CachedReport(report_data, response, payload, body, etag)
+
+    def _store(self, version: str, entries: Dict[str, CachedReport]) -> None:
+        with self._lock:
+            # 생성 중 데이터가 다시 로드되었으면 저장하지 않음
+            if self._check_version() == version:
+                for store_id, entry in entries.items():
+                    if entry.etag is None:
+                        continue
+                    self._entries[store_id] = entry
+                    self._entries.move_to_end(store_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """히트/미스 카운터 및 항목 수"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'invalidations': self.invalidations,
+                'serializer': self.serializer,
+                'dataVersion': (self._data_version or '')[:12],
+            }
+
+
+# 싱글톤 인스턴스
+report_cache = ReportCache(
+    max_entries=int(os.getenv("REPORT_CACHE_SIZE", "2048")),
+    serializer=os.getenv("REPORT_SERIALIZER", "orjson")
+)
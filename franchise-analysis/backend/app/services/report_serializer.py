@@ -0,0 +1,101 @@
+"""
+리포트 응답 고속 직렬화 (orjson)
+
+기본 경로는 중첩 pydantic 모델을 필드마다 만들고(RuleViolation(**v) 등) FastAPI 가 response_model 로
+한 번 더 검증한 뒤 JSON 으로 직렬화합니다. 여기서는 응답 스키마의 필드 타입으로 dict 인코더를 한 번만
+만들어 두고, 필드 순서/기본값/float·int 변환만 적용한 plain dict 를 orjson 으로 바로 직렬화합니다.
+numpy 스칼라(np.float64 / np.int64 등)는 변환 없이 orjson 이 직접 쓰고, np.float32 처럼 float64 가 아닌
+실수만 pydantic 과 같은 자릿수가 나오도록 float 로 바꿉니다. 절댓값 1e16 이상의 실수만 지수 표기가
+다릅니다 (orjson 1e16, pydantic 1e+16 - 값은 같음, 리포트 지표 범위 밖).
+
+검증은 건너뛰므로 입력은 기존 pydantic 경로와 같은 분석 결과여야 합니다 (타입이 다르면 TypeError/ValueError).
+orjson 이 없으면 available() 이 False 이고 호출 측은 pydantic 경로를 사용합니다.
+"""
+import importlib.util
+import typing
+from typing import Any, Callable, Dict, List, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+_ORJSON_AVAILABLE = importlib.util.find_spec('orjson') is not None
+
+
+def available() -> bool:
+    return _ORJSON_AVAILABLE
+
+
+def dumps(payload: Any) -> bytes:
+    """plain dict → JSON 바이트 (numpy 스칼라/배열 지원, NaN/Inf 는 pydantic 과 같이 null)"""
+    import orjson
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _float(value):
+    # np.float64 는 float 하위 클래스 - np.float32 는 orjson 이 float32 자릿수(0.1)로 쓰므로 float 로 변환
+    if value is None or isinstance(value, float):
+        return value
+    return float(value)
+
+
+def _int(value):
+    if value is None or (isinstance(value, (int, np.integer)) and not isinstance(value, bool)):
+        return value
+    return int(value)
+
+
+def _identity(value):
+    return value
+
+
+def _converter(annotation) -> Callable:
+    """필드 타입 → 값 변환 함수 (Optional 은 None 그대로, 모델/모델 리스트는 재귀)"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _converter(args[0]) if len(args) == 1 else _identity
+    if origin in (list, List):
+        (item,) = typing.get_args(annotation) or (Any,)
+        convert = _converter(item)
+        if convert is _identity:
+            return lambda values: values if values is None else list(values)
+        return lambda values: values if values is None else [convert(v) for v in values]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return compile_encoder(annotation)
+    if annotation is float:
+        return _float
+    if annotation is int:
+        return _int
+    return _identity
+
+
+_encoders: Dict[type, Callable[[Any], Dict]] = {}
+
+
+def compile_encoder(model: Type[BaseModel]) -> Callable[[Any], Dict]:
+    """pydantic 모델 → (dict 또는 모델 인스턴스 → 필드 순서대로 정리한 dict) 인코더
+
+    dict 의 여분 키는 버리고(extra='ignore' 와 동일), 없는 필드는 기본값, 필수 필드가 없으면 KeyError.
+    """
+    if model in _encoders:
+        return _encoders[model]
+
+    _MISSING = object()
+    plan = []
+    for name, field in model.model_fields.items():
+        default = _MISSING if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append((name, _converter(field.annotation), default))
+
+    def encode(item) -> Dict:
+        if isinstance(item, BaseModel):
+            return item.model_dump()
+        out = {}
+        for name, convert, default in plan:
+            value = item.get(name, default)
+            if value is _MISSING:
+                raise KeyError(f"{model.__name__}.{name} 값이 없습니다")
+            out[name] = value if value is default else convert(value)
+        return out
+
+    _encoders[model] = encode
+    return encode
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, List, Tuple
+
+
+# 방향 코드 ('<=', '>=' 이외의 방향은 위반으로 판정하지 않음)
+DIRECTION_NONE = 0
+DIRECTION_LE = 1
+DIRECTION_GE = 2
+_DIRECTION_CODES = {'<=': DIRECTION_LE, '>=': DIRECTION_GE}
+
+
+def _to_float(value) -> float:
+    """비교용 실수 변환 (숫자가 아니면 NaN → 위반 아님)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _native(value):
+    """numpy 스칼라 → 파이썬 값 (DataFrame 행 to_dict 와 동일)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class CompiledRules:
+    """한 클러스터의 룰을 배열로 컴파일한 결과"""
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self.features = [rule['feature'] for rule in records]
+        self.thresholds = np.array([_to_float(rule['threshold']) for rule in records], dtype=np.float64)
+        self.directions = np.array(
+            [_DIRECTION_CODES.get(rule['direction'], DIRECTION_NONE) for rule in records], dtype=np.int8
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def violation_mask(self, values: np.ndarray) -> np.ndarray:
+        """값 배열(..., n_rules) 과 임계값을 한 번에 비교 → 위반 여부 bool 배열
+
+        NaN 값/임계값은 비교 결과가 항상 False 이므로 위반이 아닙니다.
+        """
+        with np.errstate(invalid='ignore'):
+            return (
+                ((self.directions == DIRECTION_LE) & (values <= self.thresholds))
+                | ((self.directions == DIRECTION_GE) & (values >= self.thresholds))
+            )
+
+    def values_from_store(self, store_data: Dict) -> np.ndarray:
+        """점포 dict 에서 룰 특성 벡터 추출 (특성이 없으면 NaN)"""
+        return np.array([_to_float(store_data.get(feature, np.nan)) for feature in self.features], dtype=np.float64)
+
+    def values_from_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """점포 DataFrame 에서 룰 특성 행렬 추출 (n_stores × n_rules)"""
+        matrix = np.full((len(df), len(self.features)), np.nan, dtype=np.float64)
+        for j, feature in enumerate(self.features):
+            if feature in df.columns:
+                matrix[:, j] = pd.to_numeric(df[feature], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        return matrix
+
+    def build_violation(self, j: int, current_value) -> Dict:
+        """위반 레코드 (calculate_rule_violations 응답 형식)"""
+        rule = self.records[j]
+        return {
+            'ruleText': rule['rule_text'],
+            'riskLevel': rule['risk_level'],
+            'featureKorean': rule['feature_korean'],
+            'currentValue': current_value,
+            'threshold': rule['threshold'],
+            'direction': rule['direction']
+        }
+
+
+class RuleEngine:
+    """클러스터별로 미리 컴파일된 룰 평가 엔진
+
+    룰 테이블은 로드 후 1회만 클러스터별 임계값/방향 배열로 컴파일하고,
+    점포 1곳 또는 클러스터 전체 점포를 벡터 비교 한 번으로 평가합니다.
+    """
+
+    _EMPTY = CompiledRules([])
+
+    def __init__(self, rules_df: pd.DataFrame):
+        self._compiled: Dict[Hashable, CompiledRules] = {}
+        if 'cluster_id' not in rules_df.columns:
+            return
+        for cluster_id, positions in rules_df.groupby('cluster_id', sort=False, observed=True).indices.items():
+            self._compiled[cluster_id] = CompiledRules(rules_df.iloc[positions].to_dict('records'))
+
+    def cluster_ids(self) -> List[Hashable]:
+        return list(self._compiled)
+
+    def rules_for(self, cluster_id: int) -> CompiledRules:
+        """클러스터의 컴파일된 룰 (없으면 빈 룰셋)"""
+        return self._compiled.get(cluster_id, self._EMPTY)
+
+    def evaluate_store(self, cluster_id: int, store_data: Dict) -> List[Dict]:
+        """점포 1곳의 룰 위반 목록 (룰 순서 유지)"""
+        rules = self.rules_for(cluster_id)
+        if not len(rules):
+            return []
+
+        mask = rules.violation_mask(rules.values_from_store(store_data))
+        return [rules.build_violation(j, store_data[rules.features[j]]) for j in np.flatnonzero(mask)]
+
+    def evaluate_stores(self, cluster_id: int, stores: List[Dict]) -> List[List[Dict]]:
+        """같은 클러스터 점포 여러 곳의 룰 위반 목록 (룰 조회/비교는 1번, 결과는 evaluate_store 와 동일)"""
+        rules = self.rules_for(cluster_id)
+        if not len(rules) or not stores:
+            return [[] for _ in stores]
+
+        mask = rules.violation_mask(np.stack([rules.values_from_store(store_data) for store_data in stores]))
+        return [
+            [rules.build_violation(j, store_data[rules.features[j]]) for j in np.flatnonzero(row)]
+            for store_data, row in zip(stores, mask)
+        ]
+
+    def evaluate_frame(self, cluster_id: int, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """클러스터 점포 전체를 행렬 연산 한 번으로 평가 - 배치 작업용
+
+        Returns:
+            (위반 행렬 n_stores × n_rules bool, 특성 값 행렬 n_stores × n_rules)
+        """
+        rules = self.rules_for(cluster_id)
+        values = rules.values_from_frame(df)
+        return rules.violation_mask(values), values
+
+    def violations_from_row(self, cluster_id: int, mask_row: np.ndarray, df: pd.DataFrame, i: int) -> List[Dict]:
+        """evaluate_frame 결과 한 행(df 의 i 번째 점포)을 위반 레코드 목록으로 변환
+
+        currentValue 는 evaluate_store(get_store_by_id 의 행 dict)와 같은 원본 값입니다 (numpy 스칼라는 파이썬 값).
+        """
+        rules = self.rules_for(cluster_id)
+        return [rules.build_violation(j, _native(df[rules.features[j]].iat[i])) for j in np.flatnonzero(mask_row)]
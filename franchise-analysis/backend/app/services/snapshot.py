@@ -0,0 +1,230 @@
+"""
+CSV → 컬럼형(Parquet) 스냅샷 빌드/로드
+
+사용법 (backend 디렉토리에서):
+    python -m app.services.snapshot            # 변경된 CSV만 다시 컴파일
+    python -m app.services.snapshot --force    # 전체 재컴파일
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+
+SNAPSHOT_DIRNAME = ".snapshot"
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# 테이블 이름 → (CSV 파일명, read_csv 옵션)
+TABLE_SOURCES: Dict[str, Tuple[str, Dict]] = {
+    # index_col=False: 파일의 첫 번째 열을 인덱스로 쓰지 않고
+    # 0, 1, 2, 3... 순서대로 행 번호 인덱스를 강제로 만듭니다.
+    'store_features': ("final_features_per_store.csv", {'index_col': False}),
+    'store_diagnosis_results': ("store_diagnosis_results_2.csv", {}),
+    'cluster_metadata': ("cluster_metadata.csv", {}),
+    'feature_dictionary': ("feature_dictionary.csv", {}),
+    'risk_checklist_rules': ("risk_checklist_rules_2.csv", {}),
+    'store_monthly_timeseries': ("store_monthly_timeseries.csv", {}),
+    'sales_predict': ("sales_predict_result.csv", {}),
+}
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_csv_table(data_dir: Path, table: str) -> pd.DataFrame:
+    """원본 CSV를 DataLoader와 동일한 규칙으로 파싱"""
+    csv_name, read_kwargs = TABLE_SOURCES[table]
+    csv_path = Path(data_dir) / csv_name
+    if not csv_path.exists():
+        raise FileNotFoundError(f"{csv_name} 파일을 찾을 수 없습니다: {csv_path}")
+
+    df = pd.read_csv(csv_path, **read_kwargs)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def snapshot_dir(data_dir: Path) -> Path:
+    return Path(data_dir) / SNAPSHOT_DIRNAME
+
+
+def read_manifest(data_dir: Path) -> Dict:
+    """스냅샷 매니페스트 로드 (없으면 빈 매니페스트)"""
+    manifest_path = snapshot_dir(data_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {'version': SNAPSHOT_FORMAT_VERSION, 'tables': {}}
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_FORMAT_VERSION:
+        return {'version': SNAPSHOT_FORMAT_VERSION, 'tables': {}}
+    return manifest
+
+
+def _write_manifest(data_dir: Path, manifest: Dict) -> None:
+    manifest_path = snapshot_dir(data_dir) / MANIFEST_NAME
+    # 여러 워커가 동시에 갱신할 수 있으므로 임시 파일은 프로세스별
+    tmp_path = manifest_path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def source_matches(csv_path: Path, entry: Dict) -> bool:
+    """CSV가 스냅샷을 만들 때와 같은 내용인지 확인
+
+    크기/수정시각이 같으면 해시 계산을 건너뛰고,
+    다를 때만 내용 해시로 최종 판정합니다. 수정시각만 바뀐 경우(복사/checkout 등)에는
+    entry 의 source_mtime_ns 를 새 값으로 바꾸므로, 호출 측이 entry 를 다시 기록하면
+    다음 부팅부터는 해시를 건너뜁니다.
+    """
+    stat = csv_path.stat()
+    if stat.st_size != entry.get('source_size'):
+        return False
+    if stat.st_mtime_ns == entry.get('source_mtime_ns'):
+        return True
+    if file_sha256(csv_path) != entry.get('source_sha256'):
+        return False
+    entry['source_mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _refresh_manifest_entry(data_dir: Path, table: str, entry: Dict) -> None:
+    """해시로 확인한 새 수정시각을 매니페스트에 기록 (기록 실패는 무시 - 다음 부팅에 다시 해시)"""
+    try:
+        manifest = read_manifest(data_dir)
+        current = manifest['tables'].get(table)
+        # 그 사이 다른 프로세스가 다시 빌드했으면 건드리지 않음
+        if not current or current.get('source_sha256') != entry.get('source_sha256'):
+            return
+        current['source_mtime_ns'] = entry['source_mtime_ns']
+        _write_manifest(data_dir, manifest)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  스냅샷 매니페스트 갱신 실패: {e}")
+
+
+def source_fingerprint(data_dir: Path, table: str) -> str:
+    """테이블 원본의 버전 식별자 (CSV 크기/수정시각, CSV가 없으면 스냅샷 원본 해시)"""
+    csv_name, _ = TABLE_SOURCES[table]
+    csv_path = Path(data_dir) / csv_name
+    if csv_path.exists():
+        stat = csv_path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    return read_manifest(data_dir)['tables'].get(table, {}).get('source_sha256', '')
+
+
+def build_snapshot(data_dir: Path, force: bool = False) -> Dict:
+    """data 디렉토리의 CSV들을 Parquet 스냅샷으로 컴파일"""
+    if not _has_pyarrow():
+        raise RuntimeError("스냅샷 빌드에는 pyarrow가 필요합니다: pip install pyarrow")
+
+    data_dir = Path(data_dir)
+    out_dir = snapshot_dir(data_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(data_dir)
+
+    for table, (csv_name, _) in TABLE_SOURCES.items():
+        csv_path = data_dir / csv_name
+        if not csv_path.exists():
+            print(f"⚠️  {csv_name} 없음 - 스냅샷 건너뜀")
+            continue
+
+        entry = manifest['tables'].get(table, {})
+        parquet_path = out_dir / f"{table}.parquet"
+        if not force and entry and parquet_path.exists() and source_matches(csv_path, entry):
+            print(f"⏭️  {table}: 변경 없음")
+            continue
+
+        start = time.perf_counter()
+        df = read_csv_table(data_dir, table)
+        tmp_path = parquet_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+
+        stat = csv_path.stat()
+        manifest['tables'][table] = {
+            'file': parquet_path.name,
+            'source': csv_name,
+            'source_sha256': file_sha256(csv_path),
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'rows': len(df),
+        }
+        print(f"✅ {table}: {len(df)}행 컴파일 ({time.perf_counter() - start:.2f}s)")
+
+    # 전체 스냅샷 해시: 테이블별 원본 해시의 조합
+    combined = hashlib.sha256()
+    for table in sorted(manifest['tables']):
+        combined.update(f"{table}:{manifest['tables'][table]['source_sha256']}".encode())
+    manifest['snapshot_hash'] = combined.hexdigest()
+    _write_manifest(data_dir, manifest)
+    return manifest
+
+
+def load_snapshot_table(data_dir: Path, table: str) -> Optional[pd.DataFrame]:
+    """유효한 스냅샷이 있으면 로드, 없거나 원본 CSV가 바뀌었으면 None"""
+    if not _has_pyarrow():
+        return None
+
+    data_dir = Path(data_dir)
+    entry = read_manifest(data_dir)['tables'].get(table)
+    if not entry:
+        return None
+
+    parquet_path = snapshot_dir(data_dir) / entry['file']
+    if not parquet_path.exists():
+        return None
+
+    csv_path = data_dir / entry['source']
+    mtime_ns = entry.get('source_mtime_ns')
+    if csv_path.exists() and not source_matches(csv_path, entry):
+        print(f"⚠️  {entry['source']}가 스냅샷 이후 변경됨 - CSV로 로드합니다.")
+        return None
+    if entry.get('source_mtime_ns') != mtime_ns:
+        _refresh_manifest_entry(data_dir, table, entry)
+
+    try:
+        return pd.read_parquet(parquet_path)
+    except Exception as e:
+        print(f"⚠️  스냅샷 로드 실패({parquet_path.name}): {e} - CSV로 로드합니다.")
+        return None
+
+
+def parse_table(data_dir: Path, table: str) -> Tuple[pd.DataFrame, str]:
+    """스냅샷 우선, 없으면 CSV 파싱 → (DataFrame, 소스 이름)"""
+    df = load_snapshot_table(data_dir, table)
+    if df is not None:
+        return df, "snapshot"
+    return read_csv_table(data_dir, table), "csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV 데이터를 Parquet 스냅샷으로 컴파일")
+    parser.add_argument("--data-dir", default=str(Path(__file__).parent.parent.parent / "data"))
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 전체 재컴파일")
+    args = parser.parse_args()
+
+    manifest = build_snapshot(Path(args.data_dir), force=args.force)
+    print(f"📦 스냅샷 해시: {manifest.get('snapshot_hash', '')[:12]}")
+
+
+if __name__ == "__main__":
+    main()
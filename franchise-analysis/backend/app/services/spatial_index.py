@@ -0,0 +1,127 @@
+import math
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """(lat, lon) 에서 좌표 배열까지의 대원 거리 (m)"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """점포 좌표 격자(grid) 인덱스
+
+    좌표를 기준 위도의 평면(m)으로 투영해 cell_m 크기 격자 칸에 나누고, 칸별 행 위치를 칸 순서로
+    정렬된 배열의 구간으로 보관합니다. 반경/최근접 조회는 주변 칸의 후보만 거리 계산합니다.
+    거리는 하버사인(대원) 거리이며, 투영 왜곡은 칸 탐색 범위를 넓혀 보정합니다.
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_m: float = 250.0):
+        self.cell_m = cell_m
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        valid = np.isfinite(self.lats) & np.isfinite(self.lons)
+        positions = np.flatnonzero(valid)
+        self.size = len(positions)
+
+        lat0 = float(self.lats[valid].mean()) if self.size else 0.0
+        self._ky = math.radians(1) * EARTH_RADIUS_M
+        self._kx = self._ky * math.cos(math.radians(lat0))
+        # 투영 x 거리 대비 실제 거리의 최소 비율 (기준 위도보다 고위도일수록 작아짐)
+        if self.size:
+            self._scale = min(1.0, float(np.cos(np.radians(np.abs(self.lats[valid]).max()))) / math.cos(math.radians(lat0)))
+        else:
+            self._scale = 1.0
+
+        cx, cy = self._cell(self.lats[positions], self.lons[positions])
+        order = np.lexsort((cy, cx))
+        self._rows = positions[order]
+        cx, cy = cx[order], cy[order]
+        boundaries = np.flatnonzero((np.diff(cx) != 0) | (np.diff(cy) != 0)) + 1
+        starts = np.concatenate([[0], boundaries]) if self.size else np.empty(0, dtype=np.int64)
+        ends = np.concatenate([boundaries, [self.size]]) if self.size else np.empty(0, dtype=np.int64)
+        self._cell_x, self._cell_y = cx[starts], cy[starts]
+        self._starts, self._ends = starts, ends
+        # 비어 있지 않은 칸의 범위 (최근접 탐색 상한)
+        self._bounds = (int(cx.min()), int(cx.max()), int(cy.min()), int(cy.max())) if self.size else (0, 0, 0, 0)
+        # (칸 x, 칸 y) → 정렬 배열 구간
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {
+            (int(x), int(y)): (int(s), int(e)) for x, y, s, e in zip(self._cell_x, self._cell_y, starts, ends)
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _cell(self, lat, lon):
+        return (np.floor(np.asarray(lon) * self._kx / self.cell_m).astype(np.int64),
+                np.floor(np.asarray(lat) * self._ky / self.cell_m).astype(np.int64))
+
+    def _rows_in_cells(self, cx: int, cy: int, reach: int, ring_only: bool = False) -> np.ndarray:
+        """(cx, cy) 로부터 체비쇼프 거리 reach 이내(ring_only 면 정확히 reach) 칸의 행 위치"""
+        if (2 * reach + 1) ** 2 <= len(self._cells):
+            chunks = []
+            for x in range(cx - reach, cx + reach + 1):
+                edge = ring_only and abs(x - cx) != reach
+                for y in ((cy - reach, cy + reach) if edge and reach else range(cy - reach, cy + reach + 1)):
+                    span = self._cells.get((x, y))
+                    if span is not None:
+                        chunks.append(self._rows[span[0]:span[1]])
+        else:
+            # 탐색 칸이 비어 있지 않은 칸보다 많으면 칸 배열을 한 번에 비교
+            distance = np.maximum(np.abs(self._cell_x - cx), np.abs(self._cell_y - cy))
+            hit = distance == reach if ring_only else distance <= reach
+            chunks = [self._rows[s:e] for s, e in zip(self._starts[hit], self._ends[hit])]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def within(self, lat: float, lon: float, radius_m: float,
+               keep: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """반경 radius_m 안의 (행 위치, 거리 m) - 가까운 순
+
+        keep: 후보 행 위치 → 남길 bool 마스크 (위험도 등 조건 필터)
+        """
+        cx, cy = self._cell(lat, lon)
+        reach = int(math.ceil(radius_m / (self.cell_m * self._scale)))
+        rows = self._rows_in_cells(int(cx), int(cy), reach)
+        if keep is not None and len(rows):
+            rows = rows[keep(rows)]
+        distances = haversine_m(lat, lon, self.lats[rows], self.lons[rows])
+        hit = distances <= radius_m
+        rows, distances = rows[hit], distances[hit]
+        order = np.argsort(distances, kind='stable')
+        return rows[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int,
+                keep: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """가까운 k개 (행 위치, 거리 m) - 칸을 한 겹씩 넓히며 k번째 거리가 탐색 범위 안에 들면 종료"""
+        if not self.size or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        cx, cy = (int(v) for v in self._cell(lat, lon))
+        min_x, max_x, min_y, max_y = self._bounds
+        max_reach = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+
+        rows_found, distances_found = [], []
+        count = 0
+        for reach in range(max_reach + 1):
+            rows = self._rows_in_cells(cx, cy, reach, ring_only=True)
+            if keep is not None and len(rows):
+                rows = rows[keep(rows)]
+            if len(rows):
+                rows_found.append(rows)
+                distances_found.append(haversine_m(lat, lon, self.lats[rows], self.lons[rows]))
+                count += len(rows)
+            # 아직 보지 않은 칸의 점포는 최소 reach × 칸 크기만큼 떨어져 있음
+            if count >= k:
+                kth = np.partition(np.concatenate(distances_found), k - 1)[k - 1]
+                if kth <= reach * self.cell_m * self._scale:
+                    break
+
+        if not rows_found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows, distances = np.concatenate(rows_found), np.concatenate(distances_found)
+        order = np.argsort(distances, kind='stable')[:k]
+        return rows[order], distances[order]
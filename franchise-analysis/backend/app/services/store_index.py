@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, Optional
+
+
+class StoreIndex:
+    """키(store_id 등) → 행 위치 해시 인덱스
+
+    테이블을 한 번만 훑어서 키별 행 위치 배열을 만들어 두고,
+    이후 조회는 전체 테이블 불리언 스캔 없이 O(1) 로 처리합니다.
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str = 'store_id'):
+        self.key = key
+        self.size = len(df)
+        if key in df.columns:
+            # groupby().indices: {키: 원본 순서를 유지한 행 위치 배열}
+            self._positions: Dict[Hashable, np.ndarray] = df.groupby(key, sort=False, observed=True).indices
+        else:
+            self._positions = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def positions(self, key: Hashable) -> Optional[np.ndarray]:
+        """키에 해당하는 모든 행 위치 (없으면 None)"""
+        return self._positions.get(key)
+
+    def first(self, key: Hashable) -> Optional[int]:
+        """키에 해당하는 첫 번째 행 위치 (기존 iloc[0] 조회와 동일)"""
+        positions = self._positions.get(key)
+        if positions is None or len(positions) == 0:
+            return None
+        return int(positions[0])
+
+    def appended(self, delta: pd.DataFrame, offset: int,
+                 dead_positions: Optional[np.ndarray] = None) -> "StoreIndex":
+        """테이블 끝(offset 부터)에 delta 행을 붙였을 때의 새 인덱스
+
+        기존 인덱스는 바꾸지 않으므로 교체 전까지 진행 중인 조회는 그대로 사용할 수 있습니다.
+        dead_positions 는 새 행으로 대체되어 더 이상 조회되지 않아야 하는 기존 행 위치입니다.
+        """
+        index = StoreIndex.__new__(StoreIndex)
+        index.key = self.key
+        index.size = offset + len(delta)
+        positions = dict(self._positions)
+        for key, local in delta.groupby(self.key, sort=False, observed=True).indices.items():
+            added = local + offset
+            old = positions.get(key)
+            if old is not None:
+                if dead_positions is not None and len(dead_positions):
+                    old = old[~np.isin(old, dead_positions)]
+                added = np.concatenate([old, added])
+            positions[key] = added
+        index._positions = positions
+        return index
+
+    def live_positions(self) -> np.ndarray:
+        """인덱스가 가리키는 전체 행 위치 (정렬)"""
+        if not self._positions:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(list(self._positions.values())))
@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class StrategyCache:
+    """LLM 전략 캐시 (메모리 LRU + 디스크 SQLite 2단계)
+
+    키는 프롬프트 + provider + model + temperature 의 해시라서,
+    점포 데이터가 바뀌지 않은 재조회는 LLM 호출 없이 바로 응답합니다.
+    """
+
+    def __init__(self, db_path: Path, memory_size: int = 256,
+                 ttl_seconds: float = 7 * 24 * 3600, max_disk_entries: int = 10000):
+        self.db_path = Path(db_path)
+        self.memory_size = memory_size
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key → (저장 시각, 값)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(prompt: str, provider: str, model: str, temperature: float) -> str:
+        payload = json.dumps([prompt, provider, model, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _db(self) -> sqlite3.Connection:
+        """SQLite 연결 (최초 사용 시 생성, 여러 워커가 같은 파일을 공유 가능)"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS strategies ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON strategies(accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, created_at: float, value: Dict) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """캐시 조회 (메모리 → 디스크 순, 만료된 항목은 삭제)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            try:
+                db = self._db()
+                row = db.execute(
+                    "SELECT value, created_at FROM strategies WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = json.loads(row[0]), row[1]
+                    if now - created_at <= self.ttl_seconds:
+                        db.execute("UPDATE strategies SET accessed_at = ? WHERE key = ?", (now, key))
+                        db.commit()
+                        self._remember(key, created_at, value)
+                        self.disk_hits += 1
+                        return value
+                    db.execute("DELETE FROM strategies WHERE key = ?", (key,))
+                    db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  전략 캐시 조회 실패: {e}")
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict) -> None:
+        """캐시 저장 (디스크 항목 수가 상한을 넘으면 오래 안 쓴 항목부터 삭제)"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO strategies (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                db.execute("DELETE FROM strategies WHERE created_at < ?", (now - self.ttl_seconds,))
+                db.execute(
+                    "DELETE FROM strategies WHERE key IN ("
+                    "SELECT key FROM strategies ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  전략 캐시 저장 실패: {e}")
+
+    async def aget(self, key: str) -> Optional[Dict]:
+        """get 을 스레드에서 실행 (SQLite 잠금/busy timeout 동안 이벤트 루프 비차단)"""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Dict) -> None:
+        """set 을 스레드에서 실행 (디스크 기록 + 오래된 항목 삭제)"""
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            try:
+                db = self._db()
+                db.execute("DELETE FROM strategies")
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  전략 캐시 초기화 실패: {e}")
+
+    def stats(self) -> Dict:
+        """히트/미스 카운터 및 항목 수"""
+        with self._lock:
+            try:
+                disk_entries = self._db().execute("SELECT COUNT(*) FROM strategies").fetchone()[0]
+            except sqlite3.Error:
+                disk_entries = None
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memoryHits': self.memory_hits,
+                'diskHits': self.disk_hits,
+                'misses': self.misses,
+                'hitRate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'memoryEntries': len(self._memory),
+                'diskEntries': disk_entries,
+            }
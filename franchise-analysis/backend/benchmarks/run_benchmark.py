@@ -0,0 +1,248 @@
+"""
+리포트 API 벤치마크
+
+합성 데이터(없으면 생성)로 스텁 LLM 서버를 별도 프로세스로 띄운 뒤
+시작 시간, 엔드포인트별 p50/p99 지연, 처리량, 서버 최대 RSS 를 측정해 JSON 으로 기록합니다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.run_benchmark --stores 10000 --out bench-10k.json
+    python -m benchmarks.run_benchmark --data-dir /tmp/bench-1m --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import TABLE_FILES, generate
+
+try:
+    import resource
+except ImportError:  # Windows: 최대 RSS 측정 생략
+    resource = None
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 시나리오: 이름 → (메서드, 경로 생성 함수, 요청 본문)
+SCENARIOS: Dict[str, tuple] = {
+    # 같은 점포 목록을 cold → warm 순서로 두 번 조회 (리포트 캐시 미스/히트)
+    'report_defer_cold': ('GET', lambda sid: f"/api/franchise/report/{sid}?llm=defer", None),
+    'report_defer_warm': ('GET', lambda sid: f"/api/franchise/report/{sid}?llm=defer", None),
+    'report_inline': ('GET', lambda sid: f"/api/franchise/report/{sid}", None),
+    'llm_stream': ('GET', lambda sid: f"/api/llm/stream/{sid}", None),
+    'llm_analyze': ('POST', lambda sid: "/api/llm/analyze", lambda sid: {'franchiseId': sid}),
+}
+
+
+def _read_store_ids(data_dir: Path) -> np.ndarray:
+    """대상 데이터의 점포 ID (합성/실제 데이터 모두 final_features_per_store.csv 의 store_id 컬럼)"""
+    path = data_dir / TABLE_FILES['store_features']
+    ids = pd.read_csv(path, dtype=str, usecols=lambda column: column.strip() == 'store_id').iloc[:, 0]
+    return ids.dropna().str.strip().drop_duplicates().to_numpy(dtype=object)
+
+
+def _read_status_kb(pid: int, key: str) -> Optional[int]:
+    """/proc/<pid>/status 의 메모리 항목(kB) - Linux 전용"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _summarize(latencies: List[float], errors: int, wall: float) -> Dict:
+    values = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'p50Ms': round(float(np.percentile(values, 50)), 2) if len(values) else None,
+        'p90Ms': round(float(np.percentile(values, 90)), 2) if len(values) else None,
+        'p99Ms': round(float(np.percentile(values, 99)), 2) if len(values) else None,
+        'meanMs': round(float(values.mean()), 2) if len(values) else None,
+        'throughputRps': round(len(latencies) / wall, 1) if wall > 0 else None,
+    }
+
+
+async def _run_scenario(client: httpx.AsyncClient, method: str, path: Callable, body: Optional[Callable],
+                        ids: List[str], concurrency: int) -> Dict:
+    """요청 목록을 동시성 상한 안에서 실행하고 지연 분포 집계"""
+    latencies: List[float] = []
+    errors = 0
+    queue = iter(ids)
+
+    async def worker():
+        nonlocal errors
+        for sid in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path(sid), json=body(sid) if body else None)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(latencies, errors, time.perf_counter() - wall_start)
+
+
+async def _run_load(base_url: str, ids: List[str], scenarios: List[str], concurrency: int,
+                    batch_clusters: int) -> Dict:
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        for name in scenarios:
+            method, path, body = SCENARIOS[name]
+            results[name] = await _run_scenario(client, method, path, body, ids, concurrency)
+            print(f"   {name}: p50 {results[name]['p50Ms']}ms / p99 {results[name]['p99Ms']}ms "
+                  f"/ {results[name]['throughputRps']} rps", file=sys.stderr)
+
+        if batch_clusters:
+            # 일괄 진단은 응답 전체를 받는 데 걸리는 시간과 점포 처리량으로 측정
+            start = time.perf_counter()
+            lines = 0
+            async with client.stream('POST', '/api/franchise/batch',
+                                     json={'clusters': list(range(batch_clusters))}) as response:
+                async for line in response.aiter_lines():
+                    lines += bool(line)
+            elapsed = time.perf_counter() - start
+            results['batch'] = {
+                'clusters': batch_clusters,
+                'stores': lines,
+                'seconds': round(elapsed, 3),
+                'storesPerSecond': round(lines / elapsed, 1) if elapsed > 0 else None,
+            }
+            print(f"   batch: {lines:,} 점포 {elapsed:.2f}s", file=sys.stderr)
+    return results
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> float:
+    """서버가 /health 에 응답할 때까지 대기 (startup 이벤트의 데이터 로드 포함)"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 시작 중 종료되었습니다 (exit {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{timeout:.0f}초 안에 서버가 준비되지 않았습니다.")
+
+
+def run(data_dir: Path, requests: int, concurrency: int, scenarios: List[str], llm_latency: float,
+        port: int, batch_clusters: int, seed: int, startup_timeout: float) -> Dict:
+    all_ids = _read_store_ids(data_dir)
+    n_stores = len(all_ids)
+    rng = np.random.default_rng(seed)
+    ids = list(all_ids[rng.choice(n_stores, size=min(requests, n_stores), replace=False)])
+
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        'DATA_DIR': str(data_dir),
+        'LLM_CACHE_ENABLED': '0',
+        'LOG_LEVEL': 'WARNING',
+    }
+    with tempfile.TemporaryFile() as server_log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.stub_server', '--port', str(port), '--llm-latency', str(llm_latency)],
+            cwd=BACKEND_DIR, env=env, stdout=server_log, stderr=subprocess.STDOUT
+        )
+        try:
+            startup = _wait_until_ready(base_url, process, startup_timeout)
+            print(f"✅ 서버 준비 {startup:.2f}s ({n_stores:,} 점포)", file=sys.stderr)
+            rss_after_startup = _read_status_kb(process.pid, 'VmRSS')
+
+            endpoints = asyncio.run(_run_load(base_url, ids, scenarios, concurrency, batch_clusters))
+            peak_rss = _read_status_kb(process.pid, 'VmHWM')
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    if peak_rss is None and resource is not None:
+        # /proc 이 없는 플랫폼: 종료된 자식 프로세스 최대 RSS (macOS 는 바이트 단위)
+        max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak_rss = max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+    return {
+        'stores': n_stores,
+        'requestsPerScenario': len(ids),
+        'concurrency': concurrency,
+        'llmStubLatencySeconds': llm_latency,
+        'startupSeconds': round(startup, 3),
+        'rssAfterStartupMb': round(rss_after_startup / 1024, 1) if rss_after_startup else None,
+        'peakRssMb': round(peak_rss / 1024, 1) if peak_rss else None,
+        'endpoints': endpoints,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리포트 API 벤치마크 (스텁 LLM)")
+    parser.add_argument("--data-dir", help="합성/실제 데이터 디렉토리 (없으면 --stores 로 생성)")
+    parser.add_argument("--stores", type=int, default=10_000, help="데이터 생성 시 점포 수")
+    parser.add_argument("--requests", type=int, default=500, help="시나리오별 요청 수 (서로 다른 점포)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="실행할 시나리오 (여러 번 지정 가능, 기본 전체)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="스텁 LLM 응답 지연(초)")
+    parser.add_argument("--batch-clusters", type=int, default=1,
+                        help="일괄 진단 측정에 사용할 클러스터 수 (0 이면 건너뜀)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--out", help="결과 JSON 파일 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        data_dir = Path(args.data_dir)
+    else:
+        data_dir = Path(tempfile.gettempdir()) / f"franchise-bench-{args.stores}-{args.seed}"
+    if not (data_dir / TABLE_FILES['store_features']).exists():
+        print(f"📦 합성 데이터 생성: {args.stores:,} 점포 → {data_dir}", file=sys.stderr)
+        with contextlib.redirect_stdout(sys.stderr):
+            generate(data_dir, args.stores, seed=args.seed)
+
+    result = run(
+        data_dir, args.requests, args.concurrency, args.scenario or list(SCENARIOS),
+        args.llm_latency, args.port, args.batch_clusters, args.seed, args.startup_timeout
+    )
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(output + "\n", encoding='utf-8')
+        print(f"✅ 결과 저장: {args.out}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
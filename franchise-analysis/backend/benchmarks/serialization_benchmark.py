@@ -0,0 +1,122 @@
+"""
+리포트 응답 직렬화 벤치마크 (pydantic + response_model 재검증 vs orjson 고속 경로)
+
+룰 위반/트렌드 항목 수를 늘린 합성 분석 결과(값은 pandas 에서 오는 numpy 스칼라)로
+응답 1건당 직렬화 시간을 측정합니다. 서버/데이터 파일 없이 실행됩니다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.serialization_benchmark --sizes 10,100,1000,10000 --out bench-serialization.json
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.models.schemas import FranchiseReportResponse
+from app.services import report_serializer
+from app.services.report_cache import PENDING_SUGGESTION, build_report_payload, build_report_response
+
+
+def synthetic_report_data(n_items: int, seed: int = 0) -> Dict:
+    """룰 위반 / 클러스터 지표 / 트렌드를 n_items 개씩 가진 analyzer 결과 형태의 dict"""
+    rng = np.random.default_rng(seed)
+    values = rng.random((n_items, 6)) * 100
+    grades = rng.integers(1, 7, n_items)
+    return {
+        'store_data': {
+            'store_id': 'BENCH00001', 'store_name': '벤치마크점', 'industry': '카페', 'static_cluster': np.int64(3),
+            'x': np.float64(127.05), 'y': np.float64(37.54), 'nearby_stores': np.int64(20),
+            'foot_traffic': np.int64(5000), 'rent_increase_rate': np.float64(3.2),
+        },
+        'location_info': {'business_district': '성수'},
+        'cluster_metadata': {'cluster_name': '클러스터 3', 'closure_rate': np.float64(12.5)},
+        'diagnosis_results': {'total_risk_score': np.float64(64.0)},
+        'model_results': {
+            'sales_prediction': np.float64(1200.0), 'event_prediction': '매출 급감',
+            'survival_probability': np.float64(72.5), 'risk_score': np.float64(64.0), 'closure_probability': None,
+        },
+        'rule_violations': [
+            {'ruleText': f'지표{i} >= 임계값', 'riskLevel': '높음', 'featureKorean': f'지표{i}',
+             'currentValue': values[i, 0], 'threshold': values[i, 1], 'direction': '>='}
+            for i in range(n_items)
+        ],
+        'cluster_indicators': [
+            {'name': f'지표{i}', 'value': values[i, 0], 'clusterAvg': values[i, 2], 'clusterMedian': values[i, 3],
+             'threshold': values[i, 1], 'percentile': values[i, 4], 'unit': '%', 'description': f'지표{i} 설명',
+             'isPositive': bool(i % 2)}
+            for i in range(n_items)
+        ],
+        'trend_data': [
+            {'month': f'{2000 + i // 12:04d}-{i % 12 + 1:02d}', 'salesGrade': grades[i], 'type': 'actual',
+             'clusterRank': values[i, 5] / 100, 'pLow56': None, 'riskWorsen': None}
+            for i in range(n_items)
+        ],
+        'sales_predictions': [
+            {'target_month': f'2030-0{h}', 'horizon': np.int64(h), 'yhat_grade': np.int64(3),
+             'yhat_prob': np.float64(0.4), 'p_low56': np.float64(0.2), 'risk_worsen_ge2': np.float64(0.1),
+             'y_t': np.int64(3)}
+            for h in (1, 2, 3)
+        ],
+    }
+
+
+def serialize_pydantic(report_data: Dict) -> bytes:
+    """기존 경로: 중첩 모델 생성 → response_model 재검증 → JSONResponse 직렬화"""
+    response = build_report_response(report_data, PENDING_SUGGESTION)
+    validated = FranchiseReportResponse.model_validate(response.model_dump())
+    return json.dumps(validated.model_dump(mode='json'), ensure_ascii=False, allow_nan=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def serialize_orjson(report_data: Dict) -> bytes:
+    """고속 경로: 스키마 인코더로 plain dict → orjson"""
+    return report_serializer.dumps(build_report_payload(report_data, PENDING_SUGGESTION))
+
+
+def _time_per_call(fn, arg, min_seconds: float) -> float:
+    fn(arg)  # 워밍업
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn(arg)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def run(sizes: List[int], min_seconds: float) -> List[Dict]:
+    results = []
+    for n in sizes:
+        report_data = synthetic_report_data(n)
+        if json.loads(serialize_pydantic(report_data)) != json.loads(serialize_orjson(report_data)):
+            raise AssertionError(f"직렬화 결과 불일치 (항목 {n}개)")
+        pydantic_ms = _time_per_call(serialize_pydantic, report_data, min_seconds) * 1000
+        orjson_ms = _time_per_call(serialize_orjson, report_data, min_seconds) * 1000
+        result = {'items': n, 'pydanticMs': round(pydantic_ms, 3), 'orjsonMs': round(orjson_ms, 3),
+                  'speedup': round(pydantic_ms / orjson_ms, 2)}
+        results.append(result)
+        print(f"항목 {n:>6,}개 | pydantic {pydantic_ms:9.3f}ms | orjson {orjson_ms:9.3f}ms | "
+              f"{result['speedup']:.1f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리포트 응답 직렬화 벤치마크")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="쉼표로 구분한 룰 위반/지표/트렌드 항목 수")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="크기별 최소 측정 시간(초)")
+    parser.add_argument("--out", help="결과 JSON 파일 (없으면 표준 출력만)")
+    args = parser.parse_args()
+    if not report_serializer.available():
+        parser.error("orjson 이 설치되어 있지 않습니다.")
+
+    results = run([int(s) for s in args.sizes.split(',')], args.min_seconds)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+        print(f"✅ 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+LLM provider 를 스텁으로 교체한 API 서버 (벤치마크 전용)
+
+실제 LLM 대신 고정 지연 후 정해진 응답을 돌려주므로, 외부 API 비용/변동 없이
+리포트 파이프라인과 LLM 경로(세마포어, 타임아웃, 스트리밍)의 오버헤드만 측정합니다.
+
+사용법 (backend 디렉토리에서):
+    DATA_DIR=/tmp/bench-data python -m benchmarks.stub_server --port 8765 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+from typing import AsyncIterator, Dict
+
+STUB_RESPONSE = """summary: 벤치마크용 스텁 응답입니다. 위험도와 트렌드를 기반으로 한 요약입니다.
+strategies:
+- 🎯 **전략1**: 스텁 전략 설명 1
+- 📱 **전략2**: 스텁 전략 설명 2
+- 💰 **전략3**: 스텁 전략 설명 3
+- 📊 **전략4**: 스텁 전략 설명 4
+"""
+
+
+def install_stub_llm(latency: float, chunks: int = 20) -> None:
+    """llm_service 의 provider 호출을 지연 + 고정 응답 스텁으로 교체"""
+    from app.services.llm_service import llm_service
+
+    llm_service.api_key = "stub"
+    llm_service.provider = "openai"
+
+    async def call(prompt: str, analysis_data: Dict = None) -> Dict:
+        await asyncio.sleep(latency)
+        return llm_service._parse_llm_response(STUB_RESPONSE, analysis_data)
+
+    async def stream(prompt: str) -> AsyncIterator[str]:
+        step = max(1, len(STUB_RESPONSE) // chunks)
+        for i in range(0, len(STUB_RESPONSE), step):
+            await asyncio.sleep(latency / chunks)
+            yield STUB_RESPONSE[i:i + step]
+
+    llm_service._call_openai = call
+    llm_service._stream_openai = stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 스텁 API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="스텁 LLM 응답 지연(초)")
+    args = parser.parse_args()
+
+    import uvicorn
+    from app.main import app
+
+    install_stub_llm(args.llm_latency)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+합성 가맹점 네트워크 데이터 생성기
+
+DataLoader 가 읽는 7개 CSV 를 실제 스키마 그대로, 원하는 점포 수(1천 ~ 100만)로 생성합니다.
+점포는 청크 단위로 벡터 생성 후 CSV 에 이어 쓰므로 100만 점포도 메모리에 한 번에 올리지 않습니다.
+같은 --stores / --seed / --chunk-size 이면 항상 같은 데이터가 만들어집니다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.synthetic_data --stores 10000 --out /tmp/bench-data
+    python -m benchmarks.synthetic_data --stores 1000000 --out /tmp/bench-1m
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+N_CLUSTERS = 12
+N_MONTHS = 24
+FIRST_MONTH = "2023-01"
+DEFAULT_CHUNK_SIZE = 100_000
+
+# 룰/지표 대상 특성: (컬럼, 한국어 이름, 최소, 최대)
+FEATURES = [
+    ('male_20_under_ratio', '20대 이하 남성 고객 비율', 0.0, 40.0),
+    ('male_30_ratio', '30대 남성 고객 비율', 0.0, 35.0),
+    ('male_40_ratio', '40대 남성 고객 비율', 0.0, 30.0),
+    ('female_30_ratio', '30대 여성 고객 비율', 0.0, 35.0),
+    ('returning_customer_ratio', '재방문 고객 비율', 5.0, 60.0),
+    ('new_customer_ratio', '신규 고객 비율', 5.0, 50.0),
+    ('delivery_sales_ratio', '배달 매출 비율', 0.0, 80.0),
+    ('industry_closure_ratio', '업종 내 폐업 비율', 0.0, 30.0),
+    ('district_closure_ratio', '상권 내 폐업 비율', 0.0, 25.0),
+    ('industry_sales_rank_ratio', '업종 내 매출 순위 비율', 0.0, 100.0),
+    ('district_sales_rank_ratio', '상권 내 매출 순위 비율', 0.0, 100.0),
+    ('visit_count', '월 평균 방문 횟수', 1.0, 30.0),
+]
+
+CLUSTER_NAMES = [
+    '정통 한식', '분식 프랜차이즈', '백반/가정식', '소규모 분식', '중식', '소형 커피',
+    '베이커리', '대형 카페', '마장동 시장', '단일 양식당', '치킨/주류', '일식/주점',
+]
+CLUSTER_INDUSTRIES = [
+    '한식', '분식', '한식', '분식', '중식', '카페',
+    '베이커리', '카페', '축산물', '양식', '치킨', '일식',
+]
+DISTRICTS = [
+    ('성수역', '성수동1가'), ('뚝섬역', '성수동2가'), ('왕십리역', '행당동'),
+    ('마장동 축산시장', '마장동'), ('한양대역', '사근동'), ('금호역', '금호동'),
+    ('옥수역', '옥수동'), ('응봉역', '응봉동'),
+]
+EVENT_PREDICTIONS = ['정상 운영', '정상 운영', '정상 운영', '매출 하락 주의', '폐업 위험']
+
+TABLE_FILES = {
+    'store_features': "final_features_per_store.csv",
+    'store_diagnosis_results': "store_diagnosis_results_2.csv",
+    'cluster_metadata': "cluster_metadata.csv",
+    'feature_dictionary': "feature_dictionary.csv",
+    'risk_checklist_rules': "risk_checklist_rules_2.csv",
+    'store_monthly_timeseries': "store_monthly_timeseries.csv",
+    'sales_predict': "sales_predict_result.csv",
+}
+
+
+def store_ids(start: int, stop: int) -> np.ndarray:
+    """점포 ID (실데이터와 같은 10자리 16진수 문자열)"""
+    return np.array([f"{i:010X}" for i in range(start, stop)], dtype=object)
+
+
+def _month_labels(n_months: int = N_MONTHS + 3) -> List[str]:
+    return [str(p) for p in pd.period_range(FIRST_MONTH, periods=n_months, freq='M')]
+
+
+def build_reference_tables(seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """점포 수와 무관한 작은 테이블 (클러스터 메타데이터, 특성 사전, 룰)"""
+    rng = np.random.default_rng([seed, 0])
+
+    cluster_metadata = pd.DataFrame({
+        'cluster_id': np.arange(N_CLUSTERS),
+        'cluster_name': CLUSTER_NAMES,
+        'closure_rate': np.round(rng.uniform(3.0, 25.0, N_CLUSTERS), 2),
+        'summary_text': [f"{name} 중심의 {industry} 점포 군집" for name, industry in zip(CLUSTER_NAMES, CLUSTER_INDUSTRIES)],
+    })
+
+    feature_dictionary = pd.DataFrame({
+        'feature': [feature for feature, _, _, _ in FEATURES],
+        'feature_korean': [korean for _, korean, _, _ in FEATURES],
+    })
+
+    rules = []
+    for cluster_id in range(N_CLUSTERS):
+        n_rules = int(rng.integers(5, 10))
+        for j in rng.choice(len(FEATURES), size=n_rules, replace=False):
+            feature, korean, low, high = FEATURES[j]
+            direction = '<=' if rng.random() < 0.5 else '>='
+            # 위반 비율이 대략 20% 가 되도록 분포 양 끝 근처에 임계값 배치
+            quantile = 0.2 if direction == '<=' else 0.8
+            threshold = round(low + (high - low) * quantile, 2)
+            rules.append({
+                'cluster_id': cluster_id,
+                'feature': feature,
+                'threshold': threshold,
+                'direction': direction,
+                'risk_level': '치명적' if rng.random() < 0.3 else '주의',
+                'rule_text': f"{korean} {direction} {threshold}",
+                'feature_korean': korean,
+            })
+
+    return {
+        'cluster_metadata': cluster_metadata,
+        'feature_dictionary': feature_dictionary,
+        'risk_checklist_rules': pd.DataFrame(rules),
+    }
+
+
+def build_store_chunk(start: int, stop: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """점포 [start, stop) 구간의 점포별 테이블 (청크 시작 위치별 독립 시드)"""
+    rng = np.random.default_rng([seed, 1, start])
+    n = stop - start
+    ids = store_ids(start, stop)
+    clusters = rng.integers(0, N_CLUSTERS, n)
+    district_idx = rng.integers(0, len(DISTRICTS), n)
+
+    features = pd.DataFrame({
+        'store_id': ids,
+        'store_name': [f"가맹점 {i:07d}" for i in range(start, stop)],
+        'industry': np.array(CLUSTER_INDUSTRIES, dtype=object)[clusters],
+        'static_cluster': clusters,
+        # 원본 CSV 와 같이 x = 경도, y = 위도 (서울 성수/강남 일대)
+        'x': np.round(127.02 + rng.random(n) * 0.05, 6),
+        'y': np.round(37.53 + rng.random(n) * 0.04, 6),
+        'business_district': np.array([d for d, _ in DISTRICTS], dtype=object)[district_idx],
+        'region_3depth_name': np.array([r for _, r in DISTRICTS], dtype=object)[district_idx],
+        'nearby_stores': rng.integers(0, 80, n),
+        'foot_traffic': rng.integers(500, 50_000, n),
+        'rent_increase_rate': np.round(rng.normal(3.0, 2.0, n), 2),
+    })
+    for feature, _, low, high in FEATURES:
+        features[feature] = np.round(low + (high - low) * rng.beta(2.0, 2.0, n), 3)
+
+    risk_score = np.round(np.clip(rng.normal(45.0, 18.0, n), 0, 100), 2)
+    n_violations = rng.integers(0, 9, n)
+    diagnosis = pd.DataFrame({
+        'store_id': ids,
+        'total_risk_score': risk_score,
+        'n_violations': n_violations,
+        'n_critical_violations': np.minimum(n_violations, rng.integers(0, 4, n)),
+        'sales_prediction': np.round(rng.random(n), 4),
+        'event_prediction': np.array(EVENT_PREDICTIONS, dtype=object)[rng.integers(0, len(EVENT_PREDICTIONS), n)],
+    })
+
+    # 월별 매출 등급: 점포마다 개업 월이 다르고 마지막 달까지 관측
+    months = _month_labels()
+    open_month = rng.integers(0, N_MONTHS - 6, n)
+    lengths = N_MONTHS - open_month
+    row_store = np.repeat(np.arange(n), lengths)
+    row_offset = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    row_month = np.repeat(open_month, lengths) + row_offset
+    base_grade = rng.integers(1, 7, n)
+    grades = np.clip(np.repeat(base_grade, lengths) + rng.integers(-1, 2, len(row_store)), 1, 6)
+    timeseries = pd.DataFrame({
+        'store_id': ids[row_store],
+        'date': np.array([f"{m}-01" for m in months], dtype=object)[row_month],
+        'sales': grades,
+    })
+
+    # 향후 3개월 매출 등급 예측 (조회 시 horizon 정렬 경로를 타도록 순서를 섞어 둠)
+    horizons = np.tile([3, 1, 2], n)
+    pred_store = np.repeat(np.arange(n), 3)
+    last_grade = grades[np.cumsum(lengths) - 1]
+    sales_predict = pd.DataFrame({
+        'store_id': ids[pred_store],
+        'target_month': np.array(months, dtype=object)[N_MONTHS - 1 + horizons],
+        'horizon': horizons,
+        'yhat_grade': np.clip(last_grade[pred_store] + rng.integers(-1, 2, 3 * n), 1, 6),
+        'yhat_prob': np.round(rng.uniform(0.2, 0.9, 3 * n), 4),
+        'p_low56': np.round(rng.random(3 * n), 4),
+        'risk_worsen_ge2': np.round(rng.random(3 * n), 4),
+        'y_t': last_grade[pred_store],
+    })
+
+    return {
+        'store_features': features,
+        'store_diagnosis_results': diagnosis,
+        'store_monthly_timeseries': timeseries,
+        'sales_predict': sales_predict,
+    }
+
+
+def generate(out_dir: Path, n_stores: int, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """7개 CSV 생성 → 테이블별 행 수"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows: Dict[str, int] = {}
+
+    for table, df in build_reference_tables(seed).items():
+        df.to_csv(out_dir / TABLE_FILES[table], index=False)
+        rows[table] = len(df)
+
+    for start in range(0, n_stores, chunk_size):
+        stop = min(start + chunk_size, n_stores)
+        for table, df in build_store_chunk(start, stop, seed).items():
+            df.to_csv(out_dir / TABLE_FILES[table], mode='w' if start == 0 else 'a',
+                      header=start == 0, index=False)
+            rows[table] = rows.get(table, 0) + len(df)
+        print(f"   {stop:,}/{n_stores:,} 점포 생성")
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 가맹점 데이터 생성")
+    parser.add_argument("--stores", type=int, default=10_000, help="점포 수 (1천 ~ 100만)")
+    parser.add_argument("--out", required=True, help="CSV 출력 디렉토리 (DATA_DIR 로 사용)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = generate(Path(args.out), args.stores, seed=args.seed, chunk_size=args.chunk_size)
+    for table, count in rows.items():
+        print(f"✅ {TABLE_FILES[table]}: {count:,}행")
+    print(f"⏱️  {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+gunicorn 설정 (공유 매핑 데이터 플레인)
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+master 프로세스가 워커를 fork 하기 전에 매핑 파일을 한 번만 만들어 두고,
+각 워커는 startup 시 읽기 전용 매핑에 연결만 합니다.
+"""
+import os
+from pathlib import Path
+
+os.environ.setdefault("DATA_PLANE", "mmap")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def on_starting(server):
+    from app.services.mmap_store import prepare_shared_tables
+
+    data_dir = Path(os.getenv("DATA_DIR", Path(__file__).parent / "data"))
+    prepare_shared_tables(data_dir)
@@ -0,0 +1,33 @@
+"""
+공용 fixture - 합성 데이터 디렉토리와 그 디렉토리를 읽는 DataLoader
+"""
+import pytest
+
+from benchmarks import synthetic_data
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """점포 200곳 합성 데이터 (benchmarks.synthetic_data 와 같은 파일 구성)"""
+    path = tmp_path / "data"
+    synthetic_data.generate(path, n_stores=200)
+    return path
+
+
+@pytest.fixture
+def make_loader(data_dir, tmp_path, monkeypatch):
+    """data_dir 를 읽는 새 DataLoader 생성 함수 (DATA_LOAD_MODE 지정 가능)"""
+    from app.services.data_loader import DataLoader
+
+    def make(load_mode: str = "eager") -> DataLoader:
+        monkeypatch.setenv("DATA_DIR", str(data_dir))
+        monkeypatch.setenv("MODELS_DIR", str(tmp_path / "models"))
+        monkeypatch.setenv("DATA_LOAD_MODE", load_mode)
+        monkeypatch.setenv("DATA_PLANE", "memory")
+        loader = DataLoader()
+        if load_mode == "lazy":
+            loader.prepare_lazy()
+        else:
+            loader.load_all()
+        return loader
+    return make
@@ -0,0 +1,27 @@
+"""
+주변 점포 / 상권 통계 - 공간 인덱스 재생성 기준
+"""
+from app.services.area_stats import AreaStats
+
+
+def test_build_does_not_cache_stale_geo_under_new_version(make_loader, monkeypatch):
+    """테이블 로드와 버전 확인 사이에 점포 특성 델타가 적용되어도 다음 build 에서 새 점포가 보임"""
+    loader = make_loader()
+    area_stats = AreaStats(loader)
+    features = loader.load_store_features()
+    delta = features.iloc[:1].copy()
+    delta['store_id'] = 'NEWSTORE01'
+
+    load_features = loader.load_store_features
+
+    def load_then_ingest():
+        # build 가 (이전) 테이블을 읽은 직후 델타 적용
+        df = load_features()
+        monkeypatch.setattr(loader, 'load_store_features', load_features)
+        loader.apply_delta('store_features', delta, 'new-store')
+        return df
+
+    monkeypatch.setattr(loader, 'load_store_features', load_then_ingest)
+    area_stats.build()
+
+    assert area_stats.store_location('NEWSTORE01') is not None
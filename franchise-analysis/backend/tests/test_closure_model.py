@@ -0,0 +1,20 @@
+"""
+폐업 예측 서빙 - 학습 스크립트가 내보낸 .keras 모델을 서빙 쪽에서 다시 로드할 수 있는지 확인
+"""
+import numpy as np
+import pytest
+
+from app.ml.training_windows import KERAS_MODEL_FILE, build_transformer_model
+from app.services.closure_model import KerasClosureModel
+
+
+def test_transformer_export_loads_for_serving(tmp_path):
+    pytest.importorskip("tensorflow")
+    model = build_transformer_model(vocab_size=10, max_len=6)
+    X = np.random.default_rng(0).integers(0, 10, (4, 6))
+    expected = np.asarray(model(X, training=False))[:, 3]
+    model.save(tmp_path / KERAS_MODEL_FILE)
+
+    served = KerasClosureModel(tmp_path / KERAS_MODEL_FILE, closure_idx=3, threads=1)
+
+    np.testing.assert_allclose(served.closure_proba(X), expected, atol=1e-5)
@@ -0,0 +1,113 @@
+"""
+DataLoader 인덱스 생성 / 증분 적재
+"""
+import threading
+
+import pandas as pd
+
+from app.services import data_loader as data_loader_module
+
+
+def test_lazy_index_build_does_not_overwrite_delta(make_loader, monkeypatch):
+    """요청 스레드가 이전 테이블로 인덱스를 만드는 도중 델타가 적용되어도 새 인덱스가 유지됨"""
+    loader = make_loader("lazy")
+    table = loader.load_sales_predict()
+    store_id = str(table['store_id'].iloc[0])
+    delta = table[table['store_id'] == store_id].copy()
+    delta['yhat_grade'] = 6
+
+    original = data_loader_module.StoreIndex
+    calls = []
+
+    def racing_index(df, key='store_id'):
+        # 첫 번째(요청 스레드의) 인덱스 생성 도중에 델타 적용
+        calls.append(df)
+        if len(calls) == 1:
+            loader.apply_delta('sales_predict', delta, 'race-delta')
+        return original(df, key=key)
+
+    monkeypatch.setattr(data_loader_module, 'StoreIndex', racing_index)
+    index = loader._get_index('sales_predict')
+    monkeypatch.setattr(data_loader_module, 'StoreIndex', original)
+
+    assert index is loader._indexes['sales_predict']
+    assert len(index) == len(original(loader.load_sales_predict()))
+    predictions = loader.get_sales_predictions(store_id)
+    assert predictions and all(p['yhat_grade'] == 6 for p in predictions)
+
+
+def _predictions_delta(loader, store_id, grade):
+    delta = loader.load_sales_predict()
+    delta = delta[delta['store_id'] == store_id].copy()
+    delta['yhat_grade'] = grade
+    return delta
+
+
+def test_pinned_view_keeps_old_rows_while_delta_is_swapped_in(make_loader):
+    """고정된 뷰 안의 조회는 델타 적용 전 데이터, 블록 밖의 새 조회는 교체된 행"""
+    loader = make_loader()
+    store_id = str(loader.load_sales_predict()['store_id'].iloc[0])
+    before = loader.get_sales_predictions(store_id)
+    old_version = loader.data_version
+
+    with loader.pinned() as view:
+        # 다른 스레드(적재 API / 폴링)에서 델타 적용
+        worker = threading.Thread(
+            target=loader.apply_delta, args=('sales_predict', _predictions_delta(loader, store_id, 6), 'd1'))
+        worker.start()
+        worker.join()
+        assert loader.get_sales_predictions(store_id) == before
+        assert view.version == old_version
+
+    after = loader.get_sales_predictions(store_id)
+    assert len(after) == len(before)
+    assert all(p['yhat_grade'] == 6 for p in after)
+    assert loader.data_version != old_version
+    assert 'd1' in loader.applied_deltas
+
+
+def test_delta_replay_is_idempotent(make_loader):
+    """같은 델타 ID 는 건너뛰고, 같은 키의 델타를 다른 ID 로 다시 적용해도 조회 결과는 같음"""
+    loader = make_loader()
+    store_id = str(loader.load_sales_predict()['store_id'].iloc[0])
+    delta = _predictions_delta(loader, store_id, 6)
+
+    first = loader.apply_delta('sales_predict', delta, 'd1')
+    after = loader.get_sales_predictions(store_id)
+    version = loader.data_version
+
+    assert loader.apply_delta('sales_predict', delta, 'd1')['skipped'] is True
+    assert loader.data_version == version
+
+    again = loader.apply_delta('sales_predict', delta, 'd2')
+    assert again['replacedRows'] == first['rows']
+    assert loader.get_sales_predictions(store_id) == after
+
+
+def test_monthly_delta_replaces_store_month_and_appends_new_month(make_loader):
+    """점포-월 키가 같은 행은 교체, 새 월은 추가 (고정된 뷰의 월 등급은 그대로)"""
+    loader = make_loader()
+    timeseries = loader.load_store_monthly_timeseries()
+    store_id = str(timeseries['store_id'].iloc[0])
+    before = loader.get_store_monthly_timeseries(store_id)
+    first_month = min(before)
+    next_month = (pd.Period(max(before), freq='M') + 1).strftime('%Y-%m')
+    new_grade = 1 if before[first_month]['sales'] != 1 else 2
+    delta = pd.DataFrame({
+        'store_id': [store_id, store_id],
+        'date': [f'{first_month}-01', f'{next_month}-01'],
+        'sales': [new_grade, 3],
+    })
+
+    with loader.pinned():
+        loader.apply_delta('store_monthly_timeseries', delta, 'm1')
+        assert loader.get_store_monthly_timeseries(store_id) == before
+
+    after = loader.get_store_monthly_timeseries(store_id)
+    assert list(after) == list(before) + [next_month]
+    assert after[first_month] == {'sales': new_grade}
+    assert after[next_month] == {'sales': 3}
+    assert {m: v for m, v in after.items() if m not in (first_month, next_month)} == \
+        {m: v for m, v in before.items() if m != first_month}
+    live = loader._table('store_monthly_timeseries').iloc[loader._get_index('store_monthly_timeseries').positions(store_id)]
+    assert len(live) == len(before) + 1
@@ -0,0 +1,115 @@
+"""
+이벤트 시퀀스 / 학습 윈도우 - 노트북 참조 구현과 결과 비교
+
+`6_2_추천시스템_모델링.ipynb` 의 generate_event / generate_event_upgraded 를 그대로 가져와
+작은 합성 월별 데이터로 노트북 방식(apply + groupby + pad_sequences 루프)과
+app.ml.event_sequence / app.ml.training_windows 의 결과가 같은지 확인합니다.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.event_sequence import CLOSURE_EVENT, build_event_sequences, prepare_monthly_frame
+from app.ml.training_windows import TrainingWindows
+
+NOTEBOOK = Path(__file__).resolve().parents[3] / "6_2_추천시스템_모델링.ipynb"
+
+
+@pytest.fixture(scope="module")
+def notebook():
+    """노트북 셀에서 이벤트 생성 함수 정의만 실행한 네임스페이스"""
+    if not NOTEBOOK.exists():
+        pytest.skip(f"노트북 없음: {NOTEBOOK}")
+    cells = json.loads(NOTEBOOK.read_text(encoding="utf-8"))["cells"]
+    namespace = {}
+    for cell in cells:
+        source = "".join(cell["source"])
+        if cell["cell_type"] == "code" and ("def generate_event(" in source or "def generate_event_upgraded(" in source):
+            exec(source, namespace)
+    return namespace
+
+
+@pytest.fixture(scope="module")
+def monthly_data():
+    """점포 60곳의 월별 지표 (월 순서 섞임, 결측, 폐업, 클러스터 없는 점포 포함) + 점포 특성"""
+    rng = np.random.default_rng(0)
+    rows = []
+    for s in range(60):
+        months = rng.permutation(pd.period_range("2023-01", periods=int(rng.integers(1, 13)), freq="M").astype(str))
+        for month in months:
+            rows.append({
+                "store_id": f"S{s:03d}", "ref_year_month": month,
+                "industry_sales_rank_ratio": rng.uniform(0, 100), "district_sales_rank_ratio": rng.uniform(0, 100),
+                "male_20_under_ratio": rng.uniform(0, 40), "male_30_ratio": rng.uniform(0, 30),
+                "male_40_ratio": rng.uniform(0, 20), "female_30_ratio": rng.uniform(0, 30),
+                "returning_customer_ratio": rng.uniform(0, 50), "delivery_sales_ratio": rng.uniform(0, 60),
+                "industry_closure_ratio": rng.uniform(0, 30), "district_closure_ratio": rng.uniform(0, 15),
+                "is_closed": bool(rng.random() < 0.05),
+            })
+    monthly = pd.DataFrame(rows)
+    monthly.loc[rng.random(len(monthly)) < 0.05, "male_40_ratio"] = np.nan
+    features = pd.DataFrame({"store_id": monthly["store_id"].unique()})
+    features["static_cluster"] = rng.integers(0, 11, len(features))
+    return monthly, features.iloc[:-3]
+
+
+def _notebook_sequences(monthly, features, generate, version):
+    """노트북 셀 3/4/19 순서 그대로: 병합 → month_order → 정렬 → diff → apply → groupby"""
+    df = pd.merge(monthly, features.rename(columns={"static_cluster": "cluster_id"})[["store_id", "cluster_id"]],
+                  on="store_id", how="left")
+    df["month_order"] = df.groupby("store_id").cumcount() + 1
+    df.sort_values(by=["store_id", "ref_year_month"], inplace=True)
+    df["rank_change"] = df.groupby("store_id")["industry_sales_rank_ratio"].diff()
+    df["district_rank_change"] = df.groupby("store_id")["district_sales_rank_ratio"].diff()
+    events = df.apply(generate, axis=1)
+    if version == "v1":
+        sequences = events.groupby(df["store_id"]).apply(list)
+    else:
+        sequences = events.groupby(df["store_id"]).apply(lambda lists: [e for sublist in lists for e in sublist])
+    closed = set(df.loc[df["is_closed"] == True, "store_id"])  # noqa: E712 (노트북과 동일)
+    return {store_id: seq + [CLOSURE_EVENT] if store_id in closed else seq for store_id, seq in sequences.items()}
+
+
+def _pad_sequences(sequences, max_len):
+    """keras pad_sequences(padding='pre', truncating='pre')"""
+    out = np.zeros((len(sequences), max_len), dtype=np.int64)
+    for i, seq in enumerate(sequences):
+        seq = list(seq)[-max_len:]
+        if seq:
+            out[i, max_len - len(seq):] = seq
+    return out
+
+
+@pytest.mark.parametrize("version, function", [("v1", "generate_event"), ("v2", "generate_event_upgraded")])
+def test_event_sequences_match_notebook(notebook, monthly_data, version, function):
+    monthly, features = monthly_data
+    expected = _notebook_sequences(monthly, features, notebook[function], version)
+
+    sequences = build_event_sequences(prepare_monthly_frame(monthly, features), version=version)
+
+    assert dict(zip(sequences.store_ids, sequences.to_lists())) == expected
+    assert list(sequences.store_ids) == list(expected)
+
+
+@pytest.mark.parametrize("max_len", [None, 3])
+def test_training_windows_match_notebook(monthly_data, max_len):
+    monthly, features = monthly_data
+    sequences = build_event_sequences(prepare_monthly_frame(monthly, features), version="v2")
+    windows = TrainingWindows(sequences, max_len)
+
+    # 노트북 셀 19: 패딩한 시퀀스의 각 위치(패딩 제외)를 정답으로, 그 앞부분을 입력으로
+    padded = _pad_sequences([sequences.sequence(i) for i in range(len(sequences))], windows.max_len)
+    X, y = [], []
+    for seq in padded:
+        for i in range(1, len(seq)):
+            if seq[i] == 0:
+                continue
+            X.append(seq[:i])
+            y.append(seq[i])
+
+    assert len(windows) == len(y)
+    np.testing.assert_array_equal(windows.inputs(), _pad_sequences(X, windows.max_len))
+    np.testing.assert_array_equal(windows.targets(), np.array(y))
@@ -0,0 +1,68 @@
+"""
+증분 적재 - 델타 기록/반영, compact 후 순번
+"""
+import pandas as pd
+import pytest
+
+from app.services.ingestion import DeltaIngestor, compact, list_deltas, write_delta
+from app.services.snapshot import TABLE_SOURCES
+
+
+def _predictions_delta(loader, store_id, grade):
+    delta = loader.load_sales_predict()
+    delta = delta[delta['store_id'] == store_id].copy()
+    delta['yhat_grade'] = grade
+    return delta
+
+
+def test_ingest_then_restart_replays_deltas(make_loader):
+    """적재한 워커는 즉시 반영, 새로 뜬 워커는 sync 로 같은 결과 (다시 sync 해도 변화 없음)"""
+    loader = make_loader()
+    store_id = str(loader.load_sales_predict()['store_id'].iloc[0])
+    result = DeltaIngestor(loader).ingest('sales_predict', _predictions_delta(loader, store_id, 6))
+    assert result['deltaId'] == '00000001-sales_predict.csv'
+    assert result['skipped'] is False
+
+    restarted = make_loader()
+    ingestor = DeltaIngestor(restarted)
+    assert [r['deltaId'] for r in ingestor.sync()] == [result['deltaId']]
+    assert ingestor.sync() == []
+    assert restarted.get_sales_predictions(store_id) == loader.get_sales_predictions(store_id)
+
+
+def test_compact_keeps_sequence_and_merges_rows(make_loader, data_dir):
+    """compact 로 델타를 지워도 순번은 이어지고, 실행 중인 워커의 다음 적재가 충돌하지 않음"""
+    loader = make_loader()
+    ingestor = DeltaIngestor(loader)
+    store_ids = loader.load_sales_predict()['store_id'].unique()
+    first = ingestor.ingest('sales_predict', _predictions_delta(loader, store_ids[0], 6))['deltaId']
+    second = ingestor.ingest('sales_predict', _predictions_delta(loader, store_ids[1], 5))['deltaId']
+
+    # 대체된 행은 빼고 살아 있는 행만 기록
+    assert compact(data_dir) == {'sales_predict': len(loader._get_index('sales_predict').live_positions())}
+    assert list_deltas(data_dir) == []
+
+    # 합쳐진 CSV 만 읽은 워커도 같은 조회 결과
+    compacted = make_loader()
+    for store_id in store_ids[:3]:
+        assert compacted.get_sales_predictions(store_id) == loader.get_sales_predictions(store_id)
+    csv = pd.read_csv(data_dir / TABLE_SOURCES['sales_predict'][0], dtype={'store_id': str})
+    assert (csv.loc[csv['store_id'] == store_ids[0], 'yhat_grade'] == 6).all()
+
+    # 이미 적용한 이름(first/second)이 다시 발급되지 않아야 이 워커에도 반영됨
+    third = ingestor.ingest('sales_predict', _predictions_delta(loader, store_ids[2], 4))
+    assert third['skipped'] is False
+    assert third['deltaId'] > second > first
+    assert all(p['yhat_grade'] == 4 for p in loader.get_sales_predictions(store_ids[2]))
+    assert write_delta(data_dir, 'store_monthly_timeseries', pd.DataFrame(
+        {'store_id': [store_ids[0]], 'date': ['2030-01-01'], 'sales': [1]})) > third['deltaId']
+
+
+def test_ingest_rejects_invalid_delta_without_writing(make_loader, data_dir):
+    loader = make_loader()
+    ingestor = DeltaIngestor(loader)
+    with pytest.raises(ValueError):
+        ingestor.ingest('sales_predict', pd.DataFrame({'store_id': ['X']}))
+    with pytest.raises(ValueError):
+        ingestor.ingest('risk_checklist_rules', pd.DataFrame({'store_id': ['X']}))
+    assert list_deltas(data_dir) == []
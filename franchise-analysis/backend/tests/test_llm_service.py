@@ -0,0 +1,38 @@
+"""
+LLM 클라이언트 생성 - provider 별 SDK 가 기본 HTTP 클라이언트로 생성되는지 확인
+"""
+import asyncio
+
+import pytest
+
+from app.services.llm_service import LLMService
+
+
+@pytest.fixture
+def make_service(monkeypatch, tmp_path):
+    def make(provider: str) -> LLMService:
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        monkeypatch.setenv("OPENAI_API_KEY" if provider == "openai" else "ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "strategy_cache.sqlite3"))
+        monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "7")
+        return LLMService()
+    return make
+
+
+@pytest.mark.parametrize("provider, module, client_class", [
+    ("openai", "openai", "AsyncOpenAI"),
+    ("anthropic", "anthropic", "AsyncAnthropic"),
+])
+def test_get_client_builds_sdk_client(make_service, provider, module, client_class):
+    sdk = pytest.importorskip(module)
+    service = make_service(provider)
+    assert service.provider == provider
+
+    client = service._get_client()
+
+    assert isinstance(client, getattr(sdk, client_class))
+    assert client.timeout == 7
+    assert service._get_client() is client
+    asyncio.run(service.aclose())
+    assert service._client is None
@@ -0,0 +1,99 @@
+"""
+점포별 월 등급 CSR 배열 - 증분 갱신(updated)과 전체 생성(from_table) 비교, 기존 월별 dict 로직과 비교
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.monthly_grades import MISSING_GRADE, MonthlyGrades
+
+
+def _rows(entries):
+    return pd.DataFrame(entries, columns=['store_id', 'date', 'sales'])
+
+
+@pytest.fixture
+def base():
+    """점포 20곳 × 2023-03 ~ 2023-12 중 일부 월 (월 순서 섞임, 같은 점포-월 중복, NaN 등급)"""
+    rng = np.random.default_rng(0)
+    months = pd.period_range('2023-03', '2023-12', freq='M').astype(str)
+    entries = []
+    for s in range(20):
+        for month in rng.permutation(months)[:rng.integers(1, len(months))]:
+            entries.append((f'S{s:02d}', f'{month}-01', float(rng.integers(1, 7))))
+    df = _rows(entries)
+    df.loc[rng.random(len(df)) < 0.1, 'sales'] = np.nan
+    # 같은 점포-월이 여러 행 → 나중 행이 우선
+    return pd.concat([df, df.sample(5, random_state=0).assign(sales=6.0)], ignore_index=True)
+
+
+@pytest.fixture
+def delta():
+    """기존 점포-월 교체 + 더 이른 월/더 늦은 월 + 새 점포 + 델타 안의 중복 + NaN/숫자 아닌 등급"""
+    return _rows([
+        ('S00', '2023-05-01', 1.0),
+        ('S00', '2024-01-01', 2.0),
+        ('S01', '2022-11-01', 3.0),
+        ('S01', '2022-11-01', 4.0),
+        ('S02', '2023-07-01', np.nan),
+        ('S03', '2024-02-01', 'x'),
+        ('NEW1', '2023-08-01', 5.0),
+        ('NEW1', '2022-01-01', 6.0),
+        ('NEW2', '2024-03-01', 2.0),
+        ('S04', '2023-03-01', 5.0),
+    ])
+
+
+def _assert_same(a: MonthlyGrades, b: MonthlyGrades):
+    np.testing.assert_array_equal(a.store_ids, b.store_ids)
+    np.testing.assert_array_equal(a.offsets, b.offsets)
+    np.testing.assert_array_equal(a.month_labels, b.month_labels)
+    np.testing.assert_array_equal(a.month_codes, b.month_codes)
+    np.testing.assert_array_equal(a.grades, b.grades)
+    for store_id in a.store_ids:
+        assert a.as_dict(store_id) == b.as_dict(store_id)
+
+
+def test_updated_matches_from_table(base, delta):
+    full = pd.concat([base, delta], ignore_index=True)
+    _assert_same(MonthlyGrades.from_table(base).updated(delta), MonthlyGrades.from_table(full))
+
+
+def test_updated_in_steps_matches_from_table(base, delta):
+    grades = MonthlyGrades.from_table(base)
+    for i in range(0, len(delta), 3):
+        grades = grades.updated(delta.iloc[i:i + 3])
+    _assert_same(grades, MonthlyGrades.from_table(pd.concat([base, delta], ignore_index=True)))
+
+
+def test_updated_keeps_original(base, delta):
+    """고정된 뷰가 보는 이전 객체는 갱신 후에도 그대로"""
+    original = MonthlyGrades.from_table(base)
+    before = {store_id: original.as_dict(store_id) for store_id in original.store_ids}
+    original.updated(delta)
+    assert {store_id: original.as_dict(store_id) for store_id in original.store_ids} == before
+    assert 'NEW1' not in original
+    assert original.updated(delta.iloc[:0]) is original
+
+
+def _reference_window(df: pd.DataFrame, store_id, months):
+    """기존 get_store_monthly_timeseries + _create_enhanced_trend_data 의 월 선택 (NaN/숫자 아닌 등급은 0)"""
+    result = df[df['store_id'] == store_id]
+    timeseries = {}
+    for _, row in result.iterrows():
+        timeseries[row['date'][:7]] = {'sales': row['sales']}
+    selected = sorted(timeseries, reverse=True)
+    if months is not None:
+        selected = selected[:months]
+    selected.reverse()
+    grades = [pd.to_numeric(pd.Series([timeseries[m]['sales']]), errors='coerce').iloc[0] for m in selected]
+    return selected, [int(g) if np.isfinite(g) else MISSING_GRADE for g in grades]
+
+
+@pytest.mark.parametrize("months", [6, 1, None])
+def test_window_matches_sorted_dict(base, delta, months):
+    full = pd.concat([base, delta], ignore_index=True)
+    grades = MonthlyGrades.from_table(base).updated(delta)
+    for store_id in list(full['store_id'].unique()) + ['MISSING']:
+        labels, values = grades.window(store_id, months)
+        assert (labels.tolist(), values.tolist()) == _reference_window(full, store_id, months)
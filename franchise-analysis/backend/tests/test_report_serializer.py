@@ -0,0 +1,46 @@
+"""
+리포트 직렬화 - orjson 경로와 pydantic 경로(model_dump_json)의 바이트 비교
+"""
+import numpy as np
+import pytest
+
+from app.services import report_serializer
+from app.services.report_cache import PENDING_SUGGESTION, build_report_payload, build_report_response
+from benchmarks.serialization_benchmark import synthetic_report_data
+
+pytestmark = pytest.mark.skipif(not report_serializer.available(), reason="orjson 없음")
+
+
+def _pydantic_bytes(report_data):
+    return build_report_response(report_data, PENDING_SUGGESTION).model_dump_json().encode('utf-8')
+
+
+def _orjson_bytes(report_data):
+    return report_serializer.dumps(build_report_payload(report_data, PENDING_SUGGESTION))
+
+
+@pytest.mark.parametrize("n_items", [0, 1, 25])
+def test_orjson_matches_pydantic(n_items):
+    report_data = synthetic_report_data(n_items)
+    assert _orjson_bytes(report_data) == _pydantic_bytes(report_data)
+
+
+def test_orjson_matches_pydantic_for_numpy_scalars_and_missing_values():
+    """numpy 정수/실수 타입, NaN/Inf(→ null), None, 생략된 Optional 필드"""
+    report_data = synthetic_report_data(6, seed=1)
+    report_data['store_data'].update(nearby_stores=np.int32(7), foot_traffic=np.int16(300),
+                                     rent_increase_rate=np.float32(0.1), x=np.float32(127.1))
+    report_data['model_results'].update(closure_probability=np.float64('nan'), survival_probability=np.float32(72.3))
+    violations, indicators, trend = (report_data['rule_violations'], report_data['cluster_indicators'],
+                                     report_data['trend_data'])
+    violations[0].update(currentValue=np.int64(5), threshold=np.float32(0.35))
+    violations[1].update(currentValue=float('inf'), threshold=-0.0)
+    indicators[0].update(clusterMedian=None, percentile=float('nan'), isPositive=np.bool_(True))
+    indicators[1].update(value=np.float16(0.3), threshold=np.float64('-inf'))
+    del indicators[2]['clusterMedian'], indicators[2]['percentile']
+    trend[0].update(salesGrade=None, pLow56=np.float32('nan'), riskWorsen=np.float64(0.25))
+    trend[1].update(salesGrade=np.int32(4), clusterRank=1e-7)
+    del trend[2]['pLow56'], trend[2]['riskWorsen']
+    report_data['sales_predictions'][0].update(yhat_prob=np.float32(0.4), horizon=np.int8(1))
+
+    assert _orjson_bytes(report_data) == _pydantic_bytes(report_data)
@@ -0,0 +1,120 @@
+"""
+컴파일된 룰 엔진 - 기존 룰별 루프(calculate_rule_violations)와 결과 비교
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.rule_engine import RuleEngine
+
+FEATURES = ['male_40_ratio', 'returning_customer_ratio', 'delivery_sales_ratio', 'visit_count', 'absent_feature']
+
+
+def reference_violations(rules_df: pd.DataFrame, store_data: dict) -> list:
+    """기존 DataLoader.calculate_rule_violations / get_rules_for_cluster 의 룰별 루프 (디버그 출력 제외)"""
+    cluster_id = store_data.get('static_cluster', '0')
+    result = rules_df[rules_df['cluster_id'] == int(cluster_id)]
+    violations = []
+    for rule in result.to_dict('records'):
+        feature = rule['feature']
+        threshold = rule['threshold']
+        direction = rule['direction']
+        if feature in store_data:
+            current_value = store_data[feature]
+            is_violated = False
+            if direction == '<=' and current_value <= threshold:
+                is_violated = True
+            elif direction == '>=' and current_value >= threshold:
+                is_violated = True
+            if is_violated:
+                violations.append({
+                    'ruleText': rule['rule_text'],
+                    'riskLevel': rule['risk_level'],
+                    'featureKorean': rule['feature_korean'],
+                    'currentValue': current_value,
+                    'threshold': threshold,
+                    'direction': direction
+                })
+    return violations
+
+
+@pytest.fixture(scope="module")
+def rules_df():
+    """클러스터 3개 × 특성별 룰 (<=, >=, 처리하지 않는 방향 '==', 정수/실수 임계값, 없는 특성)"""
+    rng = np.random.default_rng(0)
+    rows = []
+    for cluster_id in range(3):
+        for j, feature in enumerate(FEATURES):
+            for direction in ('<=', '>=', '=='):
+                threshold = float(round(rng.uniform(0, 40), 2)) if j % 2 else int(rng.integers(0, 40))
+                rows.append({
+                    'cluster_id': cluster_id, 'feature': feature, 'threshold': threshold, 'direction': direction,
+                    'risk_level': rng.choice(['치명적', '주의']), 'rule_text': f'{feature} {direction} {threshold}',
+                    'feature_korean': feature,
+                })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="module")
+def stores():
+    """점포 특성 DataFrame (정수/실수 컬럼, NaN, 룰에 없는 클러스터 포함 - absent_feature 컬럼은 없음)"""
+    rng = np.random.default_rng(1)
+    n = 300
+    df = pd.DataFrame({
+        'store_id': [f'S{i:04d}' for i in range(n)],
+        'static_cluster': rng.integers(0, 4, n),
+        'male_40_ratio': rng.uniform(0, 40, n),
+        'returning_customer_ratio': rng.uniform(0, 40, n),
+        'delivery_sales_ratio': rng.uniform(0, 40, n),
+        'visit_count': rng.integers(0, 40, n),
+    })
+    df.loc[rng.random(n) < 0.1, 'male_40_ratio'] = np.nan
+    df.loc[rng.random(n) < 0.1, 'delivery_sales_ratio'] = np.nan
+    return df
+
+
+def _store_dicts(df: pd.DataFrame) -> list:
+    # get_store_by_id 와 같이 한 행을 dict 로 (numpy 스칼라 값)
+    return [df.iloc[i].to_dict() for i in range(len(df))]
+
+
+def test_evaluate_store_matches_rule_loop(rules_df, stores):
+    engine = RuleEngine(rules_df)
+    for store_data in _store_dicts(stores):
+        expected = reference_violations(rules_df, store_data)
+        got = engine.evaluate_store(store_data['static_cluster'], store_data)
+        assert got == expected
+        assert [type(v['currentValue']) for v in got] == [type(v['currentValue']) for v in expected]
+
+
+def test_evaluate_stores_and_batch_rows_match_evaluate_store(rules_df, stores):
+    engine = RuleEngine(rules_df)
+    for cluster_id, group in stores.groupby('static_cluster'):
+        store_dicts = _store_dicts(group)
+        single = [engine.evaluate_store(cluster_id, store_data) for store_data in store_dicts]
+
+        assert engine.evaluate_stores(cluster_id, store_dicts) == single
+
+        mask, _ = engine.evaluate_frame(cluster_id, group)
+        batch = [engine.violations_from_row(cluster_id, mask[i], group, i) for i in range(len(group))]
+        assert batch == single
+        assert ([[type(v['currentValue']) for v in row] for row in batch]
+                == [[type(v['currentValue']) for v in row] for row in single])
+
+
+@pytest.mark.parametrize("value", ['N/A', None, ''])
+def test_non_numeric_value_is_not_a_violation(rules_df, stores, value):
+    """숫자가 아닌 값: 기존 루프는 비교에서 TypeError (리포트 실패), 엔진은 해당 룰만 위반 아님으로 처리"""
+    engine = RuleEngine(rules_df)
+    store_data = {**_store_dicts(stores)[0], 'male_40_ratio': value}
+    with pytest.raises(TypeError):
+        reference_violations(rules_df, store_data)
+
+    without_feature = {k: v for k, v in store_data.items() if k != 'male_40_ratio'}
+    expected = reference_violations(rules_df, without_feature)
+    assert engine.evaluate_store(store_data['static_cluster'], store_data) == expected
+
+    frame = pd.DataFrame([store_data])
+    cluster_id = store_data['static_cluster']
+    mask, _ = engine.evaluate_frame(cluster_id, frame)
+    assert engine.violations_from_row(cluster_id, mask[0], frame, 0) == expected
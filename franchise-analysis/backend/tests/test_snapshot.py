@@ -0,0 +1,68 @@
+"""
+스냅샷 / 매핑 파일 - 원본 CSV 의 수정시각만 바뀐 경우
+"""
+import json
+import os
+
+import pytest
+
+from app.services import mmap_store, snapshot
+
+
+def _touch(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    return path.stat().st_mtime_ns
+
+
+def _count_hashes(monkeypatch):
+    calls = []
+    original = snapshot.file_sha256
+
+    def counting_sha256(path, *args, **kwargs):
+        calls.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(snapshot, 'file_sha256', counting_sha256)
+    return calls
+
+
+def test_snapshot_records_new_mtime_after_hash_match(data_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    snapshot.build_snapshot(data_dir)
+    csv_path = data_dir / snapshot.TABLE_SOURCES['sales_predict'][0]
+    mtime_ns = _touch(csv_path)
+    calls = _count_hashes(monkeypatch)
+
+    assert snapshot.load_snapshot_table(data_dir, 'sales_predict') is not None
+    assert snapshot.read_manifest(data_dir)['tables']['sales_predict']['source_mtime_ns'] == mtime_ns
+    assert len(calls) == 1
+
+    # 다음 부팅: 크기/수정시각이 같으므로 해시 생략
+    assert snapshot.load_snapshot_table(data_dir, 'sales_predict') is not None
+    assert len(calls) == 1
+
+
+def test_snapshot_rejects_changed_content_with_same_size(data_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    snapshot.build_snapshot(data_dir)
+    csv_path = data_dir / snapshot.TABLE_SOURCES['sales_predict'][0]
+    entry = snapshot.read_manifest(data_dir)['tables']['sales_predict']
+    content = csv_path.read_bytes()
+    csv_path.write_bytes(content[:-2] + (b'9' if content[-2:-1] != b'9' else b'8') + content[-1:])
+
+    assert snapshot.load_snapshot_table(data_dir, 'sales_predict') is None
+    assert snapshot.read_manifest(data_dir)['tables']['sales_predict'] == entry
+
+
+def test_mmap_meta_records_new_mtime_after_hash_match(data_dir, monkeypatch):
+    table = 'sales_predict'
+    mmap_store.build_table(data_dir, table, snapshot.read_csv_table(data_dir, table))
+    mtime_ns = _touch(data_dir / snapshot.TABLE_SOURCES[table][0])
+    calls = _count_hashes(monkeypatch)
+
+    assert mmap_store.attach_table(data_dir, table) is not None
+    meta = json.loads((mmap_store.mmap_dir(data_dir) / table / mmap_store.META_NAME).read_text(encoding='utf-8'))
+    assert meta['source_mtime_ns'] == mtime_ns
+    assert mmap_store.attach_table(data_dir, table) is not None
+    assert len(calls) == 1
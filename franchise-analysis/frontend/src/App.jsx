@@ -1,26 +1,49 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import SearchForm from './components/SearchForm';
 import StatsCard from './components/StatsCard';
 import RiskIndicators from './components/RiskIndicators';
 import TrendLineChart from './components/Charts/TrendLineChart';
 import ModelResults from './components/ModelResults';
 import LLMSuggestion from './components/LLMSuggestion';
-import { getFranchiseReport } from './services/api';
+import { getFranchiseReport, streamLLMSuggestion } from './services/api';
 import { Store, FileText, AlertTriangle } from 'lucide-react';
 
 function App() {
   const [reportData, setReportData] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const closeStreamRef = useRef(null);
+
+  // 언마운트 시 진행 중인 LLM 스트림 종료
+  useEffect(() => () => closeStreamRef.current?.(), []);
+
+  // LLM 전략은 리포트 표시 후 별도 스트림으로 수신
+  const startLLMStream = (storeId) => {
+    closeStreamRef.current?.();
+    closeStreamRef.current = streamLLMSuggestion(storeId, {
+      onDone: (suggestion) => {
+        setReportData((prev) => (prev ? { ...prev, llmSuggestion: suggestion } : prev));
+      },
+      onError: () => {
+        setReportData((prev) => (
+          prev ? { ...prev, llmSuggestion: { ...prev.llmSuggestion, status: 'error' } } : prev
+        ));
+      },
+    });
+  };
 
   // 가맹점 리포트 검색
   const handleSearch = async (storeId) => {
     setLoading(true);
     setError(null);
+    closeStreamRef.current?.();
     
     try {
-      const data = await getFranchiseReport(storeId);
+      const data = await getFranchiseReport(storeId, { deferLLM: true });
       setReportData(data);
+      if (data.llmSuggestion?.status === 'pending') {
+        startLLMStream(storeId);
+      }
     } catch (err) {
       setError(err.message);
       setReportData(null);
@@ -63,6 +63,24 @@ const ClusterIndicators = ({ indicators }) => {
                 </span>
               </div>
 
+              {indicator.clusterMedian != null && (
+                <div className="flex justify-between items-center">
+                  <span className="text-sm text-gray-600">클러스터 중앙값</span>
+                  <span className="text-sm">
+                    {Number(indicator.clusterMedian).toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 })}{indicator.unit}
+                  </span>
+                </div>
+              )}
+
+              {indicator.percentile != null && (
+                <div className="flex justify-between items-center">
+                  <span className="text-sm text-gray-600">클러스터 내 위치</span>
+                  <span className="text-sm font-semibold">
+                    하위 {Number(indicator.percentile).toFixed(1)}%
+                  </span>
+                </div>
+              )}
+
               {/* 비교 막대 그래프 (내 점포 vs 클러스터 평균) */}
               <div className="mt-2">
                 {(() => {
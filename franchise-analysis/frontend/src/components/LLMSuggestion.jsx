@@ -18,6 +18,23 @@ const LLMSuggestion = ({ suggestion }) => {
     setExpandedIndex(expandedIndex === index ? null : index);
   };
 
+  // 별도 스트림으로 전략을 받는 중
+  if (suggestion.status === 'pending' || suggestion.status === 'error') {
+    return (
+      <div className="bg-gradient-to-r from-indigo-500 to-purple-600 rounded-xl shadow-lg p-6 text-white">
+        <div className="flex items-center gap-2">
+          <Sparkles size={28} className="animate-pulse" />
+          <h2 className="text-2xl font-bold">AI 생존 전략 제안</h2>
+        </div>
+        <p className="mt-4 text-white/80">
+          {suggestion.status === 'pending'
+            ? 'AI가 전략을 생성하고 있습니다...'
+            : '⚠️ AI 전략을 불러오지 못했습니다.'}
+        </p>
+      </div>
+    );
+  }
+
   return (
     <div className="bg-gradient-to-r from-indigo-500 to-purple-600 rounded-xl shadow-lg p-6 text-white hover:shadow-2xl transition-all duration-300 hover:-translate-y-1">
       {/* 헤더 */}
@@ -104,6 +104,20 @@ const ModelResults = ({ results, salesPredictions = [] }) => {
             <span className="text-sm text-gray-600">점 (0-100)</span>
           </div>
         </div>
+
+        {/* 시퀀스 모델 폐업 확률 (모델 산출물이 배포된 경우에만) */}
+        {results.closureProbability != null && (
+          <div className="bg-gradient-to-r from-purple-50 to-purple-100 rounded-lg p-4 border-l-4 border-purple-500 hover:shadow-lg transition-all duration-300">
+            <div className="flex items-center gap-2 mb-2">
+              <AlertTriangle className="text-purple-600" size={20} />
+              <h4 className="font-semibold text-gray-700">다음 달 폐업 확률</h4>
+            </div>
+            <p className={`text-2xl font-bold ${getRiskColor(results.closureProbability * 100)}`}>
+              {(results.closureProbability * 100).toFixed(1)}%
+            </p>
+            <p className="text-sm text-gray-600 mt-1">월별 이벤트 시퀀스 모델 예측</p>
+          </div>
+        )}
       </div>
 
       {/* 매출 등급 예측 정보 */}
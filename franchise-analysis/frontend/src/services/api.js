@@ -41,20 +41,37 @@ apiClient.interceptors.response.use(
 /**
  * 가맹점 리포트 조회
  * @param {string} franchiseId - 가맹점 ID
+ * @param {Object} options - deferLLM: true 면 LLM 전략 없이 즉시 응답 (llmSuggestion.status = 'pending')
  * @returns {Promise} 가맹점 리포트 데이터
  */
-export const getFranchiseReport = async (franchiseId) => {
+export const getFranchiseReport = async (franchiseId, { deferLLM = false } = {}) => {
   try {
-    const response = await apiClient.get(`/api/franchise/report/${franchiseId}`);
+    const response = await apiClient.get(`/api/franchise/report/${franchiseId}`, {
+      params: deferLLM ? { llm: 'defer' } : undefined,
+    });
     return response.data;
   } catch (error) {
     throw new Error(error.response?.data?.detail || '가맹점 리포트 조회에 실패했습니다.');
   }
 };
 
+/**
+ * 여러 가맹점 리포트 일괄 조회 (LLM 전략 제외 - llmSuggestion.status = 'pending')
+ * @param {string[]} franchiseIds - 가맹점 ID 목록
+ * @returns {Promise} { reports, errors } - 없는 점포 등 실패한 점포는 errors 에 { storeId, status, detail }
+ */
+export const getFranchiseReports = async (franchiseIds) => {
+  try {
+    const response = await apiClient.post('/api/franchise/reports', { storeIds: franchiseIds });
+    return response.data;
+  } catch (error) {
+    throw new Error(error.response?.data?.detail || '가맹점 리포트 일괄 조회에 실패했습니다.');
+  }
+};
+
 /**
  * LLM 기반 전략 제안
- * @param {Object} analysisData - 분석된 데이터
+ * @param {Object} analysisData - { franchiseId }
  * @returns {Promise} LLM 생성 전략
  */
 export const getLLMSuggestion = async (analysisData) => {
@@ -66,6 +83,30 @@ export const getLLMSuggestion = async (analysisData) => {
   }
 };
 
+/**
+ * LLM 전략 제안 스트리밍 (Server-Sent Events)
+ * @param {string} franchiseId - 가맹점 ID
+ * @param {Object} handlers - onToken(text), onDone(suggestion), onError(error)
+ * @returns {Function} 스트림 종료 함수
+ */
+export const streamLLMSuggestion = (franchiseId, { onToken, onDone, onError } = {}) => {
+  const source = new EventSource(`${API_BASE_URL}/api/llm/stream/${franchiseId}`);
+
+  source.addEventListener('token', (event) => {
+    onToken?.(JSON.parse(event.data).text);
+  });
+  source.addEventListener('done', (event) => {
+    source.close();
+    onDone?.(JSON.parse(event.data));
+  });
+  source.onerror = () => {
+    source.close();
+    onError?.(new Error('AI 분석에 실패했습니다.'));
+  };
+
+  return () => source.close();
+};
+
 /**
  * 전체 클러스터 목록 조회 (선택사항)
  * @returns {Promise} 클러스터 리스트
@@ -93,4 +134,21 @@ export const getTradingAreaStats = async (tradingArea) => {
   }
 };
 
+/**
+ * 주변 점포 조회 (반경 내, 가까운 순)
+ * @param {string} franchiseId - 기준 가맹점 ID
+ * @param {Object} options - radiusM: 반경(m), minRiskScore: 위험도 점수 하한 (예: 60 → 고위험)
+ * @returns {Promise} { center, radiusM, count, stores }
+ */
+export const getNearbyStores = async (franchiseId, { radiusM = 500, minRiskScore } = {}) => {
+  try {
+    const response = await apiClient.get('/api/stats/nearby', {
+      params: { store_id: franchiseId, radius_m: radiusM, min_risk_score: minRiskScore },
+    });
+    return response.data;
+  } catch (error) {
+    throw new Error('주변 점포 정보를 불러올 수 없습니다.');
+  }
+};
+
 export default apiClient;
\ No newline at end of file